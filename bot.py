@@ -4,18 +4,23 @@ import logging
 from telegram import Update
 from telegram.ext import (
     Application, MessageHandler, filters,
-    CallbackQueryHandler, PicklePersistence, ContextTypes, CommandHandler,
-    TypeHandler, ApplicationHandlerStop, JobQueue
+    PicklePersistence, ContextTypes, CommandHandler,
+    TypeHandler, ApplicationHandlerStop
 )
-from telegram.error import TelegramError
 import config
 
-from keyboards.reply import main_reply_keyboard
+from keyboards.inline import keyboard_cache
 from handlers.user.start import start, start_handler, help_handler, help_command, deeplink_retrieval_callback
-from handlers.user.search import movie_search_handler, series_search_handler, generic_search_handler
-from handlers.user.browsing import browsing_handlers, show_all_movies, show_all_series, show_browse_by_year, show_browse_by_category # Ensure browsing_handlers is explicitly imported
+from handlers.user.search import movie_search_handler, series_search_handler, generic_search_handler, search_cache, prefilter_stats, prefilter_rejection_rate
+from handlers.user.inline import inline_search_handler
+from handlers.user.browsing import browsing_routes, show_all_movies, show_all_series, show_new, show_browse_by_year, show_browse_by_category
 from handlers.admin.admin_panel import admin_conversation_handler
 from middleware import force_join_middleware
+from utils import constants as const
+from utils.router import CallbackRouter
+from utils.rate_limiter import outbound
+from utils.helpers import start_deletion_wheel, deletion_wheel
+from database import async_db
 
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
@@ -51,37 +56,77 @@ async def diagnose(update: Update, context: ContextTypes.DEFAULT_TYPE):
     except Exception as e:
         await update.message.reply_text(f"❌ FAILED!\nAPI error: `{e}`\n\nCheck if bot is admin or if channel username is correct.", parse_mode='Markdown')
 
+async def stats(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Admin-only runtime counters for the bot's caches and indexes."""
+    if update.effective_user.id not in config.ADMIN_IDS: return
+    cache = search_cache.stats()
+    keyboards = keyboard_cache.stats()
+    sends = outbound.queue_stats()
+    wheel = deletion_wheel.queue_stats()
+    pending_deletions, overdue_deletions = await async_db.deletion_counts()
+    await update.message.reply_text(
+        "📊 Bot stats\n\n"
+        f"Search cache: {cache['size']} entries, {cache['hits']} hits / {cache['misses']} misses "
+        f"(hit rate {cache['hit_rate']:.0%})\n"
+        f"Keyboard cache: {keyboards['size']} entries, {keyboards['hits']} hits / {keyboards['misses']} misses "
+        f"(hit rate {keyboards['hit_rate']:.0%})\n"
+        f"Text search pre-filter: {prefilter_stats['checked']} checked, rejected {prefilter_rejection_rate():.0%} "
+        f"(too short {prefilter_stats['too_short']}, no letters {prefilter_stats['no_letters']}, "
+        f"no possible match {prefilter_stats['impossible']})\n"
+        f"Outbound: {sends['requests']} requests, {sends['delayed']} paced, {sends['flood_waits']} flood waits, "
+        f"{sends['chats']} chats tracked, {sends['paused']} paused\n"
+        f"Scheduled deletions: {pending_deletions} pending, {overdue_deletions} overdue\n"
+        f"Deletion wheel: depth {wheel['depth']} (s/min/h {'/'.join(map(str, wheel['levels']))}, overflow {wheel['overflow']}), "
+        f"{wheel['items_fired']} fired in {wheel['buckets_fired']} buckets, {wheel['running']} running, "
+        f"lag {wheel['lag']:.2f}s (max {wheel['max_lag']:.2f}s)"
+    )
+
+async def post_init(application: Application):
+    """Puts back the content deletions that were still pending when the bot last stopped."""
+    await start_deletion_wheel(application.bot)
+
+async def post_shutdown(application: Application):
+    # Deletions still pending stay in the SQLite schedule for the next start.
+    await deletion_wheel.stop()
+
 def main():
     logger.info("Starting bot...")
     persistence = PicklePersistence(filepath="bot_persistence.pickle")
     
-    # --- Initialize JobQueue ---
-    job_queue = JobQueue()
-    
-    application = Application.builder().token(config.BOT_TOKEN).persistence(persistence).job_queue(job_queue).build()
+    # Every Bot API request goes through the outbound scheduler (utils/rate_limiter.py); timed
+    # deletions run on the deletion wheel (utils/timing_wheel.py), so no JobQueue is built.
+    application = Application.builder().token(config.BOT_TOKEN).persistence(persistence).job_queue(None).rate_limiter(outbound).post_init(post_init).post_shutdown(post_shutdown).build()
     
     # --- MIDDLEWARE SETUP ---
     application.add_handler(TypeHandler(Update, global_middleware), group=-1)
 
     # --- Other Handlers ---
     application.add_handler(CommandHandler("diag", diagnose))
+    application.add_handler(CommandHandler("stats", stats))
     application.add_handler(admin_conversation_handler)
     application.add_handler(start_handler)
     application.add_handler(help_handler)
     application.add_handler(movie_search_handler)
     application.add_handler(series_search_handler)
-    
-    # Correctly add a list of browsing handlers
-    application.add_handlers(browsing_handlers) # This is the correct way to add a list of handlers
+    application.add_handler(inline_search_handler)
+    application.add_handler(CommandHandler("new", show_new))
 
-    application.add_handler(CallbackQueryHandler(check_join_status_callback, pattern="^check_join_status$"))
-    application.add_handler(CallbackQueryHandler(deeplink_retrieval_callback, pattern="^deeplink_(movie|series)_"))
+    # One handler routes every user-facing callback query by its prefix
+    callback_router = (
+        CallbackRouter()
+        .include(browsing_routes)
+        .exact(const.CALLBACK_CHECK_JOIN, check_join_status_callback)
+        .prefix(const.CALLBACK_DEEPLINK_MOVIE, deeplink_retrieval_callback)
+        .prefix(const.CALLBACK_DEEPLINK_SERIES, deeplink_retrieval_callback)
+    )
+    application.add_handler(callback_router.handler())
     
     # Handlers for Reply Keyboard
     application.add_handler(MessageHandler(filters.Regex("^🎬 All Movies$"), show_all_movies))
     application.add_handler(MessageHandler(filters.Regex("^📺 All Series$"), show_all_series))
     application.add_handler(MessageHandler(filters.Regex("^🗓 Browse by Year$"), show_browse_by_year))
     application.add_handler(MessageHandler(filters.Regex("^📚 Browse by Category$"), show_browse_by_category))
+    application.add_handler(MessageHandler(filters.Regex("^🆕 New$"), show_new))
     application.add_handler(MessageHandler(filters.Regex("^❓ Help & FAQ$"), help_command))
     
     application.add_handler(generic_search_handler)
@@ -21,3 +21,18 @@ ADMIN_IDS = [6158106622, 1661108890]
 # If you don't want this feature, set it to None.
 # Example: FORCE_JOIN_CHANNEL = "@your_channel_username"
 FORCE_JOIN_CHANNEL = None
+
+# --- OPTIONAL: STORAGE BACKEND ---
+# "json" keeps the catalog in database/movies_db.json and series_db.json.
+# "sqlite" stores it in an indexed SQLite file and imports the JSON files on first run.
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "json").lower()
+# Path of the SQLite file; defaults to database/catalog.sqlite3 when unset.
+SQLITE_DB_PATH = os.getenv("SQLITE_DB_PATH")
+
+# --- OPTIONAL: SORTING ---
+# Locale used to sort titles by name (e.g. "en_US.UTF-8"); defaults to the system locale.
+SORT_LOCALE = os.getenv("SORT_LOCALE")
+
+# --- OPTIONAL: DELIVERY ---
+# Send movie parts and episodes as albums of up to 10 (set to "0" to send them one by one).
+ALBUM_DELIVERY = os.getenv("ALBUM_DELIVERY", "1") != "0"
@@ -0,0 +1,180 @@
+# database/async_db.py
+
+"""
+Async facade over db_handler for use inside handlers. Every call runs in a small
+thread pool so file/SQLite I/O never blocks the event loop. Reads may run
+concurrently (their index lookups take db_handler's index lock, their record loads
+don't); writes wait for in-flight reads, run one at a time, and block new reads
+until they finish.
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Tuple
+
+from . import db_handler
+from .indexes import SORT_CATALOG
+from .deletion_schedule import deletion_schedule
+
+MAX_WORKERS = 4
+
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="db")
+
+
+class _ReadWriteLock:
+    """Many readers or one writer. Waiting writers block new readers so they can't starve."""
+
+    def __init__(self):
+        self._cond = asyncio.Condition()
+        self._readers = 0
+        self._writer = False
+        self._writers_waiting = 0
+
+    @asynccontextmanager
+    async def read(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: not self._writer and not self._writers_waiting)
+            self._readers += 1
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._readers -= 1
+                self._cond.notify_all()
+
+    @asynccontextmanager
+    async def write(self):
+        async with self._cond:
+            self._writers_waiting += 1
+            try:
+                await self._cond.wait_for(lambda: not self._writer and self._readers == 0)
+            finally:
+                self._writers_waiting -= 1
+            self._writer = True
+        try:
+            yield
+        finally:
+            async with self._cond:
+                self._writer = False
+                self._cond.notify_all()
+
+
+_lock = _ReadWriteLock()
+
+
+async def _run(func, *args, **kwargs):
+    return await asyncio.get_running_loop().run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+async def _read(func, *args, **kwargs):
+    async with _lock.read():
+        return await _run(func, *args, **kwargs)
+
+async def _write(func, *args, **kwargs):
+    async with _lock.write():
+        return await _run(func, *args, **kwargs)
+
+# --- Movie Functions ---
+async def get_all_movies() -> List[Dict[str, Any]]:
+    return await _read(db_handler.get_all_movies)
+
+async def list_movies(page: int = 0, per_page: int = 10, sort: str = SORT_CATALOG, filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    return await _read(db_handler.list_movies, page, per_page, sort, filters)
+
+async def find_movie_by_id(movie_id: str) -> Optional[Dict[str, Any]]:
+    return await _read(db_handler.find_movie_by_id, movie_id)
+
+async def search_movies(query: str) -> List[Dict[str, Any]]:
+    return await _read(db_handler.search_movies, query)
+
+async def find_movie_by_name(name: str) -> Optional[Dict[str, Any]]:
+    return await _read(db_handler.find_movie_by_name, name)
+
+async def suggest_movies(query: str) -> List[Dict[str, Any]]:
+    return await _read(db_handler.suggest_movies, query)
+
+async def add_movie(movie_data: Dict[str, Any]):
+    return await _write(db_handler.add_movie, movie_data)
+
+async def update_movie(movie_id: str, new_data: Dict[str, Any]) -> bool:
+    return await _write(db_handler.update_movie, movie_id, new_data)
+
+async def delete_movie_by_id(movie_id: str) -> bool:
+    return await _write(db_handler.delete_movie_by_id, movie_id)
+
+# --- Series Functions ---
+async def get_all_series() -> List[Dict[str, Any]]:
+    return await _read(db_handler.get_all_series)
+
+async def list_series(page: int = 0, per_page: int = 10, sort: str = SORT_CATALOG, filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    return await _read(db_handler.list_series, page, per_page, sort, filters)
+
+async def find_series_by_id(series_id: str) -> Optional[Dict[str, Any]]:
+    return await _read(db_handler.find_series_by_id, series_id)
+
+async def search_series(query: str) -> List[Dict[str, Any]]:
+    return await _read(db_handler.search_series, query)
+
+async def find_series_by_name(name: str) -> Optional[Dict[str, Any]]:
+    return await _read(db_handler.find_series_by_name, name)
+
+async def suggest_series(query: str) -> List[Dict[str, Any]]:
+    return await _read(db_handler.suggest_series, query)
+
+async def add_series(series_data: Dict[str, Any]):
+    return await _write(db_handler.add_series, series_data)
+
+async def update_series(series_id: str, new_data: Dict[str, Any]) -> bool:
+    return await _write(db_handler.update_series, series_id, new_data)
+
+async def delete_series_by_id(series_id: str) -> bool:
+    return await _write(db_handler.delete_series_by_id, series_id)
+
+# --- Utility Functions ---
+async def find_many_by_ids(kind: str, ids: List[str]) -> List[Dict[str, Any]]:
+    return await _read(db_handler.find_many_by_ids, kind, ids)
+
+async def list_titles(kind: str, page: int = 0, per_page: int = 10, sort: str = SORT_CATALOG, filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    return await _read(db_handler.list_titles, kind, page, per_page, sort, filters)
+
+async def prefix_search(query: str) -> List[Tuple[str, str]]:
+    return await _read(db_handler.prefix_search, query)
+
+async def could_match(query: str) -> bool:
+    return await _read(db_handler.could_match, query)
+
+async def facet_ids(kind: str, year: Optional[int] = None, categories: Optional[List[str]] = None) -> List[str]:
+    return await _read(db_handler.facet_ids, kind, year=year, categories=categories)
+
+async def facet_counts(year: Optional[int] = None, categories: Optional[List[str]] = None) -> Dict[str, int]:
+    return await _read(db_handler.facet_counts, year=year, categories=categories)
+
+async def parse_facet_query(query: str) -> Optional[Dict[str, Any]]:
+    return await _read(db_handler.parse_facet_query, query)
+
+async def recent_counts() -> Dict[str, int]:
+    return await _read(db_handler.recent_counts)
+
+async def get_all_unique_years() -> List[int]:
+    return await _read(db_handler.get_all_unique_years)
+
+async def get_all_unique_categories() -> List[str]:
+    return await _read(db_handler.get_all_unique_categories)
+
+async def get_catalog_version() -> int:
+    return await _read(db_handler.get_catalog_version)
+
+# --- Deletion Schedule ---
+# Its own SQLite file and lock, so these skip the catalog lock and only use the pool.
+async def schedule_deletion(chat_id: int, due_at: float, data: Dict[str, Any]) -> int:
+    return await _run(deletion_schedule.add, chat_id, due_at, data)
+
+async def unschedule_deletions(deletion_ids: List[int]):
+    await _run(deletion_schedule.remove, deletion_ids)
+
+async def pending_deletions() -> List[Dict[str, Any]]:
+    return await _run(deletion_schedule.pending)
+
+async def deletion_counts() -> Tuple[int, int]:
+    return await _run(deletion_schedule.counts)
@@ -1,122 +1,269 @@
 # database/db_handler.py
 
-import json
 import os
-from typing import List, Dict, Any, Optional
+import threading
+import time
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Tuple
 import uuid # Import uuid
 
+import config
+from .indexes import CatalogIndex, FacetIndex, SORT_CATALOG
+from .orderings import OrderIndex, SORTS, SORT_RECENT
+from .prefix_index import PrefixIndex
+from .query_filter import QueryFilter
+from .short_ids import ShortIdIndex, short_ids
+from .search_index import SearchIndex
+from .storage import MOVIES, SERIES, KINDS, StorageBackend, create_backend
+
 # Define file paths
 DB_DIR = os.path.dirname(__file__)
 MOVIES_DB_PATH = os.path.join(DB_DIR, "movies_db.json")
 SERIES_DB_PATH = os.path.join(DB_DIR, "series_db.json")
+SQLITE_DB_PATH = config.SQLITE_DB_PATH or os.path.join(DB_DIR, "catalog.sqlite3")
+
+_KIND_BY_PATH = {MOVIES_DB_PATH: MOVIES, SERIES_DB_PATH: SERIES}
+
+_backend: Optional[StorageBackend] = None
+
+# --- In-memory indexes ---
+# Rebuilt whenever the backend version moves without us (startup, external edits),
+# and patched incrementally after each of our own writes. Both happen in place under
+# _index_lock, so readers query the indexes inside _synced() and only load records
+# from the backend after releasing it.
+_index_lock = threading.RLock()
+_indexes: List[CatalogIndex] = []
+_indexed_version: Optional[int] = None
+facets = FacetIndex()
+search_index = SearchIndex()
+prefix_index = PrefixIndex()
+query_filter = QueryFilter()
+orderings = OrderIndex()
 
-# Ensure database files exist
+# Ensure the configured storage backend exists (and is migrated, for SQLite)
 def initialize_databases():
-    if not os.path.exists(MOVIES_DB_PATH):
-        with open(MOVIES_DB_PATH, 'w') as f:
-            json.dump([], f)
-    if not os.path.exists(SERIES_DB_PATH):
-        with open(SERIES_DB_PATH, 'w') as f:
-            json.dump([], f)
+    global _backend
+    _backend = create_backend(
+        config.STORAGE_BACKEND,
+        {MOVIES: MOVIES_DB_PATH, SERIES: SERIES_DB_PATH},
+        SQLITE_DB_PATH,
+    )
+
+def get_backend() -> StorageBackend:
+    return _backend
+
+def register_index(index: CatalogIndex):
+    """Adds an index that should be kept in sync with the catalog."""
+    global _indexed_version
+    with _index_lock:
+        _indexes.append(index)
+        _indexed_version = None
+
+def sync_indexes():
+    """Rebuilds every registered index if the catalog changed since they were last built."""
+    global _indexed_version
+    with _index_lock:
+        version = _backend.version()
+        if version != _indexed_version:
+            catalogs = {kind: _backend.load_all(kind) for kind in KINDS}
+            for index in _indexes:
+                index.rebuild(catalogs)
+            _indexed_version = version
+
+@contextmanager
+def _synced():
+    """Holds the index lock with every index up to date, so nothing rebuilds or patches them mid-read."""
+    with _index_lock:
+        sync_indexes()
+        yield
+
+def _write(kind: str, record_id: str, operation):
+    """
+    Runs a backend write and patches the indexes with its result, instead of rebuilding
+    them. `operation` returns the written record (None if it didn't exist), or for
+    deletes a bool saying whether anything was removed.
+    """
+    global _indexed_version
+    with _index_lock:
+        in_sync = _backend.version() == _indexed_version
+        result = operation()
+        if result is None or result is False:
+            return result
+        if in_sync:
+            for index in _indexes:
+                if result is True:
+                    index.remove(kind, record_id)
+                else:
+                    index.add(kind, result)
+            _indexed_version = _backend.version()
+        return result
+
+def get_catalog_version() -> int:
+    """Returns a counter that increases every time a catalog is (re)loaded or saved."""
+    return _backend.version()
+
+def invalidate_cache():
+    """Drops any in-memory copy of the catalog so the next read goes back to storage."""
+    _backend.invalidate()
 
 def load_data(db_path: str) -> List[Dict[str, Any]]:
-    """Loads data from a JSON file."""
-    try:
-        with open(db_path, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    except (FileNotFoundError, json.JSONDecodeError):
-        return []
+    """Loads the catalog stored under one of the legacy JSON paths."""
+    return _backend.load_all(_KIND_BY_PATH[db_path])
 
 def save_data(db_path: str, data: List[Dict[str, Any]]):
-    """Saves data to a JSON file."""
-    with open(db_path, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=4)
+    """Replaces the whole catalog stored under one of the legacy JSON paths."""
+    with _index_lock:
+        _backend.replace_all(_KIND_BY_PATH[db_path], data)
+        sync_indexes()
 
 # --- Movie Functions ---
 def get_all_movies() -> List[Dict[str, Any]]:
-    return load_data(MOVIES_DB_PATH)
+    return _backend.load_all(MOVIES)
+
+def list_movies(page: int = 0, per_page: int = 10, sort: str = SORT_CATALOG, filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    return list_titles(MOVIES, page, per_page, sort, filters)
 
 def add_movie(movie_data: Dict[str, Any]):
-    movies = get_all_movies()
     # Ensure ID is always set for new items
     if "id" not in movie_data:
         movie_data["id"] = str(uuid.uuid4())
-    movies.append(movie_data)
-    save_data(MOVIES_DB_PATH, movies)
+    movie_data.setdefault("added_at", int(time.time()))
+    _write(MOVIES, movie_data["id"], lambda: _backend.insert(MOVIES, movie_data))
 
 def find_movie_by_id(movie_id: str) -> Optional[Dict[str, Any]]:
-    return next((m for m in get_all_movies() if m.get("id") == movie_id), None)
+    return _backend.get(MOVIES, movie_id)
 
 def update_movie(movie_id: str, new_data: Dict[str, Any]) -> bool:
-    movies = get_all_movies()
-    for i, movie in enumerate(movies):
-        if movie.get("id") == movie_id:
-            movies[i].update(new_data)
-            save_data(MOVIES_DB_PATH, movies)
-            return True
-    return False
+    return _write(MOVIES, movie_id, lambda: _backend.update(MOVIES, movie_id, new_data)) is not None
 
 def delete_movie_by_id(movie_id: str) -> bool:
-    movies = get_all_movies()
-    initial_len = len(movies)
-    movies = [m for m in movies if m.get("id") != movie_id]
-    if len(movies) < initial_len:
-        save_data(MOVIES_DB_PATH, movies)
-        return True
-    return False
+    return _write(MOVIES, movie_id, lambda: _backend.delete(MOVIES, movie_id))
+
+def search_movies(query: str) -> List[Dict[str, Any]]:
+    with _synced():
+        ids = search_index.search(MOVIES, query)
+    return _backend.find_many(MOVIES, ids)
+
+def find_movie_by_name(name: str) -> Optional[Dict[str, Any]]:
+    """Exact (normalized, case-insensitive) title lookup, used by deep links."""
+    with _synced():
+        movie_id = search_index.find_by_name(MOVIES, name)
+    return _backend.get(MOVIES, movie_id) if movie_id else None
+
+def suggest_movies(query: str) -> List[Dict[str, Any]]:
+    """Best fuzzy matches for a misspelled movie title, most similar first."""
+    with _synced():
+        ids = [movie_id for movie_id, _ in search_index.fuzzy_search(MOVIES, query)]
+    return _backend.find_many(MOVIES, ids)
 
 # --- Series Functions ---
 def get_all_series() -> List[Dict[str, Any]]:
-    return load_data(SERIES_DB_PATH)
+    return _backend.load_all(SERIES)
+
+def list_series(page: int = 0, per_page: int = 10, sort: str = SORT_CATALOG, filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    return list_titles(SERIES, page, per_page, sort, filters)
 
 def add_series(series_data: Dict[str, Any]):
-    series = get_all_series()
     # Ensure ID is always set for new items
     if "id" not in series_data:
         series_data["id"] = str(uuid.uuid4())
-    series.append(series_data)
-    save_data(SERIES_DB_PATH, series)
-    
+    series_data.setdefault("added_at", int(time.time()))
+    _write(SERIES, series_data["id"], lambda: _backend.insert(SERIES, series_data))
+
 def find_series_by_id(series_id: str) -> Optional[Dict[str, Any]]:
-    return next((s for s in get_all_series() if s.get("id") == series_id), None)
+    return _backend.get(SERIES, series_id)
 
 def update_series(series_id: str, new_data: Dict[str, Any]) -> bool:
-    all_series = get_all_series()
-    for i, series in enumerate(all_series):
-        if series.get("id") == series_id:
-            all_series[i].update(new_data)
-            save_data(SERIES_DB_PATH, all_series)
-            return True
-    return False
+    return _write(SERIES, series_id, lambda: _backend.update(SERIES, series_id, new_data)) is not None
 
 def delete_series_by_id(series_id: str) -> bool:
-    all_series = get_all_series()
-    initial_len = len(all_series)
-    all_series = [s for s in all_series if s.get("id") != series_id]
-    if len(all_series) < initial_len:
-        save_data(SERIES_DB_PATH, all_series)
-        return True
-    return False
+    return _write(SERIES, series_id, lambda: _backend.delete(SERIES, series_id))
+
+def search_series(query: str) -> List[Dict[str, Any]]:
+    with _synced():
+        ids = search_index.search(SERIES, query)
+    return _backend.find_many(SERIES, ids)
+
+def find_series_by_name(name: str) -> Optional[Dict[str, Any]]:
+    """Exact (normalized, case-insensitive) title lookup, used by deep links."""
+    with _synced():
+        series_id = search_index.find_by_name(SERIES, name)
+    return _backend.get(SERIES, series_id) if series_id else None
+
+def suggest_series(query: str) -> List[Dict[str, Any]]:
+    """Best fuzzy matches for a misspelled series title, most similar first."""
+    with _synced():
+        ids = [series_id for series_id, _ in search_index.fuzzy_search(SERIES, query)]
+    return _backend.find_many(SERIES, ids)
 
 # --- Utility Functions ---
+def find_many_by_ids(kind: str, ids: List[str]) -> List[Dict[str, Any]]:
+    """Resolves several movie or series ids in one call, keeping their order and skipping unknown ids."""
+    return _backend.find_many(kind, list(ids))
+
+def list_titles(kind: str, page: int = 0, per_page: int = 10, sort: str = SORT_CATALOG, filters: Optional[Dict[str, Any]] = None) -> Tuple[List[Dict[str, Any]], int]:
+    """
+    One page of movies or series and the total number of matches. The page is cut from
+    the facet bitsets or a precomputed ordering, so only its own records are loaded and
+    nothing is sorted per request. `filters` takes the "year" and "categories" keys of
+    parse_facet_query(); `sort` is SORT_CATALOG, SORT_NEWEST, or one of the orderings
+    SORT_NAME, SORT_ADDED and SORT_RECENT (the "recently added" buffer).
+    """
+    filters = filters or {}
+    year, categories = filters.get('year'), filters.get('categories')
+    with _synced():
+        if sort in SORTS:
+            only = set(facets.ids(kind, year=year, categories=categories)) if year is not None or categories else None
+            ids, total = orderings.page(kind, sort, page * per_page, per_page, only=only)
+        else:
+            ids, total = facets.page(kind, page * per_page, per_page, year=year, categories=categories, sort=sort)
+    return _backend.find_many(kind, ids), total
+
+def facet_ids(kind: str, year: Optional[int] = None, categories: Optional[List[str]] = None) -> List[str]:
+    """Ids of the movies or series matching every given facet, in catalog order."""
+    with _synced():
+        return facets.ids(kind, year=year, categories=categories)
+
+def facet_counts(year: Optional[int] = None, categories: Optional[List[str]] = None) -> Dict[str, int]:
+    """Number of movies and series matching the facets, without loading any record."""
+    with _synced():
+        return facets.counts(year=year, categories=categories)
+
+def parse_facet_query(query: str) -> Optional[Dict[str, Any]]:
+    """Facets of a free-text query like "action 2023", or None if it isn't one."""
+    with _synced():
+        return facets.parse_query(query)
+
+def prefix_search(query: str) -> List[Tuple[str, str]]:
+    """(kind, id) of the movies and series whose words start with the query's words, for inline mode."""
+    with _synced():
+        return prefix_index.search(query)
+
+def could_match(query: str) -> bool:
+    """Cheap pre-check: False if a normalized query cannot match any title, even fuzzily."""
+    with _synced():
+        return query_filter.might_match(query)
+
+def recent_counts() -> Dict[str, int]:
+    """Number of movies and series in the "recently added" buffers."""
+    with _synced():
+        return {kind: orderings.count(kind, SORT_RECENT) for kind in KINDS}
+
 def get_all_unique_years() -> List[int]:
-    movies, series = get_all_movies(), get_all_series()
-    years = set()
-    for item in movies + series:
-        year = item.get('year')
-        if isinstance(year, int):
-            years.add(year)
-    return sorted(list(years), reverse=True)
+    """All years that have content, newest first."""
+    with _synced():
+        return list(facets.years())
 
 def get_all_unique_categories() -> List[str]:
     """Get all unique categories from both movies and series, sorted alphabetically."""
-    movies, series = get_all_movies(), get_all_series()
-    categories = set()
-    for item in movies + series:
-        if 'categories' in item and isinstance(item['categories'], list):
-            for category in item['categories']:
-                categories.add(category.strip())
-    return sorted(list(categories))
+    with _synced():
+        return list(facets.categories())
 
 # Initialize on import
-initialize_databases()
\ No newline at end of file
+initialize_databases()
+register_index(facets)
+register_index(search_index)
+register_index(prefix_index)
+register_index(query_filter)
+register_index(orderings)
+register_index(ShortIdIndex(short_ids))
\ No newline at end of file
@@ -0,0 +1,66 @@
+# database/deletion_schedule.py
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Dict, Any, Tuple
+
+DELETION_DB_PATH = os.path.join(os.path.dirname(__file__), "deletions.sqlite3")
+
+
+class DeletionSchedule:
+    """
+    Durable list of pending content deletions: (chat_id, due_at, job data) rows in a small
+    SQLite file. A row is written when a deletion is scheduled and removed once it has run,
+    so whatever is still here at startup was lost with the previous process and has to be
+    rescheduled (or caught up on, if it is already overdue). Every call commits or queries
+    synchronously; handlers go through async_db, which runs them off the event loop.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS deletions (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            chat_id INTEGER NOT NULL,
+            due_at REAL NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_deletions_due ON deletions(due_at);
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+
+    def add(self, chat_id: int, due_at: float, data: Dict[str, Any]) -> int:
+        """Stores a pending deletion and returns its id."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO deletions (chat_id, due_at, data) VALUES (?, ?, ?)",
+                (chat_id, due_at, json.dumps(data, ensure_ascii=False)),
+            )
+            return cursor.lastrowid
+
+    def remove(self, deletion_ids: Iterable[int]):
+        """Drops deletions that have run, all in one transaction."""
+        with self._lock, self._conn:
+            self._conn.executemany("DELETE FROM deletions WHERE id = ?", ((deletion_id,) for deletion_id in deletion_ids))
+
+    def pending(self) -> List[Dict[str, Any]]:
+        """Every stored deletion as {"id", "chat_id", "due_at", "data"}, soonest first."""
+        with self._lock:
+            rows = self._conn.execute("SELECT id, chat_id, due_at, data FROM deletions ORDER BY due_at, id").fetchall()
+        return [{"id": row[0], "chat_id": row[1], "due_at": row[2], "data": json.loads(row[3])} for row in rows]
+
+    def counts(self, now: float = None) -> Tuple[int, int]:
+        """(pending, overdue) deletions."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(due_at <= ?), 0) FROM deletions", (now or time.time(),)
+            ).fetchone()
+
+deletion_schedule = DeletionSchedule(DELETION_DB_PATH)
@@ -0,0 +1,279 @@
+# database/indexes.py
+
+from typing import List, Dict, Any, Optional, Tuple
+
+from utils.text import normalize
+from .storage import MOVIES, SERIES
+
+
+class CatalogIndex:
+    """
+    Base class for in-memory indexes that db_handler keeps in sync with the catalog.
+    `rebuild` is called after (re)loads; `add`/`remove` after each of our own writes.
+    Indexes remember what they indexed per (kind, id), because callers sometimes mutate
+    a record in place before saving it, so the "old" record can't be trusted on update.
+    """
+
+    def rebuild(self, catalogs: Dict[str, List[Dict[str, Any]]]):
+        self.clear()
+        for kind, records in catalogs.items():
+            for record in records:
+                self.add(kind, record)
+
+    def clear(self):
+        raise NotImplementedError
+
+    def add(self, kind: str, record: Dict[str, Any]):
+        raise NotImplementedError
+
+    def remove(self, kind: str, record_id: str):
+        raise NotImplementedError
+
+
+# Orders FacetIndex.page() can list titles in.
+SORT_CATALOG = "catalog"
+SORT_NEWEST = "newest"
+
+# Words that restrict a free-text facet query to one kind of title.
+KIND_WORDS = {
+    "movie": MOVIES, "movies": MOVIES, "film": MOVIES, "films": MOVIES,
+    "series": SERIES, "show": SERIES, "shows": SERIES,
+}
+
+
+def _rows_of(bits: int) -> List[int]:
+    """Row numbers set in a bitset, ascending."""
+    binary = bin(bits)[:1:-1]  # least significant bit first, without the "0b"
+    rows, row = [], binary.find("1")
+    while row != -1:
+        rows.append(row)
+        row = binary.find("1", row + 1)
+    return rows
+
+
+def _slice_rows(bits: int, offset: int, limit: int) -> List[int]:
+    """Row numbers of the set bits from the `offset`-th one on, at most `limit` of them."""
+    binary = bin(bits)[:1:-1]
+    rows, row = [], binary.find("1")
+    while row != -1 and offset:
+        row, offset = binary.find("1", row + 1), offset - 1
+    while row != -1 and len(rows) < limit:
+        rows.append(row)
+        row = binary.find("1", row + 1)
+    return rows
+
+
+def _bits_of(rows: List[int]) -> int:
+    if not rows:
+        return 0
+    buffer = bytearray(max(rows) // 8 + 1)
+    for row in rows:
+        buffer[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(buffer, "little")
+
+
+class FacetIndex(CatalogIndex):
+    """
+    Year, category and kind facets as bitsets. Every title gets a dense row number and
+    each facet value maps to a Python int with one bit per row, so combining facets is a
+    couple of big-int ANDs and counting is a popcount, without touching any record.
+    Rows follow catalog order (updates keep their row, deleted rows stay empty until the
+    next rebuild), so ids come back in the same order the catalog lists them.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._rows: List[Optional[Tuple[str, str]]] = []
+        self._row_of: Dict[Tuple[str, str], int] = {}
+        self._facets_by_row: Dict[int, Tuple[Optional[int], Tuple[str, ...]]] = {}
+        self._kind_bits: Dict[str, int] = {}
+        self._year_bits: Dict[int, int] = {}
+        self._category_bits: Dict[str, int] = {}
+        self._sorted_years: Optional[List[int]] = None
+        self._sorted_categories: Optional[List[str]] = None
+        self._category_keys: Optional[Dict[str, str]] = None
+
+    @staticmethod
+    def _facets_of(record: Dict[str, Any]) -> Tuple[Optional[int], Tuple[str, ...]]:
+        year = record.get('year')
+        categories = record.get('categories')
+        if not isinstance(categories, list):
+            categories = []
+        return (
+            year if isinstance(year, int) else None,
+            tuple(sorted({category.strip() for category in categories})),
+        )
+
+    def rebuild(self, catalogs: Dict[str, List[Dict[str, Any]]]):
+        # Collect rows per facet value first; setting bits one by one on a big int copies it every time.
+        self.clear()
+        kind_rows, year_rows, category_rows = {}, {}, {}
+        for kind, records in catalogs.items():
+            for record in records:
+                record_id = record.get('id')
+                if not record_id or (kind, record_id) in self._row_of:
+                    continue
+                row = len(self._rows)
+                self._rows.append((kind, record_id))
+                self._row_of[(kind, record_id)] = row
+                year, categories = self._facets_by_row[row] = self._facets_of(record)
+                kind_rows.setdefault(kind, []).append(row)
+                if year is not None:
+                    year_rows.setdefault(year, []).append(row)
+                for category in categories:
+                    category_rows.setdefault(category, []).append(row)
+        for bitsets, rows_by_key in ((self._kind_bits, kind_rows), (self._year_bits, year_rows), (self._category_bits, category_rows)):
+            for key, rows in rows_by_key.items():
+                bitsets[key] = _bits_of(rows)
+
+    def _set(self, bitsets: Dict[Any, int], key: Any, row: int) -> bool:
+        """Sets a row's bit under a key; returns True if the key is new."""
+        is_new = key not in bitsets
+        bitsets[key] = bitsets.get(key, 0) | (1 << row)
+        return is_new
+
+    def _unset(self, bitsets: Dict[Any, int], key: Any, row: int) -> bool:
+        """Clears a row's bit under a key; returns True if the key disappeared."""
+        bits = bitsets.get(key, 0) & ~(1 << row)
+        if bits:
+            bitsets[key] = bits
+            return False
+        return bitsets.pop(key, None) is not None
+
+    def _drop_facets(self, row: int):
+        year, categories = self._facets_by_row.pop(row, (None, ()))
+        if year is not None and self._unset(self._year_bits, year, row):
+            self._sorted_years = None
+        for category in categories:
+            if self._unset(self._category_bits, category, row):
+                self._sorted_categories = self._category_keys = None
+
+    def add(self, kind: str, record: Dict[str, Any]):
+        record_id = record.get('id')
+        if not record_id:
+            return
+        row = self._row_of.get((kind, record_id))
+        if row is None:
+            row = len(self._rows)
+            self._rows.append((kind, record_id))
+            self._row_of[(kind, record_id)] = row
+            self._set(self._kind_bits, kind, row)
+        else:
+            self._drop_facets(row)
+        year, categories = self._facets_by_row[row] = self._facets_of(record)
+        if year is not None and self._set(self._year_bits, year, row):
+            self._sorted_years = None
+        for category in categories:
+            if self._set(self._category_bits, category, row):
+                self._sorted_categories = self._category_keys = None
+
+    def remove(self, kind: str, record_id: str):
+        row = self._row_of.pop((kind, record_id), None)
+        if row is None:
+            return
+        self._rows[row] = None
+        self._unset(self._kind_bits, kind, row)
+        self._drop_facets(row)
+
+    def years(self) -> List[int]:
+        """All years, newest first."""
+        if self._sorted_years is None:
+            self._sorted_years = sorted(self._year_bits, reverse=True)
+        return self._sorted_years
+
+    def categories(self) -> List[str]:
+        """All categories, alphabetically."""
+        if self._sorted_categories is None:
+            self._sorted_categories = sorted(self._category_bits)
+        return self._sorted_categories
+
+    def query(self, kind: Optional[str] = None, year: Optional[int] = None, categories: Optional[List[str]] = None) -> int:
+        """Bitset of the rows matching every given facet; no facets means every title (of `kind`)."""
+        if kind is not None:
+            bits = self._kind_bits.get(kind, 0)
+        else:
+            bits = 0
+            for kind_bits in self._kind_bits.values():
+                bits |= kind_bits
+        if year is not None:
+            bits &= self._year_bits.get(year, 0)
+        for category in categories or ():
+            bits &= self._category_bits.get(category, 0)
+        return bits
+
+    def ids(self, kind: str, year: Optional[int] = None, categories: Optional[List[str]] = None) -> List[str]:
+        """Ids of the `kind` titles matching the facets, in catalog order."""
+        return [self._rows[row][1] for row in _rows_of(self.query(kind, year, categories))]
+
+    def page(self, kind: str, offset: int, limit: int, year: Optional[int] = None, categories: Optional[List[str]] = None, sort: str = SORT_CATALOG) -> Tuple[List[str], int]:
+        """
+        Ids of `limit` matching titles starting at `offset`, and the total number of matches.
+        SORT_NEWEST walks the year bitsets newest first (titles without a year last), so
+        neither order needs the full id list: whole years before the page are skipped by
+        their popcount.
+        """
+        bits = self.query(kind, year, categories)
+        total = bits.bit_count()
+        if sort == SORT_CATALOG:
+            groups = [bits]
+        elif sort == SORT_NEWEST:
+            groups, undated = [], bits
+            for group_year in self.years():
+                groups.append(bits & self._year_bits[group_year])
+                undated &= ~self._year_bits[group_year]
+            groups.append(undated)
+        else:
+            raise ValueError(f"Unknown sort order: {sort!r}")
+        rows = []
+        for group in groups:
+            count = group.bit_count()
+            if offset >= count:
+                offset -= count
+                continue
+            rows.extend(_slice_rows(group, offset, limit - len(rows)))
+            offset = 0
+            if len(rows) >= limit:
+                break
+        return [self._rows[row][1] for row in rows], total
+
+    def counts(self, year: Optional[int] = None, categories: Optional[List[str]] = None) -> Dict[str, int]:
+        """Number of matching titles per kind."""
+        bits = self.query(None, year, categories)
+        return {kind: (bits & kind_bits).bit_count() for kind, kind_bits in self._kind_bits.items()}
+
+    def parse_query(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Reads a free-text facet query such as "action 2023" or "comedy series 2020": every
+        word must be a known year, a category name (possibly several words) or a kind word,
+        and a year alone needs a kind word with it ("2023 movies"). Returns {"kind", "year", "categories"}, or None if the text isn't a facet query.
+        """
+        if self._category_keys is None:
+            self._category_keys = {normalize(category): category for category in self.categories()}
+        words = normalize(query).split()
+        kind, year, categories = None, None, []
+        position = 0
+        while position < len(words):
+            word = words[position]
+            if word in KIND_WORDS and kind in (None, KIND_WORDS[word]):
+                kind = KIND_WORDS[word]
+                position += 1
+                continue
+            if word.isdigit() and int(word) in self._year_bits and year is None:
+                year = int(word)
+                position += 1
+                continue
+            # Longest run of words that names a category.
+            for end in range(len(words), position, -1):
+                category = self._category_keys.get(" ".join(words[position:end]))
+                if category is not None:
+                    categories.append(category)
+                    position = end
+                    break
+            else:
+                return None
+        # A bare year ("1917", "2012") is far more likely a title than a browse request.
+        if not categories and (year is None or kind is None):
+            return None
+        return {"kind": kind, "year": year, "categories": categories}
@@ -0,0 +1,150 @@
+# database/orderings.py
+
+import bisect
+import locale
+import logging
+from collections import deque
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+import config
+from utils.text import normalize
+from .indexes import CatalogIndex
+
+logger = logging.getLogger(__name__)
+
+# Orders OrderIndex.page() can list titles in (see also SORT_CATALOG/SORT_NEWEST in indexes.py).
+SORT_NAME = "name"
+SORT_ADDED = "added"
+SORT_RECENT = "recent"
+SORTS = (SORT_NAME, SORT_ADDED, SORT_RECENT)
+
+# Titles kept in each kind's "recently added" ring buffer.
+RECENT_SIZE = 100
+
+# Names are collated with LC_COLLATE, taken from SORT_LOCALE or the environment.
+try:
+    locale.setlocale(locale.LC_COLLATE, config.SORT_LOCALE or "")
+except locale.Error:
+    logger.warning(f"Collation locale {config.SORT_LOCALE!r} is not available; sorting names by code point.")
+
+
+def collation_key(name: Any) -> str:
+    """Locale-aware sort key of a title; normalize() first, so case and Burmese mark order don't matter."""
+    return locale.strxfrm(normalize(name))
+
+
+class OrderIndex(CatalogIndex):
+    """
+    Per-kind title orderings kept sorted as the catalog changes, so a sorted list page is
+    a slice rather than a sort: by collated name (A-Z) and by date added (newest first).
+    Entries are (key, seq, id) tuples placed with bisect; `seq` is the title's position
+    in catalog order, which breaks ties and dates titles saved before `added_at` existed.
+    A bounded ring buffer per kind keeps the most recently added ids for the "New" view.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._by_name: Dict[str, List[Tuple[str, int, str]]] = {}
+        self._by_added: Dict[str, List[Tuple[int, int, str]]] = {}
+        self._keys: Dict[Tuple[str, str], Tuple[Tuple[str, int, str], Tuple[int, int, str]]] = {}
+        self._recent: Dict[str, deque] = {}
+        self._next_seq = 0
+
+    def _entries(self, record: Dict[str, Any], seq: int) -> Tuple[Tuple[str, int, str], Tuple[int, int, str]]:
+        added_at = record.get('added_at')
+        return (
+            (collation_key(record.get('name')), seq, record['id']),
+            (added_at if isinstance(added_at, int) else 0, seq, record['id']),
+        )
+
+    def rebuild(self, catalogs: Dict[str, List[Dict[str, Any]]]):
+        # One sort per ordering instead of an insort per title.
+        self.clear()
+        for kind, records in catalogs.items():
+            by_name, by_added = [], []
+            for record in records:
+                if not record.get('id') or (kind, record['id']) in self._keys:
+                    continue
+                name_entry, added_entry = self._keys[(kind, record['id'])] = self._entries(record, self._next_seq)
+                self._next_seq += 1
+                by_name.append(name_entry)
+                by_added.append(added_entry)
+            self._by_name[kind] = sorted(by_name)
+            self._by_added[kind] = sorted(by_added)
+            self._recent[kind] = deque((entry[2] for entry in reversed(self._by_added[kind][-RECENT_SIZE:])), maxlen=RECENT_SIZE)
+
+    def add(self, kind: str, record: Dict[str, Any]):
+        record_id = record.get('id')
+        if not record_id:
+            return
+        old = self._keys.get((kind, record_id))
+        if old is None:
+            seq, self._next_seq = self._next_seq, self._next_seq + 1
+            self._recent.setdefault(kind, deque(maxlen=RECENT_SIZE)).appendleft(record_id)
+        else:
+            seq = old[0][1]
+            self._discard(kind, old)
+        name_entry, added_entry = self._keys[(kind, record_id)] = self._entries(record, seq)
+        bisect.insort(self._by_name.setdefault(kind, []), name_entry)
+        bisect.insort(self._by_added.setdefault(kind, []), added_entry)
+
+    def _discard(self, kind: str, entries: Tuple[Tuple[str, int, str], Tuple[int, int, str]]):
+        for ordering, entry in ((self._by_name[kind], entries[0]), (self._by_added[kind], entries[1])):
+            position = bisect.bisect_left(ordering, entry)
+            if position < len(ordering) and ordering[position] == entry:
+                del ordering[position]
+
+    def remove(self, kind: str, record_id: str):
+        entries = self._keys.pop((kind, record_id), None)
+        if entries is None:
+            return
+        self._discard(kind, entries)
+        # The buffer shrinks until the next rebuild refills it.
+        if record_id in self._recent.get(kind, ()):
+            self._recent[kind].remove(record_id)
+
+    def _ids(self, kind: str, sort: str, start: int, stop: int) -> List[str]:
+        """Ids at positions start..stop of an ordering, in display order."""
+        if sort == SORT_RECENT:
+            recent = self._recent.get(kind, ())
+            return [recent[i] for i in range(start, min(stop, len(recent)))]
+        if sort == SORT_NAME:
+            return [entry[2] for entry in self._by_name.get(kind, [])[start:stop]]
+        by_added = self._by_added.get(kind, [])
+        return [entry[2] for entry in reversed(by_added[max(len(by_added) - stop, 0):max(len(by_added) - start, 0)])]
+
+    def count(self, kind: str, sort: str) -> int:
+        return len(self._recent.get(kind, ())) if sort == SORT_RECENT else len(self._by_name.get(kind, []))
+
+    def page(self, kind: str, sort: str, offset: int, limit: int, only: Optional[Set[str]] = None) -> Tuple[List[str], int]:
+        """
+        Ids of `limit` titles starting at `offset` in one of SORTS, and the total. With
+        `only` (the ids matching some facets) the ordering is walked up to the page and
+        the total is the size of `only`, or, for SORT_RECENT, its overlap with the buffer.
+        """
+        if sort not in SORTS:
+            raise ValueError(f"Unknown sort order: {sort!r}")
+        if only is None:
+            return self._ids(kind, sort, offset, offset + limit), self.count(kind, sort)
+        ids, skipped = [], 0
+        for record_id in self._walk(kind, sort):
+            if record_id not in only:
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            ids.append(record_id)
+            if len(ids) == limit:
+                break
+        if sort == SORT_RECENT:
+            return ids, sum(1 for record_id in self._recent.get(kind, ()) if record_id in only)
+        return ids, len(only)
+
+    def _walk(self, kind: str, sort: str):
+        if sort == SORT_RECENT:
+            return iter(list(self._recent.get(kind, ())))
+        if sort == SORT_NAME:
+            return (entry[2] for entry in self._by_name.get(kind, []))
+        return (entry[2] for entry in reversed(self._by_added.get(kind, [])))
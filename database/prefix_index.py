@@ -0,0 +1,91 @@
+# database/prefix_index.py
+
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from utils.text import normalize, tokenize
+from .indexes import CatalogIndex
+
+
+class _Node:
+    __slots__ = ("children", "ids")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # (kind, id) of every title with a word starting with this node's prefix.
+        self.ids: Set[Tuple[str, str]] = set()
+
+
+class PrefixIndex(CatalogIndex):
+    """
+    Trie over the words of every title, movies and series together, for type-ahead
+    lookups such as inline queries. Each node keeps the titles below it, so a prefix
+    lookup is one walk down the trie and no scan of the catalog.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._root = _Node()
+        self._names: Dict[Tuple[str, str], str] = {}
+
+    def _walk(self, prefix: str, create: bool = False) -> Optional[_Node]:
+        node = self._root
+        for char in prefix:
+            child = node.children.get(char)
+            if child is None:
+                if not create:
+                    return None
+                child = node.children[char] = _Node()
+            node = child
+        return node
+
+    def add(self, kind: str, record: Dict[str, Any]):
+        record_id = record.get('id')
+        if not record_id:
+            return
+        self.remove(kind, record_id)
+        key = (kind, record_id)
+        name = normalize(record.get('name'))
+        self._names[key] = name
+        for word in set(tokenize(name)):
+            node = self._root
+            for char in word:
+                node = node.children.setdefault(char, _Node())
+                node.ids.add(key)
+
+    def remove(self, kind: str, record_id: str):
+        key = (kind, record_id)
+        name = self._names.pop(key, None)
+        if name is None:
+            return
+        for word in set(tokenize(name)):
+            path = [self._root]
+            for char in word:
+                path.append(path[-1].children[char])
+                path[-1].ids.discard(key)
+            # Prune branches that no longer lead to any title.
+            for depth in range(len(word), 0, -1):
+                if path[depth].ids:
+                    break
+                del path[depth - 1].children[word[depth - 1]]
+
+    def search(self, query: str) -> List[Tuple[str, str]]:
+        """
+        (kind, id) of titles where every query word is the prefix of some word in the
+        name. Names that start with the whole query come first, then alphabetically.
+        """
+        query = normalize(query)
+        words = tokenize(query)
+        if not words:
+            return []
+        matches = None
+        for word in sorted(set(words), key=len, reverse=True):
+            node = self._walk(word)
+            if node is None:
+                return []
+            matches = set(node.ids) if matches is None else matches & node.ids
+            if not matches:
+                return []
+        names = self._names
+        return sorted(matches, key=lambda key: (not names[key].startswith(query), names[key], key))
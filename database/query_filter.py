@@ -0,0 +1,82 @@
+# database/query_filter.py
+
+import math
+from typing import List, Dict, Any, Iterable, Set
+
+from utils.text import normalize
+from .indexes import CatalogIndex
+from .search_index import MAX_GRAM, FUZZY_THRESHOLD, grams, word_trigrams
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over strings: no false negatives, about `error_rate` false positives at capacity."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(capacity, 1)
+        self.size = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        # Double hashing: k positions from two base hashes.
+        first, second = hash(key), hash(key + "\x00") | 1
+        return ((first + i * second) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+class QueryFilter(CatalogIndex):
+    """
+    Bloom filter over the character n-grams and word trigrams of every title name.
+    might_match() says False only when a query can neither be a substring of a title
+    nor share enough word trigrams with one for a fuzzy suggestion, so those queries
+    can be answered without touching the catalog. Removals leave their bits set; that
+    only costs false positives until the next rebuild.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._bloom = BloomFilter(1024)
+
+    @staticmethod
+    def _keys(name: str) -> Set[str]:
+        keys = {"w" + trigram for trigram in word_trigrams(name)}
+        for size in range(1, MAX_GRAM + 1):
+            keys.update("g" + gram for gram in grams(name, size))
+        return keys
+
+    def rebuild(self, catalogs: Dict[str, List[Dict[str, Any]]]):
+        keys = set()
+        for records in catalogs.values():
+            for record in records:
+                keys |= self._keys(normalize(record.get('name')))
+        # Sized for the current catalog, with headroom for titles added before the next rebuild.
+        self._bloom = BloomFilter(max(2 * len(keys), 1024))
+        for key in keys:
+            self._bloom.add(key)
+
+    def add(self, kind: str, record: Dict[str, Any]):
+        for key in self._keys(normalize(record.get('name'))):
+            self._bloom.add(key)
+
+    def remove(self, kind: str, record_id: str):
+        pass
+
+    def might_match(self, query: str) -> bool:
+        """False if a normalized query cannot match any title exactly or fuzzily."""
+        if not query:
+            return False
+        size = min(len(query), MAX_GRAM)
+        if all("g" + gram in self._bloom for gram in grams(query, size)):
+            return True
+        trigrams = word_trigrams(query)
+        needed = FUZZY_THRESHOLD * len(trigrams)
+        found = sum(1 for trigram in trigrams if "w" + trigram in self._bloom)
+        return bool(trigrams) and found >= needed
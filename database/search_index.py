@@ -0,0 +1,150 @@
+# database/search_index.py
+
+from collections import Counter
+from typing import List, Dict, Any, Optional, Set, Tuple
+
+from utils.text import normalize, tokenize
+from .indexes import CatalogIndex
+
+# Character n-grams of every length up to this are indexed, so any substring query
+# can be answered from posting lists: short queries directly, longer ones by
+# intersecting their trigrams and confirming the match.
+MAX_GRAM = 3
+
+# Fuzzy matches must share at least this fraction of the query's word trigrams.
+FUZZY_THRESHOLD = 0.5
+FUZZY_LIMIT = 10
+
+
+def grams(normalized: str, size: int) -> Set[str]:
+    return {normalized[i:i + size] for i in range(len(normalized) - size + 1)}
+
+
+def word_trigrams(normalized: str) -> Set[str]:
+    """pg_trgm-style trigrams: each token padded with two leading spaces and one trailing."""
+    result = set()
+    for token in tokenize(normalized):
+        result |= grams(f"  {token} ", 3)
+    return result
+
+
+class SearchIndex(CatalogIndex):
+    """
+    Inverted index over title names: normalized tokens plus 1..MAX_GRAM character
+    n-grams, per kind. Substring results keep catalog insertion order. A separate
+    set of padded word trigrams backs the ranked fuzzy search used for misspellings.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._names: Dict[str, Dict[str, str]] = {}
+        self._order: Dict[str, Dict[str, int]] = {}
+        self._grams: Dict[str, Dict[str, Set[str]]] = {}
+        self._tokens: Dict[str, Dict[str, Set[str]]] = {}
+        self._trigrams: Dict[str, Dict[str, Set[str]]] = {}
+        self._trigram_counts: Dict[str, Dict[str, int]] = {}
+        self._next_order = 0
+
+    def _postings(self, record_name: str) -> Tuple[Set[str], Set[str], Set[str]]:
+        all_grams = set()
+        for size in range(1, MAX_GRAM + 1):
+            all_grams |= grams(record_name, size)
+        return all_grams, set(tokenize(record_name)), word_trigrams(record_name)
+
+    def add(self, kind: str, record: Dict[str, Any]):
+        record_id = record.get('id')
+        if not record_id:
+            return
+        order = self._order.setdefault(kind, {}).get(record_id)
+        self.remove(kind, record_id)
+        if order is None:
+            order = self._next_order
+            self._next_order += 1
+        name = normalize(record.get('name'))
+        self._names.setdefault(kind, {})[record_id] = name
+        self._order[kind][record_id] = order
+        all_grams, tokens, trigrams = self._postings(name)
+        for postings, keys in (
+            (self._grams.setdefault(kind, {}), all_grams),
+            (self._tokens.setdefault(kind, {}), tokens),
+            (self._trigrams.setdefault(kind, {}), trigrams),
+        ):
+            for key in keys:
+                postings.setdefault(key, set()).add(record_id)
+        self._trigram_counts.setdefault(kind, {})[record_id] = len(trigrams)
+
+    def remove(self, kind: str, record_id: str):
+        name = self._names.get(kind, {}).pop(record_id, None)
+        self._order.get(kind, {}).pop(record_id, None)
+        if name is None:
+            return
+        self._trigram_counts[kind].pop(record_id, None)
+        all_grams, tokens, trigrams = self._postings(name)
+        for postings, keys in (
+            (self._grams[kind], all_grams),
+            (self._tokens[kind], tokens),
+            (self._trigrams[kind], trigrams),
+        ):
+            for key in keys:
+                ids = postings.get(key)
+                if ids is not None:
+                    ids.discard(record_id)
+                    if not ids:
+                        del postings[key]
+
+    def _sorted(self, kind: str, ids: Set[str]) -> List[str]:
+        order = self._order.get(kind, {})
+        return sorted(ids, key=lambda record_id: order.get(record_id, 0))
+
+    def search(self, kind: str, query: str) -> List[str]:
+        """Ids whose normalized name contains the normalized query, in catalog order."""
+        query = normalize(query)
+        if not query:
+            return []
+        postings = self._grams.get(kind, {})
+        if len(query) <= MAX_GRAM:
+            return self._sorted(kind, postings.get(query, set()))
+        lists = [postings.get(gram) for gram in grams(query, MAX_GRAM)]
+        if any(ids is None for ids in lists):
+            return []
+        lists.sort(key=len)
+        candidates = set(lists[0]).intersection(*lists[1:])
+        names = self._names[kind]
+        return self._sorted(kind, {record_id for record_id in candidates if query in names[record_id]})
+
+
+    def fuzzy_search(self, kind: str, query: str, limit: int = FUZZY_LIMIT, threshold: float = FUZZY_THRESHOLD) -> List[Tuple[str, float]]:
+        """
+        Top `limit` (id, score) pairs ranked by trigram similarity. The score is the share of
+        the query's trigrams found in the title, so long titles aren't penalized for extra
+        words; ties go to the title with the higher overall (Jaccard) similarity.
+        """
+        query_trigrams = word_trigrams(normalize(query))
+        if not query_trigrams:
+            return []
+        postings = self._trigrams.get(kind, {})
+        shared = Counter()
+        for trigram in query_trigrams:
+            shared.update(postings.get(trigram, ()))
+        counts = self._trigram_counts.get(kind, {})
+        needed = threshold * len(query_trigrams)
+        scored = []
+        for record_id, common in shared.items():
+            if common < needed:
+                continue
+            jaccard = common / (len(query_trigrams) + counts[record_id] - common)
+            scored.append((common / len(query_trigrams), jaccard, record_id))
+        scored.sort(reverse=True)
+        return [(record_id, round(score, 3)) for score, _, record_id in scored[:limit]]
+
+    def find_by_name(self, kind: str, name: str) -> Optional[str]:
+        """Id of the first title whose normalized name equals the normalized `name`."""
+        key = normalize(name)
+        names = self._names.get(kind, {})
+        return next((record_id for record_id in self.search(kind, key) if names[record_id] == key), None)
+
+    def ids_with_token(self, kind: str, token: str) -> Set[str]:
+        """Ids whose name contains the normalized token as a whole word."""
+        return self._tokens.get(kind, {}).get(normalize(token), set())
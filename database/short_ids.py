@@ -0,0 +1,140 @@
+# database/short_ids.py
+
+import json
+import os
+import string
+import threading
+from typing import List, Dict, Any, Iterable, Optional
+
+from .indexes import CatalogIndex
+
+SHORT_IDS_PATH = os.path.join(os.path.dirname(__file__), "short_ids.log")
+
+# Namespace for category names; records use their kind ("movies"/"series").
+CATEGORY = "category"
+
+_ALPHABET = string.digits + string.ascii_letters
+
+
+def to_base62(number: int) -> str:
+    digits = []
+    while True:
+        number, remainder = divmod(number, 62)
+        digits.append(_ALPHABET[remainder])
+        if not number:
+            return "".join(reversed(digits))
+
+
+def from_base62(text: str) -> Optional[int]:
+    number = 0
+    for char in text:
+        digit = _ALPHABET.find(char)
+        if digit < 0:
+            return None
+        number = number * 62 + digit
+    return number
+
+
+class ShortIdRegistry:
+    """
+    Assigns dense base62 short ids (0, 1, ... z, 10, ...) per namespace to values such as
+    record ids and category names, for use in callback_data. Ids are never reused or
+    reassigned, because buttons in old messages keep carrying them: every assignment is
+    appended to a log file (one JSON [namespace, value] line) and fsynced before use,
+    and the log is replayed on startup.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._values: Dict[str, List[str]] = {}
+        self._numbers: Dict[str, Dict[str, int]] = {}
+        self._load()
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        good_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    namespace, value = json.loads(line)
+                except (ValueError, TypeError):
+                    break  # torn final line from a crash; that id was never handed out
+                self._remember(namespace, value)
+                good_end += len(line)
+        if good_end != os.path.getsize(self.path):
+            # Drop the torn tail so the next append starts on a fresh line.
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+
+    def _remember(self, namespace: str, value: str) -> int:
+        values = self._values.setdefault(namespace, [])
+        number = self._numbers.setdefault(namespace, {}).setdefault(value, len(values))
+        if number == len(values):
+            values.append(value)
+        return number
+
+    def register(self, namespace: str, values: Iterable[str]):
+        """Assigns short ids to every new value, with a single log append."""
+        with self._lock:
+            known = self._numbers.get(namespace, {})
+            new = list(dict.fromkeys(str(value) for value in values if str(value) not in known))
+            if not new:
+                return
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write("".join(json.dumps([namespace, value], ensure_ascii=False) + "\n" for value in new))
+                f.flush()
+                os.fsync(f.fileno())
+            for value in new:
+                self._remember(namespace, value)
+
+    def encode(self, namespace: str, value: str) -> str:
+        """Short id of a value, assigning one if needed."""
+        number = self._numbers.get(namespace, {}).get(value)
+        if number is None:
+            self.register(namespace, [value])
+            number = self._numbers[namespace][value]
+        return to_base62(number)
+
+    def decode(self, namespace: str, short_id: str) -> Optional[str]:
+        """The value behind a short id, or None if it was never assigned."""
+        number = from_base62(short_id)
+        values = self._values.get(namespace, [])
+        return values[number] if number is not None and number < len(values) else None
+
+
+class ShortIdIndex(CatalogIndex):
+    """Registers every record id and category as the catalog loads, so keyboards rarely have to."""
+
+    def __init__(self, registry: ShortIdRegistry):
+        self.registry = registry
+
+    def rebuild(self, catalogs: Dict[str, List[Dict[str, Any]]]):
+        categories = []
+        for kind, records in catalogs.items():
+            self.registry.register(kind, (record['id'] for record in records if record.get('id')))
+            for record in records:
+                categories.extend(self._categories_of(record))
+        self.registry.register(CATEGORY, categories)
+
+    @staticmethod
+    def _categories_of(record: Dict[str, Any]) -> List[str]:
+        categories = record.get('categories')
+        return [category.strip() for category in categories] if isinstance(categories, list) else []
+
+    def clear(self):
+        pass
+
+    def add(self, kind: str, record: Dict[str, Any]):
+        if record.get('id'):
+            self.registry.register(kind, [record['id']])
+        self.registry.register(CATEGORY, self._categories_of(record))
+
+    def remove(self, kind: str, record_id: str):
+        pass
+
+
+short_ids = ShortIdRegistry(SHORT_IDS_PATH)
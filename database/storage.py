@@ -0,0 +1,390 @@
+# database/storage.py
+
+import copy
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import List, Dict, Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MOVIES = "movies"
+SERIES = "series"
+KINDS = (MOVIES, SERIES)
+
+
+class StorageBackend:
+    """
+    Interface every catalog store implements. Records are plain dicts with at least
+    'id', 'name', 'year' and 'categories'; `kind` is MOVIES or SERIES. Records handed
+    out are the caller's own copies: changing one changes nothing until it is passed back
+    through update(), so the catalog and the indexes built from it can't drift apart.
+    """
+
+    def load_all(self, kind: str) -> List[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        raise NotImplementedError
+
+    def find_many(self, kind: str, record_ids: List[str]) -> List[Dict[str, Any]]:
+        """Resolves several ids at once, in the given order, skipping ids that don't exist."""
+        return [record for record in (self.get(kind, record_id) for record_id in record_ids) if record is not None]
+
+    def insert(self, kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        """Stores a record and returns it. A record with the same id is replaced, keeping its place."""
+        raise NotImplementedError
+
+    def update(self, kind: str, record_id: str, new_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Merges new_data into the record. Returns the updated record, or None if it doesn't exist."""
+        raise NotImplementedError
+
+    def delete(self, kind: str, record_id: str) -> bool:
+        raise NotImplementedError
+
+    def replace_all(self, kind: str, records: List[Dict[str, Any]]):
+        raise NotImplementedError
+
+    def version(self) -> int:
+        """A counter that increases whenever the stored catalog changes, including external edits."""
+        raise NotImplementedError
+
+    def invalidate(self):
+        """Forgets anything cached in memory so the next read goes back to storage."""
+
+
+class JsonStorage(StorageBackend):
+    """
+    The original storage: one JSON list file per kind. Mutations are appended to a
+    journal file next to it (`movies_db.json.journal`) and folded into the snapshot
+    every COMPACT_EVERY records, so a write costs O(record) instead of O(catalog).
+    One parsed copy of each catalog is kept in memory, as an insertion-ordered
+    id -> record dict, and reused while the (mtime, size) stamps of the snapshot
+    and journal are unchanged. Records go in and out of it as deep copies.
+    """
+
+    COMPACT_EVERY = 200
+
+    def __init__(self, paths: Dict[str, str]):
+        self.paths = paths
+        self._lock = threading.RLock()
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._version = 0
+        for path in paths.values():
+            if not os.path.exists(path):
+                with open(path, 'w') as f:
+                    json.dump([], f)
+
+    @staticmethod
+    def _file_stamp(path: str) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _journal_path(self, kind: str) -> str:
+        return self.paths[kind] + ".journal"
+
+    def _stamp(self, kind: str):
+        return (self._file_stamp(self.paths[kind]), self._file_stamp(self._journal_path(kind)))
+
+    def _store(self, kind: str, records: Dict[str, Dict[str, Any]], journal_len: int):
+        self._cache[kind] = {"stamp": self._stamp(kind), "records": records, "journal_len": journal_len}
+        self._version += 1
+
+    @staticmethod
+    def _index_by_id(record_list: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        # Legacy records without an id still need a slot so they survive compaction.
+        return {record.get("id") or f"__noid_{i}": record for i, record in enumerate(record_list)}
+
+    @staticmethod
+    def _apply(records: Dict[str, Dict[str, Any]], entry: Dict[str, Any]):
+        """Applies one journal entry. Entries are idempotent so replaying twice is harmless."""
+        op = entry.get("op")
+        if op == "insert":
+            record = entry["record"]
+            records[record["id"]] = record
+        elif op == "update":
+            record = records.get(entry["id"])
+            if record is not None:
+                record.update(entry["data"])
+        elif op == "delete":
+            records.pop(entry["id"], None)
+
+    def _replay_journal(self, kind: str, records: Dict[str, Dict[str, Any]]) -> Tuple[int, bool]:
+        """
+        Replays the journal onto a freshly loaded snapshot. Returns the number of entries
+        applied and whether a torn (partially written) entry was found.
+        """
+        applied = 0
+        try:
+            with open(self._journal_path(kind), 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A torn final line from a crash mid-append; everything before it is intact.
+                        logger.warning(f"Ignoring unreadable journal entry in {self._journal_path(kind)}.")
+                        return applied, True
+                    self._apply(records, entry)
+                    applied += 1
+        except FileNotFoundError:
+            pass
+        return applied, False
+
+    def _records(self, kind: str) -> Dict[str, Dict[str, Any]]:
+        """Returns the cached id -> record map for a kind, re-reading snapshot + journal if either changed on disk."""
+        stamp = self._stamp(kind)
+        with self._lock:
+            entry = self._cache.get(kind)
+            if entry is None or entry["stamp"] != stamp:
+                try:
+                    with open(self.paths[kind], 'r', encoding='utf-8') as f:
+                        records = self._index_by_id(json.load(f))
+                except (FileNotFoundError, json.JSONDecodeError):
+                    records = {}
+                journal_len, torn = self._replay_journal(kind, records)
+                if torn:
+                    # Appending after a torn line would corrupt the next entry too, so fold now.
+                    self._write_snapshot(kind, records)
+                else:
+                    self._store(kind, records, journal_len)
+                entry = self._cache[kind]
+            return entry["records"]
+
+    def _append(self, kind: str, entry: Dict[str, Any]):
+        """Durably appends one mutation to the journal, compacting when it grows too long."""
+        with open(self._journal_path(kind), 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        cached = self._cache[kind]
+        self._store(kind, cached["records"], cached["journal_len"] + 1)
+        if self._cache[kind]["journal_len"] >= self.COMPACT_EVERY:
+            self._write_snapshot(kind, cached["records"])
+
+    def _write_snapshot(self, kind: str, records: Dict[str, Dict[str, Any]]):
+        """Atomically rewrites the snapshot, then drops the journal it now contains."""
+        path = self.paths[kind]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(list(records.values()), f, indent=4)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        # If we crash before this, the journal is replayed onto the new snapshot, which is a no-op.
+        try:
+            os.remove(self._journal_path(kind))
+        except FileNotFoundError:
+            pass
+        self._store(kind, records, 0)
+
+    def compact(self, kind: Optional[str] = None):
+        """Folds the journal into the snapshot for one kind, or for every kind."""
+        with self._lock:
+            for k in ([kind] if kind else list(self.paths)):
+                self._write_snapshot(k, self._records(k))
+
+    def load_all(self, kind: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            return copy.deepcopy(list(self._records(kind).values()))
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return copy.deepcopy(self._records(kind).get(record_id))
+
+    def find_many(self, kind: str, record_ids: List[str]) -> List[Dict[str, Any]]:
+        with self._lock:
+            records = self._records(kind)
+            return copy.deepcopy([records[record_id] for record_id in record_ids if record_id in records])
+
+    def insert(self, kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            entry = {"op": "insert", "record": copy.deepcopy(record)}
+            self._apply(self._records(kind), entry)
+            self._append(kind, entry)
+            return copy.deepcopy(record)
+
+    def update(self, kind: str, record_id: str, new_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self._records(kind).get(record_id)
+            if record is None:
+                return None
+            new_data = copy.deepcopy(new_data)
+            record.update(new_data)
+            self._append(kind, {"op": "update", "id": record_id, "data": new_data})
+            return copy.deepcopy(record)
+
+    def delete(self, kind: str, record_id: str) -> bool:
+        with self._lock:
+            if record_id not in self._records(kind):
+                return False
+            entry = {"op": "delete", "id": record_id}
+            self._apply(self._records(kind), entry)
+            self._append(kind, entry)
+            return True
+
+    def replace_all(self, kind: str, records: List[Dict[str, Any]]):
+        with self._lock:
+            self._write_snapshot(kind, self._index_by_id(copy.deepcopy(records)))
+
+    def version(self) -> int:
+        with self._lock:
+            for kind in self.paths:
+                self._records(kind)
+            return self._version
+
+    def invalidate(self):
+        with self._lock:
+            self._cache.clear()
+
+
+class SqliteStorage(StorageBackend):
+    """
+    SQLite store keyed by (kind, id), kept in insertion order by `seq`. The full record is
+    kept as JSON in `data`, so fields the bot adds later don't need schema changes. Name,
+    year and category lookups are served by the in-memory CatalogIndexes, not by SQL.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS titles (
+            seq INTEGER PRIMARY KEY AUTOINCREMENT,
+            kind TEXT NOT NULL,
+            id TEXT NOT NULL,
+            data TEXT NOT NULL
+        );
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_titles_id ON titles(kind, id);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self._lock = threading.RLock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(self.SCHEMA)
+        self._version = 0
+        self._data_version = self._read_data_version()
+
+    def _read_data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _rows_to_records(self, rows) -> List[Dict[str, Any]]:
+        return [json.loads(row[0]) for row in rows]
+
+    def _write_row(self, kind: str, record: Dict[str, Any], replace: bool):
+        data = json.dumps(record, ensure_ascii=False)
+        if replace:
+            self._conn.execute("UPDATE titles SET data = ? WHERE kind = ? AND id = ?", (data, kind, record["id"]))
+        else:
+            # Like JsonStorage, inserting an existing id replaces the record in place (keeping its seq).
+            self._conn.execute(
+                "INSERT INTO titles (kind, id, data) VALUES (?, ?, ?) ON CONFLICT(kind, id) DO UPDATE SET data = excluded.data",
+                (kind, record["id"], data),
+            )
+
+    def _committed(self):
+        self._conn.commit()
+        self._version += 1
+
+    def migrate_from_json(self, paths: Dict[str, str]) -> bool:
+        """
+        One-shot import of the legacy JSON files. Runs only if the database has never been
+        migrated and is empty; returns True if an import happened.
+        """
+        with self._lock:
+            if self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from_json'").fetchone():
+                return False
+            imported = self._conn.execute("SELECT 1 FROM titles LIMIT 1").fetchone() is None
+            if imported:
+                # Read through JsonStorage so any un-compacted journal entries come along too.
+                source = JsonStorage(paths)
+                for kind, path in paths.items():
+                    records = source.load_all(kind)
+                    for record in records:
+                        if record.get("id"):
+                            self._write_row(kind, record, replace=False)
+                    logger.info(f"Migrated {len(records)} {kind} from {path} into {self.db_path}.")
+            self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from_json', '1')")
+            self._committed()
+            return imported
+
+    def load_all(self, kind: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM titles WHERE kind = ? ORDER BY seq", (kind,)).fetchall()
+        return self._rows_to_records(rows)
+
+    def get(self, kind: str, record_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute("SELECT data FROM titles WHERE kind = ? AND id = ?", (kind, record_id)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_many(self, kind: str, record_ids: List[str]) -> List[Dict[str, Any]]:
+        found: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            # Stay well under SQLite's bound-parameter limit.
+            for i in range(0, len(record_ids), 500):
+                chunk = record_ids[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT id, data FROM titles WHERE kind = ? AND id IN ({','.join('?' * len(chunk))})",
+                    (kind, *chunk),
+                ).fetchall()
+                found.update((row[0], json.loads(row[1])) for row in rows)
+        return [found[record_id] for record_id in record_ids if record_id in found]
+
+    def insert(self, kind: str, record: Dict[str, Any]) -> Dict[str, Any]:
+        with self._lock:
+            self._write_row(kind, record, replace=False)
+            self._committed()
+            return copy.deepcopy(record)
+
+    def update(self, kind: str, record_id: str, new_data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            record = self.get(kind, record_id)
+            if record is None:
+                return None
+            record.update(new_data)
+            self._write_row(kind, record, replace=True)
+            self._committed()
+            # record shares new_data's nested values with the caller.
+            return copy.deepcopy(record)
+
+    def delete(self, kind: str, record_id: str) -> bool:
+        with self._lock:
+            cursor = self._conn.execute("DELETE FROM titles WHERE kind = ? AND id = ?", (kind, record_id))
+            if cursor.rowcount == 0:
+                # Nothing changed, so don't move the catalog version (and invalidate every cache).
+                self._conn.commit()
+                return False
+            self._committed()
+            return True
+
+    def replace_all(self, kind: str, records: List[Dict[str, Any]]):
+        with self._lock:
+            self._conn.execute("DELETE FROM titles WHERE kind = ?", (kind,))
+            for record in records:
+                self._write_row(kind, record, replace=False)
+            self._committed()
+
+    def version(self) -> int:
+        with self._lock:
+            # data_version only changes when *another* connection commits.
+            data_version = self._read_data_version()
+            if data_version != self._data_version:
+                self._data_version = data_version
+                self._version += 1
+            return self._version
+
+
+def create_backend(name: str, json_paths: Dict[str, str], sqlite_path: str) -> StorageBackend:
+    """Builds the configured backend. 'sqlite' migrates the JSON files on first use."""
+    if name == "sqlite":
+        backend = SqliteStorage(sqlite_path)
+        backend.migrate_from_json(json_paths)
+        return backend
+    if name != "json":
+        logger.warning(f"Unknown STORAGE_BACKEND '{name}', falling back to JSON files.")
+    return JsonStorage(json_paths)
@@ -1,15 +1,18 @@
 # handlers/admin/admin_panel.py
 import logging, uuid
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import Update
 from telegram.ext import (
     ContextTypes, ConversationHandler, CommandHandler,
-    CallbackQueryHandler, MessageHandler, filters,
+    MessageHandler, filters,
 )
-from database import db_handler
+from database import async_db
+from database.storage import MOVIES, SERIES
 from keyboards import inline as keyboards
 from keyboards.reply import done_uploading_reply_keyboard, main_reply_keyboard # Ensure main_reply_keyboard is imported
 from utils import constants as const
+from utils import callbacks as cb
 from utils.decorators import admin_only
+from utils.router import CallbackRouter
 from datetime import datetime, timedelta, timezone
 
 logger = logging.getLogger(__name__)
@@ -119,7 +122,7 @@ async def done_uploading(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             await message.reply_text("❌ You haven't added any videos!", reply_markup=done_uploading_reply_keyboard())
             return const.GET_CONTENT_VIDEOS
         movie_data = {"id": str(uuid.uuid4()), **context.user_data}
-        db_handler.add_movie(movie_data)
+        await async_db.add_movie(movie_data)
         await message.reply_text(f"✅ Movie '{movie_data['name']}' added!", reply_markup=main_reply_keyboard(user_id))
     else:
         current_season, total_seasons = context.user_data.get('current_season', 1), context.user_data.get('season_total', 1)
@@ -132,32 +135,49 @@ async def done_uploading(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
             return const.GET_SERIES_EPISODES
         else:
             series_data = {"id": str(uuid.uuid4()), **context.user_data}
-            db_handler.add_series(series_data)
+            await async_db.add_series(series_data)
             await message.reply_text(f"✅ Series '{series_data['name']}' added!", reply_markup=main_reply_keyboard(user_id))
 
     context.user_data.clear()
     return ConversationHandler.END
 
+async def _show_admin_title_page(query, kind: str, page: int, delete: bool) -> bool:
+    """Shows one page of titles to delete or rename; False if there are none."""
+    items, total = await async_db.list_titles(kind, page, keyboards.LIST_PAGE_SIZE)
+    action = 'delete' if delete else 'rename'
+    if not total:
+        await query.edit_message_text(f"No {'movies' if kind == MOVIES else 'series'} to {action}.")
+        return False
+    await query.edit_message_text(
+        f"Select the {'movie' if kind == MOVIES else 'series'} to {action} (Page {page+1}):",
+        reply_markup=keyboards.admin_title_list_keyboard(kind, items, total, page, delete),
+    )
+    return True
+
 async def start_delete_content(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     query = update.callback_query
     await query.answer()
-    is_movie = query.data == const.CALLBACK_ADMIN_DELETE_MOVIE
-    content_list = db_handler.get_all_movies() if is_movie else db_handler.get_all_series()
-    if not content_list:
-        await query.edit_message_text(f"No {'movies' if is_movie else 'series'} to delete."); return ConversationHandler.END
-    keyboard = [[InlineKeyboardButton(f"❌ {item['name']}", callback_data=f"{(const.CALLBACK_DELETE_MOVIE if is_movie else const.CALLBACK_DELETE_SERIES)}{item['id']}")] for item in content_list]
-    keyboard.append([InlineKeyboardButton("🔙 Back to Admin Panel", callback_data=const.CALLBACK_ADMIN_CANCEL)])
-    await query.edit_message_text(f"Select the {'movie' if is_movie else 'series'} to delete:", reply_markup=InlineKeyboardMarkup(keyboard))
+    kind = MOVIES if query.data == const.CALLBACK_ADMIN_DELETE_MOVIE else SERIES
+    if not await _show_admin_title_page(query, kind, 0, delete=True):
+        return ConversationHandler.END
+    return const.CONFIRM_DELETE
+
+async def handle_delete_pagination(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    kind, page = cb.decode(const.CALLBACK_DELETE_PAGE, query.data)
+    if not await _show_admin_title_page(query, kind, int(page), delete=True):
+        return ConversationHandler.END
     return const.CONFIRM_DELETE
 
 async def confirm_delete(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     query = update.callback_query
     await query.answer()
     is_movie = query.data.startswith(const.CALLBACK_DELETE_MOVIE)
-    content_id = query.data.replace(const.CALLBACK_DELETE_MOVIE if is_movie else const.CALLBACK_DELETE_SERIES, "")
-    content = (db_handler.find_movie_by_id(content_id) if is_movie else db_handler.find_series_by_id(content_id))
+    content_id = cb.movie_id(cb.decode(const.CALLBACK_DELETE_MOVIE, query.data)[0]) if is_movie else cb.series_id(cb.decode(const.CALLBACK_DELETE_SERIES, query.data)[0])
+    content = (await async_db.find_movie_by_id(content_id) if is_movie else await async_db.find_series_by_id(content_id))
     if content:
-        (db_handler.delete_movie_by_id(content_id) if is_movie else db_handler.delete_series_by_id(content_id))
+        (await async_db.delete_movie_by_id(content_id) if is_movie else await async_db.delete_series_by_id(content_id))
         await query.edit_message_text(f"✅ Successfully deleted '{content['name']}'.")
     else:
         await query.edit_message_text("❌ Content not found or already deleted.")
@@ -169,21 +189,25 @@ async def start_rename_content(update: Update, context: ContextTypes.DEFAULT_TYP
     await query.answer()
     is_movie = query.data == const.CALLBACK_ADMIN_RENAME_MOVIE
     context.user_data['is_movie'] = is_movie
-    content_list = db_handler.get_all_movies() if is_movie else db_handler.get_all_series()
-    if not content_list:
-        await query.edit_message_text(f"No {'movies' if is_movie else 'series'} to rename."); return ConversationHandler.END
-    keyboard = [[InlineKeyboardButton(f"✏️ {item['name']}", callback_data=f"{(const.CALLBACK_RENAME_MOVIE if is_movie else const.CALLBACK_RENAME_SERIES)}{item['id']}")] for item in content_list]
-    keyboard.append([InlineKeyboardButton("🔙 Back to Admin Panel", callback_data=const.CALLBACK_ADMIN_CANCEL)])
-    await query.edit_message_text(f"Select the {'movie' if is_movie else 'series'} to rename:", reply_markup=InlineKeyboardMarkup(keyboard))
+    if not await _show_admin_title_page(query, MOVIES if is_movie else SERIES, 0, delete=False):
+        return ConversationHandler.END
+    return const.SELECT_RENAME_ITEM
+
+async def handle_rename_pagination(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
+    query = update.callback_query
+    await query.answer()
+    kind, page = cb.decode(const.CALLBACK_RENAME_PAGE, query.data)
+    if not await _show_admin_title_page(query, kind, int(page), delete=False):
+        return ConversationHandler.END
     return const.SELECT_RENAME_ITEM
 
 async def get_item_to_rename(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     query = update.callback_query
     await query.answer()
     is_movie = context.user_data['is_movie']
-    content_id = query.data.replace(const.CALLBACK_RENAME_MOVIE if is_movie else const.CALLBACK_RENAME_SERIES, "")
+    content_id = cb.movie_id(cb.decode(const.CALLBACK_RENAME_MOVIE, query.data)[0]) if is_movie else cb.series_id(cb.decode(const.CALLBACK_RENAME_SERIES, query.data)[0])
     context.user_data['content_id'] = content_id
-    content = db_handler.find_movie_by_id(content_id) if is_movie else db_handler.find_series_by_id(content_id)
+    content = await async_db.find_movie_by_id(content_id) if is_movie else await async_db.find_series_by_id(content_id)
     if not content:
         await query.edit_message_text("Content not found."); return ConversationHandler.END
     await query.edit_message_text(f"Current name: `{content['name']}`\n\nPlease send the new name.", parse_mode='Markdown', reply_markup=keyboards.cancel_keyboard())
@@ -192,11 +216,7 @@ async def get_item_to_rename(update: Update, context: ContextTypes.DEFAULT_TYPE)
 async def get_new_name_and_save(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     new_name, is_movie, content_id = update.message.text, context.user_data['is_movie'], context.user_data['content_id']
     user_id = update.effective_user.id
-    all_content = db_handler.get_all_movies() if is_movie else db_handler.get_all_series()
-    for item in all_content:
-        if item['id'] == content_id:
-            item['name'] = new_name; break
-    (db_handler.save_data(db_handler.MOVIES_DB_PATH, all_content) if is_movie else db_handler.save_data(db_handler.SERIES_DB_PATH, all_content))
+    (await async_db.update_movie(content_id, {'name': new_name}) if is_movie else await async_db.update_series(content_id, {'name': new_name}))
     await update.message.reply_text(f"✅ Successfully renamed to '{new_name}'.", reply_markup=main_reply_keyboard(user_id))
     context.user_data.clear()
     return ConversationHandler.END
@@ -206,28 +226,28 @@ async def start_edit_series(update: Update, context: ContextTypes.DEFAULT_TYPE)
     """Entry point for editing series."""
     query = update.callback_query
     await query.answer()
-    series_list = db_handler.get_all_series()
-    if not series_list:
+    series_list, total = await async_db.list_series(0, keyboards.LIST_PAGE_SIZE)
+    if not total:
         await query.edit_message_text("No series available to edit.")
         return ConversationHandler.END
-    await query.edit_message_text("Select a series to edit:", reply_markup=keyboards.edit_series_list_keyboard(series_list, page=0))
+    await query.edit_message_text("Select a series to edit:", reply_markup=keyboards.edit_series_list_keyboard(series_list, total, page=0))
     return const.SELECT_EDIT_SERIES
 
 async def handle_edit_series_pagination(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """Handle pagination of series list."""
     query = update.callback_query
     await query.answer()
-    page = int(query.data.replace(const.CALLBACK_EDIT_SERIES_PAGE, ""))
-    series_list = db_handler.get_all_series()
-    await query.edit_message_text("Select a series to edit:", reply_markup=keyboards.edit_series_list_keyboard(series_list, page=page))
+    page = int(cb.decode(const.CALLBACK_EDIT_SERIES_PAGE, query.data)[0])
+    series_list, total = await async_db.list_series(page, keyboards.LIST_PAGE_SIZE)
+    await query.edit_message_text("Select a series to edit:", reply_markup=keyboards.edit_series_list_keyboard(series_list, total, page=page))
     return const.SELECT_EDIT_SERIES
 
 async def select_series_for_edit(update: Update, context: ContextTypes.DEFAULT_TYPE) -> int:
     """When a series is selected, show its seasons."""
     query = update.callback_query
     await query.answer()
-    series_id = query.data.replace(const.CALLBACK_EDIT_SERIES_SELECT, "")
-    series = db_handler.find_series_by_id(series_id)
+    series_id = cb.series_id(cb.decode(const.CALLBACK_EDIT_SERIES_SELECT, query.data)[0])
+    series = await async_db.find_series_by_id(series_id)
     if not series:
         await query.edit_message_text("Series not found.")
         return ConversationHandler.END
@@ -243,9 +263,9 @@ async def select_season_for_edit(update: Update, context: ContextTypes.DEFAULT_T
     """When a season is selected, show add/remove options."""
     query = update.callback_query
     await query.answer()
-    data = query.data.replace(const.CALLBACK_EDIT_SEASON_SELECT, "")
-    series_id, season_num = data.split("_")
-    series = db_handler.find_series_by_id(series_id)
+    series_ref, season_num = cb.decode(const.CALLBACK_EDIT_SEASON_SELECT, query.data)
+    series_id = cb.series_id(series_ref)
+    series = await async_db.find_series_by_id(series_id)
     if not series or season_num not in series['seasons']:
         await query.edit_message_text("Season not found.")
         return ConversationHandler.END
@@ -262,7 +282,7 @@ async def start_add_episodes(update: Update, context: ContextTypes.DEFAULT_TYPE)
     await query.answer()
     series_id = context.user_data['edit_series_id']
     season_num = context.user_data['edit_season_num']
-    series = db_handler.find_series_by_id(series_id)
+    series = await async_db.find_series_by_id(series_id)
     if not series or season_num not in series['seasons']:
         await query.edit_message_text("Season not found.")
         return ConversationHandler.END
@@ -283,7 +303,7 @@ async def handle_add_episode_upload(update: Update, context: ContextTypes.DEFAUL
         context.user_data['new_episodes'].append(update.message.video.file_id)
         series_id = context.user_data['edit_series_id']
         season_num = context.user_data['edit_season_num']
-        series = db_handler.find_series_by_id(series_id)
+        series = await async_db.find_series_by_id(series_id)
         if series and season_num in series['seasons']:
             existing_count = len(series['seasons'][season_num])
             new_episode_num = existing_count + len(context.user_data['new_episodes'])
@@ -301,14 +321,15 @@ async def done_adding_episodes(update: Update, context: ContextTypes.DEFAULT_TYP
         return const.ADD_SERIES_EPISODES
     
     user_id = update.effective_user.id
-    series = db_handler.find_series_by_id(series_id)
+    series = await async_db.find_series_by_id(series_id)
     if not series or season_num not in series['seasons']:
         await update.message.reply_text("❌ Series or season not found!", reply_markup=main_reply_keyboard(user_id))
         context.user_data.clear()
         return ConversationHandler.END
     
-    series['seasons'][season_num].extend(new_episodes)
-    db_handler.update_series(series_id, series)
+    # Build a new seasons dict rather than mutating the cached record in place.
+    seasons = {**series['seasons'], season_num: series['seasons'][season_num] + new_episodes}
+    await async_db.update_series(series_id, {'seasons': seasons})
     
     await update.message.reply_text(
         f"✅ Successfully added {len(new_episodes)} episode(s) to Season {season_num} of '{series['name']}'!",
@@ -323,7 +344,7 @@ async def start_remove_episodes(update: Update, context: ContextTypes.DEFAULT_TY
     await query.answer()
     series_id = context.user_data['edit_series_id']
     season_num = context.user_data['edit_season_num']
-    series = db_handler.find_series_by_id(series_id)
+    series = await async_db.find_series_by_id(series_id)
     if not series or season_num not in series['seasons']:
         await query.edit_message_text("Season not found.")
         return ConversationHandler.END
@@ -343,11 +364,11 @@ async def handle_remove_episode(update: Update, context: ContextTypes.DEFAULT_TY
     """Remove a specific episode."""
     query = update.callback_query
     await query.answer()
-    data = query.data.replace(const.CALLBACK_REMOVE_EPISODE, "")
-    series_id, season_num, episode_index = data.split("_")
+    series_ref, season_num, episode_index = cb.decode(const.CALLBACK_REMOVE_EPISODE, query.data)
+    series_id = cb.series_id(series_ref)
     episode_index = int(episode_index)
     
-    series = db_handler.find_series_by_id(series_id)
+    series = await async_db.find_series_by_id(series_id)
     if not series or season_num not in series['seasons']:
         await query.edit_message_text("Season not found.")
         return ConversationHandler.END
@@ -356,11 +377,10 @@ async def handle_remove_episode(update: Update, context: ContextTypes.DEFAULT_TY
         await query.answer("Episode not found.", show_alert=True)
         return const.REMOVE_SERIES_EPISODES
     
-    removed_episode = series['seasons'][season_num].pop(episode_index)
-    db_handler.update_series(series_id, series)
+    episodes = series['seasons'][season_num][:episode_index] + series['seasons'][season_num][episode_index + 1:]
+    await async_db.update_series(series_id, {'seasons': {**series['seasons'], season_num: episodes}})
     
     user_id = update.effective_user.id
-    episodes = series['seasons'][season_num]
     if not episodes:
         await query.edit_message_text(
             f"✅ Episode {episode_index + 1} removed. No episodes left in Season {season_num}.",
@@ -394,10 +414,15 @@ admin_conversation_handler = ConversationHandler(
     entry_points=[CommandHandler("admin", admin_panel)],
     states={
         const.SELECTING_ACTION: [
-            CallbackQueryHandler(start_add_content, pattern=f"^{const.CALLBACK_ADMIN_ADD_MOVIE}$|^{const.CALLBACK_ADMIN_ADD_SERIES}$"),
-            CallbackQueryHandler(start_delete_content, pattern=f"^{const.CALLBACK_ADMIN_DELETE_MOVIE}$|^{const.CALLBACK_ADMIN_DELETE_SERIES}$"),
-            CallbackQueryHandler(start_rename_content, pattern=f"^{const.CALLBACK_ADMIN_RENAME_MOVIE}$|^{const.CALLBACK_ADMIN_RENAME_SERIES}$"),
-            CallbackQueryHandler(start_edit_series, pattern=f"^{const.CALLBACK_ADMIN_EDIT_SERIES}$"),
+            CallbackRouter()
+            .exact(const.CALLBACK_ADMIN_ADD_MOVIE, start_add_content)
+            .exact(const.CALLBACK_ADMIN_ADD_SERIES, start_add_content)
+            .exact(const.CALLBACK_ADMIN_DELETE_MOVIE, start_delete_content)
+            .exact(const.CALLBACK_ADMIN_DELETE_SERIES, start_delete_content)
+            .exact(const.CALLBACK_ADMIN_RENAME_MOVIE, start_rename_content)
+            .exact(const.CALLBACK_ADMIN_RENAME_SERIES, start_rename_content)
+            .exact(const.CALLBACK_ADMIN_EDIT_SERIES, start_edit_series)
+            .handler(),
         ],
         const.GET_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_name)],
         const.GET_PHOTO: [MessageHandler(filters.PHOTO, get_photo)],
@@ -407,33 +432,54 @@ admin_conversation_handler = ConversationHandler(
         const.GET_CONTENT_VIDEOS: [MessageHandler(filters.VIDEO, get_content_videos), MessageHandler(filters.Regex("^✅ Done Uploading$"), done_uploading)],
         const.GET_SERIES_SEASON_COUNT: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_season_count)],
         const.GET_SERIES_EPISODES: [MessageHandler(filters.VIDEO, get_series_episodes), MessageHandler(filters.Regex("^✅ Done Uploading$"), done_uploading)],
-        const.CONFIRM_DELETE: [CallbackQueryHandler(confirm_delete, pattern=f"^{const.CALLBACK_DELETE_MOVIE}|^({const.CALLBACK_DELETE_SERIES})"), CallbackQueryHandler(cancel, pattern=f"^{const.CALLBACK_ADMIN_CANCEL}$")],
-        const.SELECT_RENAME_ITEM: [CallbackQueryHandler(get_item_to_rename, pattern=f"^{const.CALLBACK_RENAME_MOVIE}|^({const.CALLBACK_RENAME_SERIES})")],
+        const.CONFIRM_DELETE: [
+            CallbackRouter()
+            .prefix(const.CALLBACK_DELETE_MOVIE, confirm_delete)
+            .prefix(const.CALLBACK_DELETE_SERIES, confirm_delete)
+            .prefix(const.CALLBACK_DELETE_PAGE, handle_delete_pagination)
+            .exact(const.CALLBACK_ADMIN_CANCEL, cancel)
+            .handler(),
+        ],
+        const.SELECT_RENAME_ITEM: [
+            CallbackRouter()
+            .prefix(const.CALLBACK_RENAME_MOVIE, get_item_to_rename)
+            .prefix(const.CALLBACK_RENAME_SERIES, get_item_to_rename)
+            .prefix(const.CALLBACK_RENAME_PAGE, handle_rename_pagination)
+            .handler(),
+        ],
         const.GET_NEW_NAME: [MessageHandler(filters.TEXT & ~filters.COMMAND, get_new_name_and_save)],
         # --- NEW Edit Series States Handlers ---
         const.SELECT_EDIT_SERIES: [
-            CallbackQueryHandler(handle_edit_series_pagination, pattern=f"^{const.CALLBACK_EDIT_SERIES_PAGE}"),
-            CallbackQueryHandler(select_series_for_edit, pattern=f"^{const.CALLBACK_EDIT_SERIES_SELECT}"),
-            CallbackQueryHandler(cancel, pattern=f"^{const.CALLBACK_ADMIN_CANCEL}$"),
+            CallbackRouter()
+            .prefix(const.CALLBACK_EDIT_SERIES_PAGE, handle_edit_series_pagination)
+            .prefix(const.CALLBACK_EDIT_SERIES_SELECT, select_series_for_edit)
+            .exact(const.CALLBACK_ADMIN_CANCEL, cancel)
+            .handler(),
         ],
         const.SELECT_EDIT_SEASON: [
-            CallbackQueryHandler(select_season_for_edit, pattern=f"^{const.CALLBACK_EDIT_SEASON_SELECT}"),
-            CallbackQueryHandler(start_edit_series, pattern=f"^{const.CALLBACK_ADMIN_EDIT_SERIES}$"),
+            CallbackRouter()
+            .prefix(const.CALLBACK_EDIT_SEASON_SELECT, select_season_for_edit)
+            .exact(const.CALLBACK_ADMIN_EDIT_SERIES, start_edit_series)
+            .handler(),
         ],
         const.SELECT_EDIT_ACTION: [
-            CallbackQueryHandler(start_add_episodes, pattern=f"^{const.CALLBACK_EDIT_ACTION_ADD}$"),
-            CallbackQueryHandler(start_remove_episodes, pattern=f"^{const.CALLBACK_EDIT_ACTION_REMOVE}$"),
-            CallbackQueryHandler(start_edit_series, pattern=f"^{const.CALLBACK_ADMIN_EDIT_SERIES}$"),
+            CallbackRouter()
+            .exact(const.CALLBACK_EDIT_ACTION_ADD, start_add_episodes)
+            .exact(const.CALLBACK_EDIT_ACTION_REMOVE, start_remove_episodes)
+            .exact(const.CALLBACK_ADMIN_EDIT_SERIES, start_edit_series)
+            .handler(),
         ],
         const.ADD_SERIES_EPISODES: [
             MessageHandler(filters.VIDEO, handle_add_episode_upload),
             MessageHandler(filters.Regex("^✅ Done Uploading$"), done_adding_episodes),
         ],
         const.REMOVE_SERIES_EPISODES: [
-            CallbackQueryHandler(handle_remove_episode, pattern=f"^{const.CALLBACK_REMOVE_EPISODE}"),
-            CallbackQueryHandler(start_edit_series, pattern=f"^{const.CALLBACK_ADMIN_EDIT_SERIES}$"),
+            CallbackRouter()
+            .prefix(const.CALLBACK_REMOVE_EPISODE, handle_remove_episode)
+            .exact(const.CALLBACK_ADMIN_EDIT_SERIES, start_edit_series)
+            .handler(),
         ],
     },
-    fallbacks=[CallbackQueryHandler(cancel, pattern=f"^{const.CALLBACK_ADMIN_CANCEL}$"), CommandHandler("cancel", cancel)],
+    fallbacks=[CallbackRouter().exact(const.CALLBACK_ADMIN_CANCEL, cancel).handler(), CommandHandler("cancel", cancel)],
     per_message=False
-)
\ No newline at end of file
+)
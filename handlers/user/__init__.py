@@ -2,4 +2,5 @@
 
 from .start import start_handler, help_handler
 from .search import movie_search_handler, series_search_handler, generic_search_handler
-from .browsing import browsing_handlers
\ No newline at end of file
+from .browsing import browsing_routes
+from .inline import inline_search_handler
@@ -1,105 +1,160 @@
 # handlers/user/browsing.py
 import logging
-import asyncio
-from telegram import Update
+from typing import List, Dict, Any, Optional, Tuple, Callable, Awaitable
+from telegram import Update, InlineKeyboardMarkup, InputMediaPhoto, InputMediaVideo
 from telegram.error import BadRequest
-from telegram.ext import ContextTypes, CallbackQueryHandler
+from telegram.ext import ContextTypes
 from telegram.constants import ParseMode
 from telegram.helpers import escape_markdown
 
-from database import db_handler
+from database import async_db
+from database.indexes import SORT_CATALOG, SORT_NEWEST
+from database.orderings import SORT_NAME, SORT_ADDED, SORT_RECENT
+from database.storage import MOVIES, SERIES
 from keyboards import inline as keyboards
 from utils import constants as const
+from utils import callbacks as cb
 from utils.helpers import schedule_content_deletion
+from utils.delivery import deliver
+from utils.cursors import cursor_store
+from utils.router import CallbackRouter
 
 logger = logging.getLogger(__name__)
 
 # --- CORE LOGIC: Helper functions for sending files ---
 
 # These helpers are called by the decorated handlers, so they don't need the decorator themselves.
-async def _send_movie_files(context: ContextTypes.DEFAULT_TYPE, chat_id: int, movie: dict, photo_message_id: int):
-    video_tasks = [
-        context.bot.send_video(chat_id=chat_id, video=video_id, caption=f"🎬 {movie['name']}")
-        for video_id in movie['videos']
-    ]
-    video_message_ids = []
-    try:
-        sent_messages = await asyncio.gather(*video_tasks)
-        video_message_ids = [msg.message_id for msg in sent_messages]
-    except Exception as e:
-        logger.error(f"Failed to send a video for movie {movie['id']}: {e}")
-        await context.bot.send_message(chat_id=chat_id, text="⚠️ An error occurred while sending a video file.")
-
-    if video_message_ids or photo_message_id:
-        schedule_content_deletion(
-            context, chat_id, video_message_ids, photo_message_id, movie['timer'],
-            'movie', movie['id'], movie['name']
+async def _finish_delivery(context: ContextTypes.DEFAULT_TYPE, chat_id: int, content: dict, content_type: str, content_name: str, video_message_ids: List[int], photo_message_id: Optional[int], reachable: bool = True):
+    """Schedules deletion of everything that was delivered, warns about the timer and thanks the user."""
+    delivered = bool(video_message_ids or photo_message_id)
+    if delivered:
+        await schedule_content_deletion(
+            context, chat_id, video_message_ids, photo_message_id, content['timer'],
+            content_type, content['id'], content_name
+        )
+    if not reachable:
+        return
+    if delivered and content['timer'] > 0:
+        await context.bot.send_message(
+            chat_id=chat_id, text=const.DELETION_WARNING_TEXT.format(timer=content['timer']),
+            parse_mode=ParseMode.MARKDOWN
         )
-        if movie['timer'] > 0:
-            await asyncio.sleep(1)
-            await context.bot.send_message(
-                chat_id=chat_id, text=const.DELETION_WARNING_TEXT.format(timer=movie['timer']),
-                parse_mode=ParseMode.MARKDOWN
-            )
     
     if const.THANK_YOU_STICKER_ID:
-        await asyncio.sleep(0.5)
         try:
             await context.bot.send_sticker(chat_id=chat_id, sticker=const.THANK_YOU_STICKER_ID)
         except BadRequest as e:
             logger.error(f"Failed to send sticker. ID might be invalid: {e}")
 
+async def _send_movie(context: ContextTypes.DEFAULT_TYPE, chat_id: int, movie: dict):
+    """Sends a movie's cover and video files, the cover leading the first album."""
+    safe_name = escape_markdown(movie['name'], version=2)
+    cover = InputMediaPhoto(movie['cover_photo'], caption=rf"🎬 *{safe_name}* `({movie['year']})`", parse_mode=ParseMode.MARKDOWN_V2)
+    videos = [InputMediaVideo(video_id, caption=f"🎬 {movie['name']}") for video_id in movie['videos']]
+    report = await deliver(context.bot, chat_id, [cover] + videos)
+    if any(position > 0 for position in report.failed) and not report.unreachable:
+        logger.error(f"Failed to send a video for movie {movie['id']}")
+        await context.bot.send_message(chat_id=chat_id, text="⚠️ An error occurred while sending a video file.")
+    photo_message_id = report.outcomes[0].message_id
+    await _finish_delivery(
+        context, chat_id, movie, 'movie', movie['name'],
+        [outcome.message_id for outcome in report.outcomes[1:] if outcome.message_id], photo_message_id,
+        reachable=not report.unreachable
+    )
+
 async def _send_series_season_files(context: ContextTypes.DEFAULT_TYPE, chat_id: int, series: dict, season_num: str, photo_message_id: int):
     episodes = series['seasons'][season_num]
-    video_message_ids = []
-
-    for idx, episode_id in enumerate(episodes, 1):
-        try:
-            caption = f"📺 {series['name']} - S{season_num}E{idx}"
-            sent_message = await context.bot.send_video(chat_id=chat_id, video=episode_id, caption=caption)
-            video_message_ids.append(sent_message.message_id)
-            await asyncio.sleep(0.5)
-        except Exception as e:
-            logger.error(f"Failed to send episode S{season_num}E{idx} for series {series['id']}: {e}")
-            await context.bot.send_message(chat_id=chat_id, text=f"⚠️ An error occurred while sending episode S{season_num}E{idx}.")
-
-    if video_message_ids or photo_message_id:
-        schedule_content_deletion(
-            context, chat_id, video_message_ids, photo_message_id, series['timer'],
-            'series', series['id'], f"{series['name']} S{season_num}"
-        )
-        if series['timer'] > 0:
-            await asyncio.sleep(1)
-            await context.bot.send_message(
-                chat_id=chat_id, text=const.DELETION_WARNING_TEXT.format(timer=series['timer']),
-                parse_mode=ParseMode.MARKDOWN
-            )
-    
-    if const.THANK_YOU_STICKER_ID:
-        await asyncio.sleep(0.5)
-        try:
-            await context.bot.send_sticker(chat_id=chat_id, sticker=const.THANK_YOU_STICKER_ID)
-        except BadRequest as e:
-            logger.error(f"Failed to send sticker. ID might be invalid: {e}")
+    videos = [
+        InputMediaVideo(episode_id, caption=f"📺 {series['name']} - S{season_num}E{idx}")
+        for idx, episode_id in enumerate(episodes, 1)
+    ]
+    report = await deliver(context.bot, chat_id, videos)
+    failed = [f"S{season_num}E{position + 1}" for position in report.failed]
+    if failed and not report.unreachable:
+        logger.error(f"Failed to send episodes {', '.join(failed)} for series {series['id']}")
+        await context.bot.send_message(chat_id=chat_id, text=f"⚠️ An error occurred while sending episode(s) {', '.join(failed)}.")
+    await _finish_delivery(
+        context, chat_id, series, 'series', f"{series['name']} S{season_num}",
+        report.message_ids, photo_message_id, reachable=not report.unreachable
+    )
+
+def _first_page(kind: str, page_records: List[Dict[str, Any]], ids: List[str], title: str) -> Tuple[InlineKeyboardMarkup, Optional[str]]:
+    # Lists longer than one page are stored in the cursor store so Prev/Next slice the saved ids.
+    cursor = cursor_store.create(kind, ids, title) if len(ids) > keyboards.LIST_PAGE_SIZE else None
+    build = keyboards.movie_list_keyboard if kind == MOVIES else keyboards.series_list_keyboard
+    return build(page_records, len(ids), page=0, cursor=cursor), cursor
+
+def list_keyboard(kind: str, records: List[Dict[str, Any]], title: str) -> Tuple[InlineKeyboardMarkup, Optional[str]]:
+    """First page of a result list and its cursor token (None if the list fits on one page)."""
+    return _first_page(kind, records[:keyboards.LIST_PAGE_SIZE], [record['id'] for record in records], title)
+
+async def id_list_keyboard(kind: str, ids: List[str], title: str) -> InlineKeyboardMarkup:
+    """Like list_keyboard, for an id list: only the records on the first page are loaded."""
+    page_records = await async_db.find_many_by_ids(kind, ids[:keyboards.LIST_PAGE_SIZE])
+    return _first_page(kind, page_records, ids, title)[0]
+
+async def _page_keyboard(key: Tuple, build: Callable[[], Awaitable[InlineKeyboardMarkup]]) -> InlineKeyboardMarkup:
+    """A list page keyboard from the keyboard cache, keyed by (view, filter, page) and the catalog version."""
+    key = key + (await async_db.get_catalog_version(),)
+    keyboard = keyboards.keyboard_cache.get(key)
+    if keyboard is None:
+        keyboard = await build()
+        keyboards.keyboard_cache.set(key, keyboard)
+    return keyboard
+
+# Orders the full catalog lists can be paged in; page buttons from before sorting existed list A-Z.
+LIST_SORTS = (SORT_NAME, SORT_NEWEST, SORT_ADDED, SORT_RECENT, SORT_CATALOG)
+DEFAULT_LIST_SORT = SORT_NAME
+
+def _page_args(prefix: str, data: str) -> Tuple[int, str]:
+    fields = cb.decode(prefix, data)
+    sort = fields[1] if len(fields) > 1 and fields[1] in LIST_SORTS else DEFAULT_LIST_SORT
+    return int(fields[0]), sort
+
+async def _catalog_page(kind: str, page: int, sort: str) -> Tuple[str, Optional[InlineKeyboardMarkup]]:
+    """Text and keyboard of one page of all movies or series in a sort order; no keyboard if it's empty."""
+    async def build():
+        render = keyboards.movie_list_keyboard if kind == MOVIES else keyboards.series_list_keyboard
+        items, total = await async_db.list_titles(kind, page, keyboards.LIST_PAGE_SIZE, sort)
+        return render(items, total, page=page, sort=sort) if total else None
+    label = "movies" if kind == MOVIES else "series"
+    text = f"🆕 New {label} (Page {page+1}):" if sort == SORT_RECENT else f"Displaying {label} (Page {page+1}):"
+    return text, await _page_keyboard((kind, sort, page), build)
+
+async def _years_keyboard(page: int = 0) -> InlineKeyboardMarkup:
+    async def build():
+        return keyboards.year_selection_keyboard(await async_db.get_all_unique_years(), page=page)
+    return await _page_keyboard(("years", page), build)
+
+async def _categories_keyboard(page: int = 0) -> InlineKeyboardMarkup:
+    async def build():
+        return keyboards.category_selection_keyboard(await async_db.get_all_unique_categories(), page=page)
+    return await _page_keyboard(("categories", page), build)
 
 # --- HANDLERS (Triggered by Reply Keyboard or Commands) ---
 
 async def show_all_movies(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    movies = db_handler.get_all_movies()
-    if not movies: await update.message.reply_text("ℹ️ No movies have been added yet."); return
-    await update.message.reply_text("Displaying movies (Page 1):", reply_markup=keyboards.movie_list_keyboard(movies, page=0))
+    text, keyboard = await _catalog_page(MOVIES, 0, DEFAULT_LIST_SORT)
+    if not keyboard: await update.message.reply_text("ℹ️ No movies have been added yet."); return
+    await update.message.reply_text(text, reply_markup=keyboard)
 
 async def show_all_series(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    series = db_handler.get_all_series()
-    if not series: await update.message.reply_text("ℹ️ No series have been added yet."); return
-    await update.message.reply_text("Displaying series (Page 1):", reply_markup=keyboards.series_list_keyboard(series, page=0))
+    text, keyboard = await _catalog_page(SERIES, 0, DEFAULT_LIST_SORT)
+    if not keyboard: await update.message.reply_text("ℹ️ No series have been added yet."); return
+    await update.message.reply_text(text, reply_markup=keyboard)
+
+async def show_new(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Entry point of the "recently added" view: how many new movies and series there are."""
+    counts = await async_db.recent_counts()
+    if not any(counts.values()): await update.message.reply_text("ℹ️ Nothing has been added yet."); return
+    await update.message.reply_text("🆕 Recently added:", reply_markup=keyboards.new_content_type_keyboard(counts))
 
 async def show_browse_by_year(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    await update.message.reply_text("Select a year to browse:", reply_markup=keyboards.year_selection_keyboard())
+    await update.message.reply_text("Select a year to browse:", reply_markup=await _years_keyboard())
 
 async def show_browse_by_category(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Sends the first page of the category selection menu."""
-    await update.message.reply_text("Select a category to browse:", reply_markup=keyboards.category_selection_keyboard(page=0))
+    await update.message.reply_text("Select a category to browse:", reply_markup=await _categories_keyboard())
 
 # --- CALLBACK HANDLERS (Triggered by Inline Buttons) ---
 
@@ -118,101 +173,128 @@ async def handle_back_to_main(update: Update, context: ContextTypes.DEFAULT_TYPE
 async def back_to_year_selection(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    await query.edit_message_text("Select a year to browse:", reply_markup=keyboards.year_selection_keyboard())
+    await query.edit_message_text("Select a year to browse:", reply_markup=await _years_keyboard())
 
 async def movie_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.replace(const.CALLBACK_MOVIE_PAGE, ""))
-    movies = db_handler.get_all_movies()
-    await query.edit_message_text(f"Displaying movies (Page {page+1}):", reply_markup=keyboards.movie_list_keyboard(movies, page=page))
+    page, sort = _page_args(const.CALLBACK_MOVIE_PAGE, query.data)
+    text, keyboard = await _catalog_page(MOVIES, page, sort)
+    await query.edit_message_text(text if keyboard else "ℹ️ No movies have been added yet.", reply_markup=keyboard)
 
 async def series_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.replace(const.CALLBACK_SERIES_PAGE, ""))
-    series = db_handler.get_all_series()
-    await query.edit_message_text(f"Displaying series (Page {page+1}):", reply_markup=keyboards.series_list_keyboard(series, page=page))
+    page, sort = _page_args(const.CALLBACK_SERIES_PAGE, query.data)
+    text, keyboard = await _catalog_page(SERIES, page, sort)
+    await query.edit_message_text(text if keyboard else "ℹ️ No series have been added yet.", reply_markup=keyboard)
+
+async def new_content_type_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    query = update.callback_query
+    await query.answer()
+    kind = MOVIES if cb.decode(const.CALLBACK_NEW_CONTENT_TYPE, query.data)[0] == "movies" else SERIES
+    text, keyboard = await _catalog_page(kind, 0, SORT_RECENT)
+    try: await query.edit_message_text(text if keyboard else f"ℹ️ No new {kind} yet.", reply_markup=keyboard)
+    except BadRequest as e:
+        if "Message is not modified" not in str(e): logger.warning(f"Error on new content type handler: {e}")
+
+async def list_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Pages through a stored result list (search, year or category) by its cursor token."""
+    query = update.callback_query
+    token, page = cb.decode(const.CALLBACK_LIST_PAGE, query.data)
+    page = int(page)
+    result = cursor_store.page(token, page, keyboards.LIST_PAGE_SIZE)
+    if result is None:
+        await query.answer("⌛ This list has expired. Please search or browse again.", show_alert=True)
+        return
+    await query.answer()
+    async def build():
+        records = await async_db.find_many_by_ids(result['kind'], result['ids'])
+        render = keyboards.movie_list_keyboard if result['kind'] == MOVIES else keyboards.series_list_keyboard
+        return render(records, result['total'], page=page, cursor=token)
+    keyboard = await _page_keyboard((result['kind'], token, page), build)
+    try: await query.edit_message_text(f"{result['title']} (Page {page+1}):", reply_markup=keyboard)
+    except BadRequest as e:
+        if "Message is not modified" not in str(e): logger.warning(f"Error on list page handler: {e}")
 
 async def year_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.split('_')[-1])
-    try: await query.edit_message_reply_markup(reply_markup=keyboards.year_selection_keyboard(page=page))
+    page = int(cb.decode(const.CALLBACK_YEAR_PAGE, query.data)[0])
+    try: await query.edit_message_reply_markup(reply_markup=await _years_keyboard(page))
     except BadRequest as e:
         if "Message is not modified" not in str(e): logger.warning(f"Error on year page handler: {e}")
 
 async def year_select_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    year = int(query.data.split('_')[-1])
-    try: await query.edit_message_text(f"What would you like to see from {year}?", reply_markup=keyboards.year_content_type_keyboard(year))
+    year = int(cb.decode(const.CALLBACK_YEAR_SELECT, query.data)[0])
+    counts = await async_db.facet_counts(year=year)
+    try: await query.edit_message_text(f"What would you like to see from {year}?", reply_markup=keyboards.year_content_type_keyboard(year, counts))
     except BadRequest as e:
         if "Message is not modified" not in str(e): logger.warning(f"Error on year select handler: {e}")
 
 async def year_content_type_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    parts = query.data.split('_')
-    year, content_type = int(parts[-2]), parts[-1]
+    year, content_type = cb.decode(const.CALLBACK_YEAR_CONTENT_TYPE, query.data)
+    year = int(year)
     try:
         if content_type == "movies":
-            content = [m for m in db_handler.get_all_movies() if m.get('year') == year]
-            if not content: await query.edit_message_text(f"No movies found for {year}.", reply_markup=keyboards.year_content_type_keyboard(year)); return
-            await query.edit_message_text(f"Movies from {year}:", reply_markup=keyboards.movie_list_keyboard(content))
+            ids = await async_db.facet_ids(MOVIES, year=year)
+            if not ids: await query.edit_message_text(f"No movies found for {year}.", reply_markup=keyboards.year_content_type_keyboard(year)); return
+            await query.edit_message_text(f"Movies from {year}:", reply_markup=await id_list_keyboard(MOVIES, ids, f"Movies from {year}"))
         else:
-            content = [s for s in db_handler.get_all_series() if s.get('year') == year]
-            if not content: await query.edit_message_text(f"No series found for {year}.", reply_markup=keyboards.year_content_type_keyboard(year)); return
-            await query.edit_message_text(f"Series from {year}:", reply_markup=keyboards.series_list_keyboard(content))
+            ids = await async_db.facet_ids(SERIES, year=year)
+            if not ids: await query.edit_message_text(f"No series found for {year}.", reply_markup=keyboards.year_content_type_keyboard(year)); return
+            await query.edit_message_text(f"Series from {year}:", reply_markup=await id_list_keyboard(SERIES, ids, f"Series from {year}"))
     except BadRequest as e:
         if "Message is not modified" not in str(e): logger.warning(f"Error on year content type handler: {e}")
 
 async def category_page_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    page = int(query.data.replace(const.CALLBACK_CATEGORY_PAGE, ""))
-    await query.edit_message_reply_markup(reply_markup=keyboards.category_selection_keyboard(page=page))
+    page = int(cb.decode(const.CALLBACK_CATEGORY_PAGE, query.data)[0])
+    await query.edit_message_reply_markup(reply_markup=await _categories_keyboard(page))
 
 async def category_select_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    category = query.data.replace(const.CALLBACK_CATEGORY_SELECT, "")
-    await query.edit_message_text(f"What would you like to see from the '{category}' category?", reply_markup=keyboards.category_content_type_keyboard(category))
+    category = cb.category_name(cb.decode(const.CALLBACK_CATEGORY_SELECT, query.data)[0])
+    counts = await async_db.facet_counts(categories=[category])
+    await query.edit_message_text(f"What would you like to see from the '{category}' category?", reply_markup=keyboards.category_content_type_keyboard(category, counts))
 
 async def category_content_type_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    parts = query.data.replace(const.CALLBACK_CATEGORY_CONTENT_TYPE, "").split('_')
-    category, content_type = parts[0], parts[1]
+    category_ref, content_type = cb.decode(const.CALLBACK_CATEGORY_CONTENT_TYPE, query.data)
+    category = cb.category_name(category_ref)
     
     if content_type == "movies":
-        content = [m for m in db_handler.get_all_movies() if category in m.get('categories', [])]
-        if not content:
+        ids = await async_db.facet_ids(MOVIES, categories=[category])
+        if not ids:
             await query.edit_message_text(f"No movies found in the '{category}' category.", reply_markup=keyboards.category_content_type_keyboard(category)); return
-        await query.edit_message_text(f"Movies in '{category}':", reply_markup=keyboards.movie_list_keyboard(content))
+        await query.edit_message_text(f"Movies in '{category}':", reply_markup=await id_list_keyboard(MOVIES, ids, f"Movies in '{category}'"))
     else: # series
-        content = [s for s in db_handler.get_all_series() if category in s.get('categories', [])]
-        if not content:
+        ids = await async_db.facet_ids(SERIES, categories=[category])
+        if not ids:
             await query.edit_message_text(f"No series found in the '{category}' category.", reply_markup=keyboards.category_content_type_keyboard(category)); return
-        await query.edit_message_text(f"Series in '{category}':", reply_markup=keyboards.series_list_keyboard(content))
+        await query.edit_message_text(f"Series in '{category}':", reply_markup=await id_list_keyboard(SERIES, ids, f"Series in '{category}'"))
 
 async def movie_select_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    movie_id = query.data.replace(const.CALLBACK_MOVIE_SELECT, "")
-    movie = db_handler.find_movie_by_id(movie_id)
+    movie_id = cb.movie_id(cb.decode(const.CALLBACK_MOVIE_SELECT, query.data)[0])
+    movie = await async_db.find_movie_by_id(movie_id)
     if not movie: await query.edit_message_text("❌ Movie not found."); return
     await query.delete_message()
-    safe_name = escape_markdown(movie['name'], version=2)
-    caption = rf"🎬 *{safe_name}* `({movie['year']})`"
-    photo_message = await query.message.reply_photo(photo=movie['cover_photo'], caption=caption, parse_mode=ParseMode.MARKDOWN_V2)
-    await _send_movie_files(context, query.message.chat_id, movie, photo_message.message_id)
+    await _send_movie(context, query.message.chat_id, movie)
 
 async def series_select_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    series_id = query.data.replace(const.CALLBACK_SERIES_SELECT, "")
-    series = db_handler.find_series_by_id(series_id)
+    series_id = cb.series_id(cb.decode(const.CALLBACK_SERIES_SELECT, query.data)[0])
+    series = await async_db.find_series_by_id(series_id)
     if not series: await query.edit_message_text("❌ Series not found."); return
     await query.delete_message()
     
@@ -227,9 +309,9 @@ async def series_select_handler(update: Update, context: ContextTypes.DEFAULT_TY
 async def season_select_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    data_parts = query.data.replace(const.CALLBACK_SEASON_SELECT, "").split('_')
-    series_id, season_num = data_parts[0], data_parts[1]
-    series = db_handler.find_series_by_id(series_id)
+    series_ref, season_num = cb.decode(const.CALLBACK_SEASON_SELECT, query.data)
+    series_id = cb.series_id(series_ref)
+    series = await async_db.find_series_by_id(series_id)
     if not series or season_num not in series['seasons']: await query.edit_message_text("❌ Season not found."); return
     photo_message_id = context.user_data.get(f"photo_msg_{series_id}")
     await query.edit_message_reply_markup(reply_markup=None)
@@ -245,21 +327,19 @@ async def season_select_handler(update: Update, context: ContextTypes.DEFAULT_TY
 async def reget_movie_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    movie_id = query.data.replace(const.CALLBACK_REGET_MOVIE, "")
-    movie = db_handler.find_movie_by_id(movie_id)
+    movie_id = cb.movie_id(cb.decode(const.CALLBACK_REGET_MOVIE, query.data)[0])
+    movie = await async_db.find_movie_by_id(movie_id)
     if not movie: await query.edit_message_text("❌ This movie seems to have been removed."); return
     safe_name = escape_markdown(movie['name'], version=2)
     text = rf"Re\-sending files for *{safe_name}*\.\.\."
     await query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN_V2)
-    caption = rf"🎬 *{safe_name}* `({movie['year']})`"
-    photo_message = await query.message.reply_photo(photo=movie['cover_photo'], caption=caption, parse_mode=ParseMode.MARKDOWN_V2)
-    await _send_movie_files(context, query.message.chat_id, movie, photo_message.message_id)
+    await _send_movie(context, query.message.chat_id, movie)
 
 async def reget_series_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     query = update.callback_query
     await query.answer()
-    series_id = query.data.replace(const.CALLBACK_REGET_SERIES, "")
-    series = db_handler.find_series_by_id(series_id)
+    series_id = cb.series_id(cb.decode(const.CALLBACK_REGET_SERIES, query.data)[0])
+    series = await async_db.find_series_by_id(series_id)
     if not series: await query.edit_message_text("❌ This series seems to have been removed."); return
     
     # Apply MarkdownV2 escaping for the text message
@@ -269,21 +349,29 @@ async def reget_series_handler(update: Update, context: ContextTypes.DEFAULT_TYP
 
     await query.edit_message_text(text, parse_mode=ParseMode.MARKDOWN_V2, reply_markup=keyboards.series_season_keyboard(series))
 
-browsing_handlers = [
-    CallbackQueryHandler(handle_back_to_main, pattern="^back_to_main_menu$"),
-    CallbackQueryHandler(back_to_year_selection, pattern="^browse_year_from_callback$"),
-    CallbackQueryHandler(show_browse_by_category, pattern="^browse_category_from_callback$"),
-    CallbackQueryHandler(movie_page_handler, pattern=f"^{const.CALLBACK_MOVIE_PAGE}"),
-    CallbackQueryHandler(series_page_handler, pattern=f"^{const.CALLBACK_SERIES_PAGE}"),
-    CallbackQueryHandler(year_page_handler, pattern=f"^{const.CALLBACK_YEAR_PAGE}"),
-    CallbackQueryHandler(category_page_handler, pattern=f"^{const.CALLBACK_CATEGORY_PAGE}"),
-    CallbackQueryHandler(year_select_handler, pattern=f"^{const.CALLBACK_YEAR_SELECT}"),
-    CallbackQueryHandler(category_select_handler, pattern=f"^{const.CALLBACK_CATEGORY_SELECT}"),
-    CallbackQueryHandler(year_content_type_handler, pattern=f"^{const.CALLBACK_YEAR_CONTENT_TYPE}"),
-    CallbackQueryHandler(category_content_type_handler, pattern=f"^{const.CALLBACK_CATEGORY_CONTENT_TYPE}"),
-    CallbackQueryHandler(movie_select_handler, pattern=f"^{const.CALLBACK_MOVIE_SELECT}"),
-    CallbackQueryHandler(series_select_handler, pattern=f"^{const.CALLBACK_SERIES_SELECT}"),
-    CallbackQueryHandler(season_select_handler, pattern=f"^{const.CALLBACK_SEASON_SELECT}"),
-    CallbackQueryHandler(reget_movie_handler, pattern=f"^{const.CALLBACK_REGET_MOVIE}"),
-    CallbackQueryHandler(reget_series_handler, pattern=f"^{const.CALLBACK_REGET_SERIES}"),
-]
\ No newline at end of file
+async def no_op_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Label-only buttons (the current sort, "No content available yet."): just stop the client's spinner."""
+    await update.callback_query.answer()
+
+browsing_routes = (
+    CallbackRouter()
+    .exact(const.CALLBACK_NO_OP, no_op_handler)
+    .exact(const.CALLBACK_BACK_TO_MAIN, handle_back_to_main)
+    .exact(const.CALLBACK_BROWSE_YEAR, back_to_year_selection)
+    .exact(const.CALLBACK_BROWSE_CATEGORY, show_browse_by_category)
+    .prefix(const.CALLBACK_MOVIE_PAGE, movie_page_handler)
+    .prefix(const.CALLBACK_SERIES_PAGE, series_page_handler)
+    .prefix(const.CALLBACK_LIST_PAGE, list_page_handler)
+    .prefix(const.CALLBACK_NEW_CONTENT_TYPE, new_content_type_handler)
+    .prefix(const.CALLBACK_YEAR_PAGE, year_page_handler)
+    .prefix(const.CALLBACK_CATEGORY_PAGE, category_page_handler)
+    .prefix(const.CALLBACK_YEAR_SELECT, year_select_handler)
+    .prefix(const.CALLBACK_CATEGORY_SELECT, category_select_handler)
+    .prefix(const.CALLBACK_YEAR_CONTENT_TYPE, year_content_type_handler)
+    .prefix(const.CALLBACK_CATEGORY_CONTENT_TYPE, category_content_type_handler)
+    .prefix(const.CALLBACK_MOVIE_SELECT, movie_select_handler)
+    .prefix(const.CALLBACK_SERIES_SELECT, series_select_handler)
+    .prefix(const.CALLBACK_SEASON_SELECT, season_select_handler)
+    .prefix(const.CALLBACK_REGET_MOVIE, reget_movie_handler)
+    .prefix(const.CALLBACK_REGET_SERIES, reget_series_handler)
+)
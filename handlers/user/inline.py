@@ -0,0 +1,75 @@
+# handlers/user/inline.py
+import logging
+from typing import Dict, List, Tuple
+from telegram import Update, InlineQueryResultArticle, InputTextMessageContent, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, InlineQueryHandler
+from database import async_db
+from database.storage import MOVIES, SERIES
+from utils.text import normalize
+from .search import search_cache
+from .start import deeplink_payload
+
+logger = logging.getLogger(__name__)
+
+# Telegram shows at most 50 results per answer; the client asks for more with `offset`.
+INLINE_PAGE_SIZE = 50
+
+# Seconds Telegram may serve an answer from its own cache. Answers are not personal, so
+# one cached answer serves every user typing the same query. Broad one- and two-letter
+# prefixes change least when a title is added; misses are kept short so new titles show up.
+CACHE_TIME_SHORT_PREFIX = 30 * 60
+CACHE_TIME_DEFAULT = 5 * 60
+CACHE_TIME_NO_RESULTS = 60
+
+def _cache_time(query: str, total: int) -> int:
+    if not total:
+        return CACHE_TIME_NO_RESULTS
+    return CACHE_TIME_SHORT_PREFIX if len(query) <= 2 else CACHE_TIME_DEFAULT
+
+async def _matches(query: str) -> List[Tuple[str, str]]:
+    """Ranked (kind, id) prefix matches, shared with the other search caches."""
+    search_cache.sync_version(await async_db.get_catalog_version())
+    key = ("inline", query)
+    matches = search_cache.get(key)
+    if matches is None:
+        matches = await async_db.prefix_search(query)
+        search_cache.set(key, matches)
+    return matches
+
+def _result(kind: str, record: Dict, bot_username: str) -> InlineQueryResultArticle:
+    icon = "🎬" if kind == MOVIES else "📺"
+    link = f"https://t.me/{bot_username}?start={deeplink_payload(kind, record['id'])}"
+    return InlineQueryResultArticle(
+        id=f"{kind[0]}{record['id'].replace('-', '')}",
+        title=f"{icon} {record['name']}",
+        description=" · ".join([str(record.get('year', ''))] + list(record.get('categories') or [])),
+        input_message_content=InputTextMessageContent(f"{icon} {record['name']} ({record.get('year', '')})"),
+        reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("⚜️ ဒီကိုနှိပ်ပြီး ဇာတ်ကားရယူပါ ⚜️", url=link)]]),
+    )
+
+async def inline_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Answers @bot queries with title prefix matches; each result links into the /start deep link flow."""
+    inline_query = update.inline_query
+    query = normalize(inline_query.query)
+    if not query:
+        await inline_query.answer([], cache_time=CACHE_TIME_SHORT_PREFIX)
+        return
+
+    matches = await _matches(query)
+    offset = int(inline_query.offset) if inline_query.offset.isdigit() else 0
+    page = matches[offset:offset + INLINE_PAGE_SIZE]
+
+    # Resolve the page with one lookup per kind, then restore the ranked order.
+    records = {}
+    for kind in (MOVIES, SERIES):
+        ids = [record_id for record_kind, record_id in page if record_kind == kind]
+        if ids:
+            records.update({(kind, record['id']): record for record in await async_db.find_many_by_ids(kind, ids)})
+    results = [_result(kind, records[(kind, record_id)], context.bot.username) for kind, record_id in page if (kind, record_id) in records]
+
+    next_offset = str(offset + INLINE_PAGE_SIZE) if offset + INLINE_PAGE_SIZE < len(matches) else ""
+    await inline_query.answer(
+        results, cache_time=_cache_time(query, len(matches)), is_personal=False, next_offset=next_offset
+    )
+
+inline_search_handler = InlineQueryHandler(inline_search)
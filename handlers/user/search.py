@@ -1,51 +1,133 @@
 # handlers/user/search.py
 import logging
-import asyncio
-from telegram import Update
+from typing import List, Dict, Any, NamedTuple, Optional
+from telegram import Update, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, CommandHandler, MessageHandler, filters
-from database import db_handler
-from keyboards.inline import movie_list_keyboard, series_list_keyboard
+from database import async_db
+from database.storage import MOVIES, SERIES
+from utils.cache import LRUCache
+from utils.cursors import cursor_store
+from utils.text import normalize
+from .browsing import list_keyboard, id_list_keyboard
 
 logger = logging.getLogger(__name__)
 
+# Results (ids + rendered first page + cursor token) per (mode, kind, normalized query),
+# dropped whenever the catalog version changes.
+search_cache = LRUCache(maxsize=2048, ttl=15 * 60)
+
+# Generic text is checked before any catalog work: too short, no letters/digits at all,
+# or (per the catalog's Bloom filter) unable to match any title even fuzzily.
+MIN_QUERY_LENGTH = 2
+prefilter_stats = {"checked": 0, "too_short": 0, "no_letters": 0, "impossible": 0}
+
+class SearchResult(NamedTuple):
+    ids: List[str]
+    keyboard: Optional[InlineKeyboardMarkup]
+    cursor: Optional[str] = None
+
+async def _cached_search(kind: str, query: str, fuzzy: bool = False) -> SearchResult:
+    """Exact (or, with fuzzy=True, 'did you mean') results for a normalized query, via the cache."""
+    search_cache.sync_version(await async_db.get_catalog_version())
+    key = ("suggest" if fuzzy else "exact", kind, query)
+    result = search_cache.get(key)
+    # A cached keyboard is only usable while the cursor behind its Next button is alive.
+    if result is None or (result.cursor and cursor_store.get(result.cursor) is None):
+        if kind == MOVIES:
+            records = await (async_db.suggest_movies(query) if fuzzy else async_db.search_movies(query))
+        else:
+            records = await (async_db.suggest_series(query) if fuzzy else async_db.search_series(query))
+        keyboard, cursor = list_keyboard(kind, records, f"🔎 Results for '{query}'") if records else (None, None)
+        result = SearchResult([record['id'] for record in records], keyboard, cursor)
+        search_cache.set(key, result)
+    return result
+
+async def _prefilter(query: str) -> Optional[str]:
+    """Why a generic text query was rejected, or None if it is worth searching."""
+    prefilter_stats["checked"] += 1
+    if len(query.replace(" ", "")) < MIN_QUERY_LENGTH:
+        reason = "too_short"
+    elif not any(char.isalnum() for char in query):
+        reason = "no_letters"
+    elif not await async_db.could_match(query):
+        reason = "impossible"
+    else:
+        return None
+    prefilter_stats[reason] += 1
+    return reason
+
+def prefilter_rejection_rate() -> float:
+    rejected = prefilter_stats["too_short"] + prefilter_stats["no_letters"] + prefilter_stats["impossible"]
+    return rejected / prefilter_stats["checked"] if prefilter_stats["checked"] else 0.0
+
 async def search_movie(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles the /mv command to search for movies."""
-    query = " ".join(context.args).lower()
+    query = normalize(" ".join(context.args))
     if not query:
         await update.effective_message.reply_text("❌ Please provide a movie name. Example: `/mv inception`")
         return
 
-    all_movies = db_handler.get_all_movies()
-    results = [movie for movie in all_movies if query in movie['name'].lower()]
+    results = await _cached_search(MOVIES, query)
 
-    if not results:
+    if not results.ids:
+        suggestions = await _cached_search(MOVIES, query, fuzzy=True)
+        if suggestions.ids:
+            await update.effective_message.reply_text(
+                f"🤔 No exact match for '{query}'. Did you mean:",
+                reply_markup=suggestions.keyboard
+            )
+            return
         await update.effective_message.reply_text(f"❌ No movies found matching '{query}'.")
         return
 
     await update.effective_message.reply_text(
-        f"🔎 Found {len(results)} movie(s) matching your search:",
-        reply_markup=movie_list_keyboard(results)
+        f"🔎 Found {len(results.ids)} movie(s) matching your search:",
+        reply_markup=results.keyboard
     )
 
 async def search_series(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handles the /sr command to search for series."""
-    query = " ".join(context.args).lower()
+    query = normalize(" ".join(context.args))
     if not query:
         await update.effective_message.reply_text("❌ Please provide a series name. Example: `/sr game of thrones`")
         return
 
-    all_series = db_handler.get_all_series()
-    results = [series for series in all_series if query in series['name'].lower()]
+    results = await _cached_search(SERIES, query)
 
-    if not results:
+    if not results.ids:
+        suggestions = await _cached_search(SERIES, query, fuzzy=True)
+        if suggestions.ids:
+            await update.effective_message.reply_text(
+                f"🤔 No exact match for '{query}'. Did you mean:",
+                reply_markup=suggestions.keyboard
+            )
+            return
         await update.effective_message.reply_text(f"❌ No series found matching '{query}'.")
         return
 
     await update.effective_message.reply_text(
-        f"🔎 Found {len(results)} series matching your search:",
-        reply_markup=series_list_keyboard(results)
+        f"🔎 Found {len(results.ids)} series matching your search:",
+        reply_markup=results.keyboard
     )
 
+async def _reply_facet_results(update: Update, query: str, facet_query: Dict[str, Any]):
+    """Answers queries like "action 2023" or "comedy series" straight from the facet index."""
+    kinds = [facet_query['kind']] if facet_query['kind'] else [MOVIES, SERIES]
+    found_anything = False
+    for kind in kinds:
+        ids = await async_db.facet_ids(kind, year=facet_query['year'], categories=facet_query['categories'])
+        if not ids:
+            continue
+        label, title = ("movie(s)", "Movies") if kind == MOVIES else ("series", "Series")
+        await update.effective_message.reply_text(
+            f"🗂 Found {len(ids)} {label} for '{query}':",
+            reply_markup=await id_list_keyboard(kind, ids, f"🗂 {title} for '{query}'")
+        )
+        found_anything = True
+
+    if not found_anything:
+        await update.effective_message.reply_text(f"❌ No movies or series found matching '{query}'.")
+
 async def generic_text_search(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Handles generic text messages, attempting to search for movies or series.
@@ -54,34 +136,48 @@ async def generic_text_search(update: Update, context: ContextTypes.DEFAULT_TYPE
     if not update.message or not update.message.text:
         return
 
-    query = update.message.text.strip().lower()
+    query = normalize(update.message.text)
 
     if not query:
         return
 
+    # Year/category/type queries ("action 2023") are answered from the facet index, but only
+    # when no title matches, so titles like "1917" or "Action" stay findable.
+    facet_query = await async_db.parse_facet_query(query)
+
+    # The pre-filter only skips the index lookups; the user still gets the usual answer.
+    if not facet_query and await _prefilter(query):
+        await update.effective_message.reply_text(f"❌ No movies or series found matching '{query}'.")
+        return
+
     logger.info(f"User {update.effective_user.id} performing generic search for: '{query}'")
 
-    all_movies = db_handler.get_all_movies()
-    movie_results = [movie for movie in all_movies if query in movie['name'].lower()]
+    movie_results = await _cached_search(MOVIES, query)
+    series_results = await _cached_search(SERIES, query)
+    header = "🔎 Found {count} {label} matching '{query}':"
 
-    all_series = db_handler.get_all_series()
-    series_results = [series for series in all_series if query in series['name'].lower()]
+    if not movie_results.ids and not series_results.ids:
+        if facet_query:
+            await _reply_facet_results(update, query, facet_query)
+            return
+        # Only fall back to fuzzy suggestions when neither kind has an exact hit.
+        movie_results = await _cached_search(MOVIES, query, fuzzy=True)
+        series_results = await _cached_search(SERIES, query, fuzzy=True)
+        header = "🤔 Did you mean one of these {label}?"
 
     found_anything = False
 
-    if movie_results:
+    if movie_results.ids:
         await update.effective_message.reply_text(
-            f"🔎 Found {len(movie_results)} movie(s) matching '{query}':",
-            reply_markup=movie_list_keyboard(movie_results)
+            header.format(count=len(movie_results.ids), label="movie(s)", query=query),
+            reply_markup=movie_results.keyboard
         )
         found_anything = True
 
-    if series_results:
-        if found_anything:
-            await asyncio.sleep(0.5)
+    if series_results.ids:
         await update.effective_message.reply_text(
-            f"🔎 Found {len(series_results)} series matching '{query}':",
-            reply_markup=series_list_keyboard(series_results)
+            header.format(count=len(series_results.ids), label="series", query=query),
+            reply_markup=series_results.keyboard
         )
         found_anything = True
 
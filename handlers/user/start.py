@@ -1,18 +1,45 @@
 # handlers/user/start.py
 import logging
+from typing import Any, Dict, Optional, Tuple
 from telegram import Update
 from telegram.ext import ContextTypes, CommandHandler
 from telegram.constants import ParseMode
 from telegram.helpers import escape_markdown
 from keyboards.reply import main_reply_keyboard
 from keyboards.inline import deeplink_retrieval_keyboard, series_season_keyboard
-from database import db_handler
+from database import async_db
+from database.storage import MOVIES
+from utils import constants as const
+from utils import callbacks as cb
 
-# Import the helper functions for sending files
-from .browsing import _send_movie_files, _send_series_season_files
+# Import the helper function for sending files
+from .browsing import _send_movie
 
 logger = logging.getLogger(__name__)
 
+def deeplink_payload(kind: str, record_id: str) -> str:
+    """/start payload pointing at a title by id; Telegram only allows [A-Za-z0-9_-] there."""
+    prefix = const.DEEPLINK_MOVIE_ID if kind == MOVIES else const.DEEPLINK_SERIES_ID
+    return prefix + record_id.replace("-", "")
+
+async def _resolve_deeplink(payload: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+    """('movie' | 'series', record or None) for a /start payload, or (None, None) if it isn't a deep link."""
+    if payload.startswith(const.DEEPLINK_MOVIE_ID) or payload.startswith(const.DEEPLINK_SERIES_ID):
+        is_movie = payload.startswith(const.DEEPLINK_MOVIE_ID)
+        record_id = payload.split("_", 1)[1]
+        if len(record_id) == 32:
+            # Restore the uuid dashes stripped by deeplink_payload().
+            record_id = "-".join((record_id[:8], record_id[8:12], record_id[12:16], record_id[16:20], record_id[20:]))
+        if is_movie:
+            return 'movie', await async_db.find_movie_by_id(record_id)
+        return 'series', await async_db.find_series_by_id(record_id)
+    elif payload.startswith(const.DEEPLINK_MOVIE):
+        # Replace underscores back with spaces for the search
+        return 'movie', await async_db.find_movie_by_name(payload.replace(const.DEEPLINK_MOVIE, "", 1).replace("_", " "))
+    elif payload.startswith(const.DEEPLINK_SERIES):
+        return 'series', await async_db.find_series_by_name(payload.replace(const.DEEPLINK_SERIES, "", 1).replace("_", " "))
+    return None, None
+
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """
     Handles the /start command. It now also processes deep links.
@@ -21,33 +48,17 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     if context.args:
         # A deep link was used, e.g., /start mv_Inception
         payload = context.args[0]
-        
-        if payload.startswith("mv_"):
-            # This is a movie deep link
-            movie_name_encoded = payload.replace("mv_", "", 1)
-            # Replace underscores back with spaces for the search
-            movie_name = movie_name_encoded.replace("_", " ")
-            
-            # Show intermediate message with button
-            await update.effective_message.reply_text(
-                "⚜️ ဇာတ်ကားရပါပြီ ⚜️\n\n"
-                "‼️ ဇာတ်ကားကြည့်ရန် ချန်နယ်ကို အရင် join ပါ\n\n"
-                "https://t.me/schannel666",
-                reply_markup=deeplink_retrieval_keyboard('movie', movie_name)
-            )
-            return # Stop further execution
-
-        elif payload.startswith("sr_"):
-            # This is a series deep link
-            series_name_encoded = payload.replace("sr_", "", 1)
-            series_name = series_name_encoded.replace("_", " ")
-
+        content_type, content = await _resolve_deeplink(payload)
+        if content_type and not content:
+            await update.effective_message.reply_text("❌ Movie not found." if content_type == 'movie' else "❌ Series not found.")
+            return
+        if content_type:
             # Show intermediate message with button
             await update.effective_message.reply_text(
                 "⚜️ ဇာတ်ကားရပါပြီ ⚜️\n\n"
                 "‼️ ဇာတ်ကားကြည့်ရန် ချန်နယ်ကို အရင် join ပါ\n\n"
                 "https://t.me/schannel666",
-                reply_markup=deeplink_retrieval_keyboard('series', series_name)
+                reply_markup=deeplink_retrieval_keyboard(content_type, content['id'])
             )
             return # Stop further execution
 
@@ -79,6 +90,8 @@ Use the buttons at the bottom of the screen to browse content\.
 🔹 `/sr <name>` \- Search for a series\.
    *Example: `/sr breaking bad`*
 
+🔹 `/new` \- See what was added recently\.
+
 Enjoy free access to all movies and series\!
 """
     await update.effective_message.reply_text(
@@ -95,12 +108,10 @@ async def deeplink_retrieval_callback(update: Update, context: ContextTypes.DEFA
     callback_data = query.data
     
     # Determine if it's a movie or series
-    if callback_data.startswith("deeplink_movie_"):
-        movie_name = callback_data.replace("deeplink_movie_", "")
-        
-        # Search for the movie by name
-        all_movies = db_handler.get_all_movies()
-        movie = next((m for m in all_movies if m['name'].lower() == movie_name.lower()), None)
+    if callback_data.startswith(const.CALLBACK_DEEPLINK_MOVIE):
+        movie_id = cb.movie_id(cb.decode(const.CALLBACK_DEEPLINK_MOVIE, callback_data)[0])
+        # Buttons sent before short ids carry the movie's name instead.
+        movie = await async_db.find_movie_by_id(movie_id) or await async_db.find_movie_by_name(callback_data.replace(const.CALLBACK_DEEPLINK_MOVIE, "", 1))
         
         if not movie:
             await query.edit_message_text("❌ Movie not found.")
@@ -110,21 +121,11 @@ async def deeplink_retrieval_callback(update: Update, context: ContextTypes.DEFA
         await query.delete_message()
         
         # Send the movie directly (like movie_select_handler does)
-        safe_name = escape_markdown(movie['name'], version=2)
-        caption = rf"🎬 *{safe_name}* `({movie['year']})`"
-        photo_message = await query.message.reply_photo(
-            photo=movie['cover_photo'], 
-            caption=caption, 
-            parse_mode=ParseMode.MARKDOWN_V2
-        )
-        await _send_movie_files(context, query.message.chat_id, movie, photo_message.message_id)
-        
-    elif callback_data.startswith("deeplink_series_"):
-        series_name = callback_data.replace("deeplink_series_", "")
+        await _send_movie(context, query.message.chat_id, movie)
         
-        # Search for the series by name
-        all_series = db_handler.get_all_series()
-        series = next((s for s in all_series if s['name'].lower() == series_name.lower()), None)
+    elif callback_data.startswith(const.CALLBACK_DEEPLINK_SERIES):
+        series_id = cb.series_id(cb.decode(const.CALLBACK_DEEPLINK_SERIES, callback_data)[0])
+        series = await async_db.find_series_by_id(series_id) or await async_db.find_series_by_name(callback_data.replace(const.CALLBACK_DEEPLINK_SERIES, "", 1))
         
         if not series:
             await query.edit_message_text("❌ Series not found.")
@@ -1,9 +1,59 @@
 # keyboards/inline.py
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
-from database import db_handler
 from utils import constants as const
-from typing import List, Dict, Any
+from utils import callbacks as cb
+from typing import List, Dict, Any, Optional, Tuple, Callable, Hashable
+from functools import lru_cache, wraps
+from utils.cache import LRUCache
+from database.indexes import SORT_NEWEST
+from database.orderings import SORT_NAME, SORT_ADDED, SORT_RECENT
+from database.storage import MOVIES
 
+LIST_PAGE_SIZE = 10
+
+# Rendered keyboards, bounded. InlineKeyboardMarkup is immutable, so one instance can be sent
+# any number of times. Keys start with the view name; views built from arguments are keyed by
+# what they render, list pages and the year/category menus by (view, filter, page, catalog
+# version) from the handlers, so a cache hit doesn't need the list itself.
+KEYBOARD_CACHE_SIZE = 1024
+keyboard_cache = LRUCache(maxsize=KEYBOARD_CACHE_SIZE)
+
+def _memoized(view: str, key: Callable[..., Hashable]):
+    """Serves a keyboard builder from keyboard_cache under (view, key(*args))."""
+    def decorate(build):
+        @wraps(build)
+        def wrapper(*args, **kwargs):
+            cache_key = (view, key(*args, **kwargs))
+            keyboard = keyboard_cache.get(cache_key)
+            if keyboard is None:
+                keyboard = build(*args, **kwargs)
+                keyboard_cache.set(cache_key, keyboard)
+            return keyboard
+        return wrapper
+    return decorate
+
+def _counts_key(counts: Optional[Dict[str, int]]) -> Optional[Tuple]:
+    return tuple(sorted(counts.items())) if counts is not None else None
+
+def _list_page_callback(page_prefix: str, cursor: Optional[str], page: int, sort: Optional[str] = None) -> str:
+    # Lists backed by a stored cursor page through it; the full catalog lists keep their own prefix.
+    if cursor:
+        return cb.encode(const.CALLBACK_LIST_PAGE, cursor, page)
+    if sort:
+        return cb.encode(page_prefix, page, sort)
+    return cb.encode(page_prefix, page)
+
+# Sort buttons under the full catalog lists.
+SORT_BUTTONS = [(SORT_NAME, "🔤 A-Z"), (SORT_NEWEST, "🗓 Year"), (SORT_ADDED, "🕒 Added")]
+
+def _sort_row(page_prefix: str, sort: str) -> List[InlineKeyboardButton]:
+    return [
+        InlineKeyboardButton(f"✅ {label}", callback_data=const.CALLBACK_NO_OP) if option == sort
+        else InlineKeyboardButton(label, callback_data=cb.encode(page_prefix, 0, option))
+        for option, label in SORT_BUTTONS
+    ]
+
+@lru_cache(maxsize=None)
 def admin_panel_keyboard() -> InlineKeyboardMarkup:
     keyboard = [
         [
@@ -24,13 +74,12 @@ def admin_panel_keyboard() -> InlineKeyboardMarkup:
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def category_selection_keyboard(page: int = 0) -> InlineKeyboardMarkup:
+def category_selection_keyboard(categories: List[str], page: int = 0) -> InlineKeyboardMarkup:
     """Generates a paginated keyboard for browsing content by category."""
-    categories = db_handler.get_all_unique_categories()
     if not categories:
         keyboard = [
-            [InlineKeyboardButton("No categories available yet.", callback_data="no_op")],
-            [InlineKeyboardButton("🔙 Back", callback_data="back_to_main_menu")]
+            [InlineKeyboardButton("No categories available yet.", callback_data=const.CALLBACK_NO_OP)],
+            [InlineKeyboardButton("🔙 Back", callback_data=const.CALLBACK_BACK_TO_MAIN)]
         ]
         return InlineKeyboardMarkup(keyboard)
 
@@ -42,39 +91,45 @@ def category_selection_keyboard(page: int = 0) -> InlineKeyboardMarkup:
     # Create 2 columns
     for i in range(0, len(paginated_categories), 2):
         row = [
-            InlineKeyboardButton(cat, callback_data=f"{const.CALLBACK_CATEGORY_SELECT}{cat}")
+            InlineKeyboardButton(cat, callback_data=cb.encode(const.CALLBACK_CATEGORY_SELECT, cb.category_ref(cat)))
             for cat in paginated_categories[i:i+2]
         ]
         keyboard.append(row)
     
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"{const.CALLBACK_CATEGORY_PAGE}{page-1}"))
+        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=cb.encode(const.CALLBACK_CATEGORY_PAGE, page-1)))
     if end < len(categories):
-        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"{const.CALLBACK_CATEGORY_PAGE}{page+1}"))
+        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=cb.encode(const.CALLBACK_CATEGORY_PAGE, page+1)))
     if nav_buttons:
         keyboard.append(nav_buttons)
 
-    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="back_to_main_menu")])
+    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data=const.CALLBACK_BACK_TO_MAIN)])
     return InlineKeyboardMarkup(keyboard)
 
-def category_content_type_keyboard(category: str) -> InlineKeyboardMarkup:
-    """Asks the user to choose between Movies or Series for a specific category."""
+def _content_type_labels(counts: Optional[Dict[str, int]]) -> Tuple[str, str]:
+    if counts is None:
+        return "🎬 Movies", "📺 Series"
+    return f"🎬 Movies ({counts.get('movies', 0)})", f"📺 Series ({counts.get('series', 0)})"
+
+@_memoized("category_types", lambda category, counts=None: (category, _counts_key(counts)))
+def category_content_type_keyboard(category: str, counts: Optional[Dict[str, int]] = None) -> InlineKeyboardMarkup:
+    """Asks the user to choose between Movies or Series for a specific category, optionally with counts."""
+    movies_label, series_label = _content_type_labels(counts)
     keyboard = [
         [
-            InlineKeyboardButton("🎬 Movies", callback_data=f"{const.CALLBACK_CATEGORY_CONTENT_TYPE}{category}_movies"),
-            InlineKeyboardButton("📺 Series", callback_data=f"{const.CALLBACK_CATEGORY_CONTENT_TYPE}{category}_series"),
+            InlineKeyboardButton(movies_label, callback_data=cb.encode(const.CALLBACK_CATEGORY_CONTENT_TYPE, cb.category_ref(category), "movies")),
+            InlineKeyboardButton(series_label, callback_data=cb.encode(const.CALLBACK_CATEGORY_CONTENT_TYPE, cb.category_ref(category), "series")),
         ],
-        [InlineKeyboardButton("🔙 Back to Category Selection", callback_data="browse_category_from_callback")]
+        [InlineKeyboardButton("🔙 Back to Category Selection", callback_data=const.CALLBACK_BROWSE_CATEGORY)]
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def year_selection_keyboard(page: int = 0) -> InlineKeyboardMarkup:
-    years = db_handler.get_all_unique_years()
+def year_selection_keyboard(years: List[int], page: int = 0) -> InlineKeyboardMarkup:
     if not years:
         keyboard = [
-            [InlineKeyboardButton("No content available yet.", callback_data="no_op")],
-            [InlineKeyboardButton("🔙 Back", callback_data="back_to_main_menu")]
+            [InlineKeyboardButton("No content available yet.", callback_data=const.CALLBACK_NO_OP)],
+            [InlineKeyboardButton("🔙 Back", callback_data=const.CALLBACK_BACK_TO_MAIN)]
         ]
         return InlineKeyboardMarkup(keyboard)
 
@@ -84,103 +139,148 @@ def year_selection_keyboard(page: int = 0) -> InlineKeyboardMarkup:
     keyboard = []
     for i in range(0, len(paginated_years), 2):
         row = [
-            InlineKeyboardButton(str(year), callback_data=f"{const.CALLBACK_YEAR_SELECT}{year}")
+            InlineKeyboardButton(str(year), callback_data=cb.encode(const.CALLBACK_YEAR_SELECT, year))
             for year in paginated_years[i:i+2]
         ]
         keyboard.append(row)
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"{const.CALLBACK_YEAR_PAGE}{page-1}"))
+        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=cb.encode(const.CALLBACK_YEAR_PAGE, page-1)))
     if end < len(years):
-        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"{const.CALLBACK_YEAR_PAGE}{page+1}"))
+        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=cb.encode(const.CALLBACK_YEAR_PAGE, page+1)))
     if nav_buttons:
         keyboard.append(nav_buttons)
-    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="back_to_main_menu")])
+    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data=const.CALLBACK_BACK_TO_MAIN)])
+    return InlineKeyboardMarkup(keyboard)
+
+@_memoized("new_types", lambda counts: _counts_key(counts))
+def new_content_type_keyboard(counts: Dict[str, int]) -> InlineKeyboardMarkup:
+    """Movies or Series for the "recently added" view, with how many of each are new."""
+    movies_label, series_label = _content_type_labels(counts)
+    keyboard = [[
+        InlineKeyboardButton(movies_label, callback_data=cb.encode(const.CALLBACK_NEW_CONTENT_TYPE, "movies")),
+        InlineKeyboardButton(series_label, callback_data=cb.encode(const.CALLBACK_NEW_CONTENT_TYPE, "series")),
+    ]]
     return InlineKeyboardMarkup(keyboard)
 
-def year_content_type_keyboard(year: int) -> InlineKeyboardMarkup:
+@_memoized("year_types", lambda year, counts=None: (year, _counts_key(counts)))
+def year_content_type_keyboard(year: int, counts: Optional[Dict[str, int]] = None) -> InlineKeyboardMarkup:
+    movies_label, series_label = _content_type_labels(counts)
     keyboard = [
         [
-            InlineKeyboardButton("🎬 Movies", callback_data=f"{const.CALLBACK_YEAR_CONTENT_TYPE}{year}_movies"),
-            InlineKeyboardButton("📺 Series", callback_data=f"{const.CALLBACK_YEAR_CONTENT_TYPE}{year}_series"),
+            InlineKeyboardButton(movies_label, callback_data=cb.encode(const.CALLBACK_YEAR_CONTENT_TYPE, year, "movies")),
+            InlineKeyboardButton(series_label, callback_data=cb.encode(const.CALLBACK_YEAR_CONTENT_TYPE, year, "series")),
         ],
-        [InlineKeyboardButton("🔙 Back to Year Selection", callback_data="browse_year_from_callback")]
+        [InlineKeyboardButton("🔙 Back to Year Selection", callback_data=const.CALLBACK_BROWSE_YEAR)]
     ]
     return InlineKeyboardMarkup(keyboard)
 
-def movie_list_keyboard(movies: List[Dict[str, Any]], page: int = 0) -> InlineKeyboardMarkup:
-    per_page = 10
-    start, end = page * per_page, (page + 1) * per_page
-    paginated_movies = movies[start:end]
+def movie_list_keyboard(movies: List[Dict[str, Any]], total: int, page: int = 0, cursor: Optional[str] = None, sort: Optional[str] = None) -> InlineKeyboardMarkup:
+    """
+    One page of a movie list: `movies` is the page itself and `total` the length of the
+    whole list. Pass `cursor` for lists stored in the cursor store, or the `sort` of a
+    full catalog list; sortable lists get a row of sort buttons.
+    """
+    end = (page + 1) * LIST_PAGE_SIZE
     keyboard = [
-        [InlineKeyboardButton(f"🎬 {movie['name']} ({movie['year']})", callback_data=f"{const.CALLBACK_MOVIE_SELECT}{movie['id']}")]
-        for movie in paginated_movies
+        [InlineKeyboardButton(f"🎬 {movie['name']} ({movie['year']})", callback_data=cb.encode(const.CALLBACK_MOVIE_SELECT, cb.movie_ref(movie['id'])))]
+        for movie in movies
     ]
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"{const.CALLBACK_MOVIE_PAGE}{page-1}"))
-    if end < len(movies):
-        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"{const.CALLBACK_MOVIE_PAGE}{page+1}"))
+        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=_list_page_callback(const.CALLBACK_MOVIE_PAGE, cursor, page - 1, sort)))
+    if end < total:
+        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=_list_page_callback(const.CALLBACK_MOVIE_PAGE, cursor, page + 1, sort)))
     if nav_buttons:
         keyboard.append(nav_buttons)
-    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="back_to_main_menu")])
+    if sort and sort != SORT_RECENT:
+        keyboard.append(_sort_row(const.CALLBACK_MOVIE_PAGE, sort))
+    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data=const.CALLBACK_BACK_TO_MAIN)])
     return InlineKeyboardMarkup(keyboard)
 
-def series_list_keyboard(series_list: List[Dict[str, Any]], page: int = 0) -> InlineKeyboardMarkup:
-    per_page = 10
-    start, end = page * per_page, (page + 1) * per_page
-    paginated_series = series_list[start:end]
+def series_list_keyboard(series_list: List[Dict[str, Any]], total: int, page: int = 0, cursor: Optional[str] = None, sort: Optional[str] = None) -> InlineKeyboardMarkup:
+    """One page of a series list; arguments work as in movie_list_keyboard."""
+    end = (page + 1) * LIST_PAGE_SIZE
     keyboard = [
-        [InlineKeyboardButton(f"📺 {series['name']} ({series['year']})", callback_data=f"{const.CALLBACK_SERIES_SELECT}{series['id']}")]
-        for series in paginated_series
+        [InlineKeyboardButton(f"📺 {series['name']} ({series['year']})", callback_data=cb.encode(const.CALLBACK_SERIES_SELECT, cb.series_ref(series['id'])))]
+        for series in series_list
     ]
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"{const.CALLBACK_SERIES_PAGE}{page-1}"))
-    if end < len(series_list):
-        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"{const.CALLBACK_SERIES_PAGE}{page+1}"))
+        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=_list_page_callback(const.CALLBACK_SERIES_PAGE, cursor, page - 1, sort)))
+    if end < total:
+        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=_list_page_callback(const.CALLBACK_SERIES_PAGE, cursor, page + 1, sort)))
     if nav_buttons:
         keyboard.append(nav_buttons)
-    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data="back_to_main_menu")])
+    if sort and sort != SORT_RECENT:
+        keyboard.append(_sort_row(const.CALLBACK_SERIES_PAGE, sort))
+    keyboard.append([InlineKeyboardButton("🔙 Back", callback_data=const.CALLBACK_BACK_TO_MAIN)])
     return InlineKeyboardMarkup(keyboard)
     
+@_memoized("seasons", lambda series: (series['id'], tuple(series['seasons'])))
 def series_season_keyboard(series: Dict[str, Any]) -> InlineKeyboardMarkup:
     keyboard = [
-        [InlineKeyboardButton(f"Season {season_num}", callback_data=f"{const.CALLBACK_SEASON_SELECT}{series['id']}_{season_num}")]
+        [InlineKeyboardButton(f"Season {season_num}", callback_data=cb.encode(const.CALLBACK_SEASON_SELECT, cb.series_ref(series['id']), season_num))]
         for season_num in sorted(series['seasons'].keys(), key=int)
     ]
     return InlineKeyboardMarkup(keyboard)
 
 def get_file_again_keyboard(content_type: str, content_id: str) -> InlineKeyboardMarkup:
-    callback_data = f"{const.CALLBACK_REGET_MOVIE}{content_id}" if content_type == 'movie' else f"{const.CALLBACK_REGET_SERIES}{content_id}"
+    if content_type == 'movie':
+        callback_data = cb.encode(const.CALLBACK_REGET_MOVIE, cb.movie_ref(content_id))
+    else:
+        callback_data = cb.encode(const.CALLBACK_REGET_SERIES, cb.series_ref(content_id))
     keyboard = [[InlineKeyboardButton("🔁 GET FILE AGAIN!", callback_data=callback_data)]]
     return InlineKeyboardMarkup(keyboard)
 
+@lru_cache(maxsize=None)
 def cancel_keyboard() -> InlineKeyboardMarkup:
     keyboard = [[InlineKeyboardButton("🔙 Cancel", callback_data=const.CALLBACK_ADMIN_CANCEL)]]
     return InlineKeyboardMarkup(keyboard)
 
-def deeplink_retrieval_keyboard(content_type: str, content_name: str) -> InlineKeyboardMarkup:
+def deeplink_retrieval_keyboard(content_type: str, content_id: str) -> InlineKeyboardMarkup:
     """Creates a keyboard for deep link content retrieval with Burmese text."""
-    callback_prefix = const.CALLBACK_DEEPLINK_MOVIE if content_type == 'movie' else const.CALLBACK_DEEPLINK_SERIES
-    callback_data = f"{callback_prefix}{content_name}"
+    if content_type == 'movie':
+        callback_data = cb.encode(const.CALLBACK_DEEPLINK_MOVIE, cb.movie_ref(content_id))
+    else:
+        callback_data = cb.encode(const.CALLBACK_DEEPLINK_SERIES, cb.series_ref(content_id))
     keyboard = [[InlineKeyboardButton("⚜️ ဒီကိုနှိပ်ပြီး ဇာတ်ကားရယူပါ ⚜️", callback_data=callback_data)]]
     return InlineKeyboardMarkup(keyboard)
 
-def edit_series_list_keyboard(series_list: List[Dict[str, Any]], page: int = 0) -> InlineKeyboardMarkup:
-    """Paginated keyboard for selecting a series to edit."""
-    per_page = 10
-    start, end = page * per_page, (page + 1) * per_page
-    paginated_series = series_list[start:end]
+def edit_series_list_keyboard(series_list: List[Dict[str, Any]], total: int, page: int = 0) -> InlineKeyboardMarkup:
+    """One page of the series to pick from for editing; `series_list` is the page itself."""
+    end = (page + 1) * LIST_PAGE_SIZE
+    keyboard = [
+        [InlineKeyboardButton(f"📝 {series['name']} ({series['year']})", callback_data=cb.encode(const.CALLBACK_EDIT_SERIES_SELECT, cb.series_ref(series['id'])))]
+        for series in series_list
+    ]
+    nav_buttons = []
+    if page > 0:
+        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=cb.encode(const.CALLBACK_EDIT_SERIES_PAGE, page-1)))
+    if end < total:
+        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=cb.encode(const.CALLBACK_EDIT_SERIES_PAGE, page+1)))
+    if nav_buttons:
+        keyboard.append(nav_buttons)
+    keyboard.append([InlineKeyboardButton("🔙 Back to Admin Panel", callback_data=const.CALLBACK_ADMIN_CANCEL)])
+    return InlineKeyboardMarkup(keyboard)
+
+def admin_title_list_keyboard(kind: str, items: List[Dict[str, Any]], total: int, page: int, delete: bool) -> InlineKeyboardMarkup:
+    """One page of the movies or series to pick from for deleting (or else renaming); `items` is the page itself."""
+    end = (page + 1) * LIST_PAGE_SIZE
+    if kind == MOVIES:
+        select_prefix, ref = (const.CALLBACK_DELETE_MOVIE if delete else const.CALLBACK_RENAME_MOVIE), cb.movie_ref
+    else:
+        select_prefix, ref = (const.CALLBACK_DELETE_SERIES if delete else const.CALLBACK_RENAME_SERIES), cb.series_ref
+    page_prefix = const.CALLBACK_DELETE_PAGE if delete else const.CALLBACK_RENAME_PAGE
     keyboard = [
-        [InlineKeyboardButton(f"📝 {series['name']} ({series['year']})", callback_data=f"{const.CALLBACK_EDIT_SERIES_SELECT}{series['id']}")]
-        for series in paginated_series
+        [InlineKeyboardButton(f"{'❌' if delete else '✏️'} {item['name']}", callback_data=cb.encode(select_prefix, ref(item['id'])))]
+        for item in items
     ]
     nav_buttons = []
     if page > 0:
-        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=f"{const.CALLBACK_EDIT_SERIES_PAGE}{page-1}"))
-    if end < len(series_list):
-        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=f"{const.CALLBACK_EDIT_SERIES_PAGE}{page+1}"))
+        nav_buttons.append(InlineKeyboardButton("⬅️ Prev", callback_data=cb.encode(page_prefix, kind, page-1)))
+    if end < total:
+        nav_buttons.append(InlineKeyboardButton("Next ➡️", callback_data=cb.encode(page_prefix, kind, page+1)))
     if nav_buttons:
         keyboard.append(nav_buttons)
     keyboard.append([InlineKeyboardButton("🔙 Back to Admin Panel", callback_data=const.CALLBACK_ADMIN_CANCEL)])
@@ -189,12 +289,13 @@ def edit_series_list_keyboard(series_list: List[Dict[str, Any]], page: int = 0)
 def edit_season_selection_keyboard(series: Dict[str, Any]) -> InlineKeyboardMarkup:
     """Keyboard for selecting a season to edit."""
     keyboard = [
-        [InlineKeyboardButton(f"Season {season_num} ({len(episodes)} episodes)", callback_data=f"{const.CALLBACK_EDIT_SEASON_SELECT}{series['id']}_{season_num}")]
+        [InlineKeyboardButton(f"Season {season_num} ({len(episodes)} episodes)", callback_data=cb.encode(const.CALLBACK_EDIT_SEASON_SELECT, cb.series_ref(series['id']), season_num))]
         for season_num, episodes in sorted(series['seasons'].items(), key=lambda x: int(x[0]))
     ]
     keyboard.append([InlineKeyboardButton("🔙 Back to Series List", callback_data=const.CALLBACK_ADMIN_EDIT_SERIES)])
     return InlineKeyboardMarkup(keyboard)
 
+@lru_cache(maxsize=None)
 def edit_action_keyboard() -> InlineKeyboardMarkup:
     """Keyboard for choosing to add or remove episodes."""
     keyboard = [
@@ -207,7 +308,7 @@ def edit_action_keyboard() -> InlineKeyboardMarkup:
 def remove_episode_keyboard(series_id: str, season_num: str, episodes: List[str]) -> InlineKeyboardMarkup:
     """Keyboard for selecting episodes to remove."""
     keyboard = [
-        [InlineKeyboardButton(f"❌ Episode {i+1}", callback_data=f"{const.CALLBACK_REMOVE_EPISODE}{series_id}_{season_num}_{i}")]
+        [InlineKeyboardButton(f"❌ Episode {i+1}", callback_data=cb.encode(const.CALLBACK_REMOVE_EPISODE, cb.series_ref(series_id), season_num, i))]
         for i in range(len(episodes))
     ]
     keyboard.append([InlineKeyboardButton("✅ Done", callback_data=const.CALLBACK_ADMIN_EDIT_SERIES)])
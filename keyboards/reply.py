@@ -1,22 +1,30 @@
 # keyboards/reply.py
 
+from functools import lru_cache
 from telegram import ReplyKeyboardMarkup, KeyboardButton, ReplyKeyboardRemove
 import config
 
+# Markups are immutable, so the static ones are built once and shared.
+_REMOVE_KEYBOARD = ReplyKeyboardRemove()
+
 def main_reply_keyboard(user_id: int = None) -> ReplyKeyboardMarkup:
     """Creates the main persistent reply keyboard. Only shows for admins."""
     # If user is not an admin, return an empty keyboard (hide buttons)
     if user_id is None or user_id not in config.ADMIN_IDS:
-        return ReplyKeyboardRemove()
-    
+        return _REMOVE_KEYBOARD
+    return _admin_reply_keyboard()
+
+@lru_cache(maxsize=None)
+def _admin_reply_keyboard() -> ReplyKeyboardMarkup:
     # Admin keyboard with all options
     keyboard = [
         ["🎬 All Movies", "📺 All Series"],
         ["🗓 Browse by Year", "📚 Browse by Category"],
-        ["❓ Help & FAQ"]
+        ["🆕 New", "❓ Help & FAQ"]
     ]
     return ReplyKeyboardMarkup(keyboard, resize_keyboard=True)
 
+@lru_cache(maxsize=None)
 def done_uploading_reply_keyboard() -> ReplyKeyboardMarkup:
     """Creates a temporary reply keyboard with a 'Done' button for the admin."""
     keyboard = [
@@ -1,11 +1,12 @@
 # middleware.py
 import logging
-from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup, InlineQueryResultsButton
 from telegram.ext import ContextTypes
 from telegram.error import TelegramError, BadRequest
 from telegram.constants import ParseMode, ChatMemberStatus
 from telegram.helpers import escape_markdown
 import config
+from utils import constants as const
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +35,15 @@ async def force_join_middleware(update: Update, context: ContextTypes.DEFAULT_TY
             pass
         else:
             logger.error(f"BOT PERMISSION ERROR in {config.FORCE_JOIN_CHANNEL}: {e}. Bot must be an admin.")
+            if update.inline_query:
+                # No message to reply to, and an inline query can only be answered once, so answer it here.
+                await update.inline_query.answer(
+                    [], cache_time=0, is_personal=True,
+                    button=InlineQueryResultsButton(text="⚠️ Technical issue, please notify an admin", start_parameter="start")
+                )
+                return False
+            if not update.effective_message:
+                return True
             # Ensure this reply is also MarkdownV2 safe if it contains any special chars
             await update.effective_message.reply_text(
                 escape_markdown("Sorry, the bot is experiencing a technical issue. Please notify an admin.", version=2), 
@@ -46,6 +56,11 @@ async def force_join_middleware(update: Update, context: ContextTypes.DEFAULT_TY
     
     # --- If all checks fail, the user is not a member. Block them. ---
     logger.info(f"User {user.id} denied access: Not a member of {config.FORCE_JOIN_CHANNEL}.")
+
+    if update.inline_query:
+        # Inline queries have no chat to reply in; just show no results.
+        await update.inline_query.answer([], cache_time=0, is_personal=True)
+        return False
     
     join_url = f"https://t.me/{config.FORCE_JOIN_CHANNEL.lstrip('@')}"
     
@@ -60,7 +75,7 @@ async def force_join_middleware(update: Update, context: ContextTypes.DEFAULT_TY
 
     keyboard = InlineKeyboardMarkup([
         [InlineKeyboardButton("➡️ Join Channel | Channel သို့ Join ပါ", url=join_url)],
-        [InlineKeyboardButton("✅ I Have Joined | Join ပြီးပါပြီ", callback_data="check_join_status")]
+        [InlineKeyboardButton("✅ I Have Joined | Join ပြီးပါပြီ", callback_data=const.CALLBACK_CHECK_JOIN)]
     ])
     
     if update.callback_query:
@@ -0,0 +1,50 @@
+# tests/catalog_changes.py
+"""Random catalog edits, for checking that indexes patched by add/remove match rebuilt ones."""
+from database.storage import KINDS
+
+WORDS = ["star", "wars", "love", "night", "dark", "river", "blue", "king"]
+CATEGORIES = ["Action", "Drama", "Comedy", "Sci-Fi"]
+QUERIES = ["star", "st", "night", "dark river", "lov", "king blue", "wras", "nigth kin"]
+
+
+def make_record(rng, record_id, added_at):
+    return {
+        "id": record_id,
+        "name": " ".join(rng.sample(WORDS, rng.randint(1, 3))),
+        "year": rng.choice([2000, 2001, 2002, 2003, None]),
+        "categories": rng.sample(CATEGORIES, rng.randint(0, 2)),
+        "added_at": added_at,
+    }
+
+
+def apply_random_changes(rng, indexes, steps=300):
+    """Adds, updates and deletes titles, patching `indexes`; returns the resulting catalog."""
+    catalog = {kind: {} for kind in KINDS}
+    for step in range(steps):
+        kind = rng.choice(KINDS)
+        records = catalog[kind]
+        action = rng.random()
+        if action < 0.5 or not records:
+            record = make_record(rng, f"{kind}-{step}", step)
+            records[record["id"]] = record
+            for index in indexes:
+                index.add(kind, dict(record))
+        elif action < 0.8:
+            record_id = rng.choice(list(records))
+            changes = make_record(rng, record_id, records[record_id]["added_at"])
+            del changes["id"], changes["added_at"]
+            records[record_id].update(rng.sample(sorted(changes.items()), rng.randint(1, len(changes))))
+            for index in indexes:
+                index.add(kind, dict(records[record_id]))
+        else:
+            record_id = rng.choice(list(records))
+            del records[record_id]
+            for index in indexes:
+                index.remove(kind, record_id)
+    return {kind: list(records.values()) for kind, records in catalog.items()}
+
+
+def rebuild_from(index_class, catalogs):
+    index = index_class()
+    index.rebuild(catalogs)
+    return index
@@ -0,0 +1,15 @@
+# tests/conftest.py
+import os
+import random
+import sys
+
+import pytest
+
+# The bot runs from the repository root, so its modules import as top-level packages.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture(params=[1, 2, 3])
+def rng(request):
+    """A seeded Random; tests using it run once per seed."""
+    return random.Random(request.param)
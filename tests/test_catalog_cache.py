@@ -0,0 +1,74 @@
+# tests/test_catalog_cache.py
+"""JsonStorage keeps one parsed copy of each catalog until its files change on disk."""
+import json
+import os
+
+import pytest
+
+from database import storage as storage_module
+from database.storage import JsonStorage, MOVIES, SERIES
+
+
+@pytest.fixture
+def paths(tmp_path):
+    return {MOVIES: str(tmp_path / "movies_db.json"), SERIES: str(tmp_path / "series_db.json")}
+
+
+@pytest.fixture
+def parses(monkeypatch):
+    """Counts how often a catalog file is parsed."""
+    calls = []
+    real_load = json.load
+
+    def counting_load(f, *args, **kwargs):
+        calls.append(f.name)
+        return real_load(f, *args, **kwargs)
+
+    monkeypatch.setattr(storage_module.json, "load", counting_load)
+    return calls
+
+
+def _edit_externally(path, records):
+    stamp = os.stat(path).st_mtime_ns
+    with open(path, "w") as f:
+        json.dump(records, f)
+    # Make sure the edit is visible even on filesystems with coarse timestamps.
+    os.utime(path, ns=(stamp + 1_000_000_000, stamp + 1_000_000_000))
+
+
+def test_reads_reuse_the_parsed_catalog(paths, parses):
+    storage = JsonStorage(paths)
+    storage.insert(MOVIES, {"id": "a", "name": "Alpha"})
+    version = storage.version()
+    parsed = len(parses)
+
+    for _ in range(3):
+        assert storage.get(MOVIES, "a")["name"] == "Alpha"
+        assert [record["id"] for record in storage.load_all(MOVIES)] == ["a"]
+    assert storage.version() == version
+    assert len(parses) == parsed
+
+
+def test_external_edits_are_picked_up(paths):
+    storage = JsonStorage(paths)
+    storage.insert(MOVIES, {"id": "a", "name": "Alpha"})
+    storage.compact(MOVIES)
+    version = storage.version()
+
+    _edit_externally(paths[MOVIES], [{"id": "b", "name": "Beta"}])
+
+    assert [record["id"] for record in storage.load_all(MOVIES)] == ["b"]
+    assert storage.version() > version
+
+
+def test_invalidate_forces_a_reload(paths, parses):
+    storage = JsonStorage(paths)
+    storage.load_all(MOVIES)
+    version = storage.version()
+    parsed = len(parses)
+
+    storage.invalidate()
+
+    assert storage.load_all(MOVIES) == []
+    assert len(parses) == parsed + 1
+    assert storage.version() > version
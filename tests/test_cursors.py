@@ -0,0 +1,53 @@
+# tests/test_cursors.py
+from utils import cursors
+from utils.cursors import CursorStore
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_pages_are_slices_of_the_stored_ids():
+    store = CursorStore()
+    ids = [f"m{i}" for i in range(23)]
+    token = store.create("movies", ids, "Results for 'star'")
+    ids.append("changed later")
+
+    assert len(token) == 8
+    assert store.page(token, 0, 10) == {"kind": "movies", "title": "Results for 'star'", "ids": ids[:10], "total": 23}
+    assert store.page(token, 2, 10)["ids"] == ["m20", "m21", "m22"]
+    assert store.page(token, 5, 10)["ids"] == []
+    assert store.page("unknown", 0, 10) is None
+
+
+def test_cursors_expire_unless_used(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(cursors, "time", clock)
+    store = CursorStore(ttl=60)
+    used = store.create("movies", ["a"], "used")
+    idle = store.create("series", ["b"], "idle")
+
+    clock.now += 50
+    assert store.get(used) is not None
+    clock.now += 50
+
+    assert store.get(used)["title"] == "used"
+    assert store.get(idle) is None
+
+
+def test_least_recently_used_cursors_are_evicted_at_either_cap():
+    store = CursorStore(max_cursors=2, max_ids=5)
+    first = store.create("movies", ["a", "b"], "first")
+    second = store.create("movies", ["c"], "second")
+    store.get(first)
+    third = store.create("movies", ["d"], "third")  # over max_cursors: `second` is least recently used
+    assert store.get(second) is None
+    assert store.get(first) is not None and store.get(third) is not None
+
+    big = store.create("movies", list("efghij"), "big")  # over max_ids, but the newest cursor always stays
+    assert [store.get(token) for token in (first, third)] == [None, None]
+    assert store.page(big, 0, 10)["total"] == 6
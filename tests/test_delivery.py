@@ -0,0 +1,115 @@
+# tests/test_delivery.py
+import asyncio
+from datetime import timedelta
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from telegram import InputMediaPhoto, InputMediaVideo
+from telegram.error import BadRequest, Forbidden, NetworkError, RetryAfter, TimedOut
+
+from utils import delivery
+from utils.delivery import deliver
+
+
+class FakeBot:
+    """Records sends; `failures` maps a media file id (or "album") to the errors its next sends raise."""
+
+    def __init__(self, failures=None):
+        self.failures = {key: list(errors) for key, errors in (failures or {}).items()}
+        self.sent = []
+        self._next_id = 0
+
+    def _message(self):
+        self._next_id += 1
+        return SimpleNamespace(message_id=self._next_id)
+
+    async def _send(self, chat_id, key, sent):
+        await asyncio.sleep(0)
+        errors = self.failures.get(key)
+        if errors:
+            raise errors.pop(0)
+        self.sent.append((chat_id, sent))
+
+    async def send_media_group(self, chat_id, media, rate_limit_args=None):
+        await self._send(chat_id, "album", [item.media for item in media])
+        return [self._message() for _ in media]
+
+    async def send_photo(self, chat_id, photo, caption=None, parse_mode=None, rate_limit_args=None):
+        await self._send(chat_id, photo, photo)
+        return self._message()
+
+    async def send_video(self, chat_id, video, caption=None, parse_mode=None, rate_limit_args=None):
+        await self._send(chat_id, video, video)
+        return self._message()
+
+
+def _media(count):
+    return [InputMediaPhoto("poster")] + [InputMediaVideo(f"ep{i}") for i in range(1, count)]
+
+
+def _not_sent():
+    error = NetworkError("connect failed")
+    error.__cause__ = httpx.ConnectError("refused")
+    return error
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(delivery, "RETRY_BACKOFF", 0)
+    monkeypatch.setattr(delivery.config, "ALBUM_DELIVERY", True)
+
+
+def test_items_go_out_in_albums_of_ten():
+    bot = FakeBot()
+    report = asyncio.run(deliver(bot, 1, _media(23)))
+
+    assert [len(sent) for _, sent in bot.sent] == [10, 10, 3]
+    assert bot.sent[0][1][:2] == ["poster", "ep1"]
+    assert report.message_ids == list(range(1, 24)) and report.failed == []
+
+
+def test_a_rejected_album_falls_back_to_single_sends():
+    bot = FakeBot({"album": [BadRequest("wrong file id")], "ep2": [BadRequest("wrong file id")]})
+    report = asyncio.run(deliver(bot, 1, _media(4)))
+
+    assert [sent for _, sent in bot.sent] == ["poster", "ep1", "ep3"]
+    assert report.failed == [2] and len(report.message_ids) == 3
+
+
+def test_a_blocked_chat_stops_the_delivery():
+    bot = FakeBot({"album": [BadRequest("wrong file id")], "ep1": [Forbidden("bot was blocked by the user")]})
+    report = asyncio.run(deliver(bot, 1, _media(15)))
+
+    assert [sent for _, sent in bot.sent] == ["poster"]
+    assert report.unreachable and report.failed == list(range(1, 15))
+
+
+def test_only_requests_that_never_went_out_are_retried():
+    bot = FakeBot({"album": [_not_sent(), _not_sent()]})
+    assert asyncio.run(deliver(bot, 1, _media(3))).failed == []
+    assert len(bot.sent) == 1
+
+    # The album may have arrived despite the timeout, and flood waits belong to the scheduler.
+    for error in (TimedOut(), RetryAfter(timedelta(seconds=5))):
+        bot = FakeBot({"album": [error]})
+        report = asyncio.run(deliver(bot, 1, _media(3)))
+        assert bot.sent == [] and report.failed == [0, 1, 2]
+
+
+def test_deliveries_to_one_chat_take_turns_but_other_chats_do_not_wait(monkeypatch):
+    async def scenario():
+        bot = FakeBot()
+        await asyncio.gather(
+            deliver(bot, 1, [InputMediaVideo(f"a{i}") for i in range(3)]),
+            deliver(bot, 1, [InputMediaVideo(f"b{i}") for i in range(3)]),
+            deliver(bot, 2, [InputMediaVideo(f"c{i}") for i in range(3)]),
+        )
+        return bot.sent
+
+    monkeypatch.setattr(delivery.config, "ALBUM_DELIVERY", False)
+    sent = asyncio.run(scenario())
+    assert [media for chat, media in sent if chat == 1] == ["a0", "a1", "a2", "b0", "b1", "b2"]
+    # Chat 2 was served while chat 1's first delivery was still going.
+    assert sent.index((2, "c0")) < sent.index((1, "a2"))
+    assert delivery._chat_turns == {}
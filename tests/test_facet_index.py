@@ -0,0 +1,51 @@
+# tests/test_facet_index.py
+from catalog_changes import apply_random_changes, rebuild_from
+from database.indexes import FacetIndex, SORT_CATALOG, SORT_NEWEST
+from database.storage import KINDS, MOVIES, SERIES
+
+
+def test_facets_match_a_rebuilt_index(rng):
+    patched = FacetIndex()
+    catalogs = apply_random_changes(rng, [patched])
+    rebuilt = rebuild_from(FacetIndex, catalogs)
+
+    assert patched.years() == rebuilt.years()
+    assert patched.categories() == rebuilt.categories()
+    for kind in KINDS:
+        assert patched.ids(kind) == [record["id"] for record in catalogs[kind]]
+        for year in [None, 2000, 2003]:
+            for categories in [None, ["Action"], ["Drama", "Comedy"]]:
+                expected = [
+                    record["id"] for record in catalogs[kind]
+                    if (year is None or record["year"] == year)
+                    and all(category in record["categories"] for category in categories or [])
+                ]
+                assert patched.ids(kind, year=year, categories=categories) == expected
+                for sort in (SORT_CATALOG, SORT_NEWEST):
+                    assert patched.page(kind, 3, 7, year=year, categories=categories, sort=sort) == \
+                        rebuilt.page(kind, 3, 7, year=year, categories=categories, sort=sort)
+    assert patched.counts(year=2001) == rebuilt.counts(year=2001)
+
+
+def test_newest_first_pages_put_undated_titles_last():
+    index = FacetIndex()
+    index.rebuild({MOVIES: [
+        {"id": "old", "year": 1999}, {"id": "undated"}, {"id": "new", "year": 2020}, {"id": "mid", "year": 2005},
+    ], SERIES: []})
+
+    assert index.page(MOVIES, 0, 10, sort=SORT_NEWEST) == (["new", "mid", "old", "undated"], 4)
+    assert index.page(MOVIES, 1, 2, sort=SORT_NEWEST) == (["mid", "old"], 4)
+    assert index.page(MOVIES, 0, 2) == (["old", "undated"], 4)
+
+
+def test_parse_query():
+    index = FacetIndex()
+    index.rebuild({MOVIES: [{"id": "a", "year": 2023, "categories": ["Action", "Science Fiction"]}], SERIES: []})
+
+    assert index.parse_query("action 2023") == {"kind": None, "year": 2023, "categories": ["Action"]}
+    assert index.parse_query("science fiction movies") == {"kind": MOVIES, "year": None, "categories": ["Science Fiction"]}
+    assert index.parse_query("2023 movies") == {"kind": MOVIES, "year": 2023, "categories": []}
+    # A bare year is searched as a title ("1917", "2012"), as is anything with an unknown word.
+    assert index.parse_query("2023") is None
+    assert index.parse_query("action hero") is None
+    assert index.parse_query("movies") is None
@@ -0,0 +1,31 @@
+# tests/test_keyboards.py
+import pytest
+
+from database.short_ids import ShortIdRegistry
+from database.storage import MOVIES, SERIES
+from keyboards import inline as keyboards
+from utils import callbacks as cb
+from utils import constants as const
+
+
+@pytest.fixture(autouse=True)
+def registry(tmp_path, monkeypatch):
+    monkeypatch.setattr(cb, "short_ids", ShortIdRegistry(str(tmp_path / "short_ids.log")))
+
+
+def _rows(keyboard):
+    return [[(button.text, button.callback_data) for button in row] for row in keyboard.inline_keyboard]
+
+
+def test_admin_title_lists_page_with_prev_and_next():
+    items = [{"id": f"m{i}", "name": f"Movie {i}"} for i in range(keyboards.LIST_PAGE_SIZE)]
+
+    first = _rows(keyboards.admin_title_list_keyboard(MOVIES, items, 25, 0, delete=True))
+    assert len(first) == keyboards.LIST_PAGE_SIZE + 2
+    assert first[0] == [("❌ Movie 0", cb.encode(const.CALLBACK_DELETE_MOVIE, cb.movie_ref("m0")))]
+    assert first[-2] == [("Next ➡️", "del_page_movies_1")]
+
+    last = _rows(keyboards.admin_title_list_keyboard(SERIES, items[:5], 25, 2, delete=False))
+    assert last[0] == [("✏️ Movie 0", cb.encode(const.CALLBACK_RENAME_SERIES, cb.series_ref("m0")))]
+    assert last[-2] == [("⬅️ Prev", "ren_page_series_1")]
+    assert last[-1] == [("🔙 Back to Admin Panel", const.CALLBACK_ADMIN_CANCEL)]
@@ -0,0 +1,46 @@
+# tests/test_orderings.py
+import pytest
+
+from catalog_changes import apply_random_changes, rebuild_from
+from database.orderings import OrderIndex, SORT_NAME, SORT_ADDED, SORT_RECENT
+from database.storage import KINDS, MOVIES, SERIES
+
+
+def test_orderings_match_a_rebuilt_index(rng):
+    patched = OrderIndex()
+    catalogs = apply_random_changes(rng, [patched])
+    rebuilt = rebuild_from(OrderIndex, catalogs)
+
+    for kind in KINDS:
+        live = {record["id"] for record in catalogs[kind]}
+        for sort in (SORT_NAME, SORT_ADDED):
+            assert patched.page(kind, sort, 0, 1000) == rebuilt.page(kind, sort, 0, 1000)
+            assert patched.page(kind, sort, 2, 5, only=live) == rebuilt.page(kind, sort, 2, 5, only=live)
+        # Deletes shrink the "recently added" buffer until the next rebuild, but never leave stale ids.
+        recent, _ = patched.page(kind, SORT_RECENT, 0, 1000)
+        assert set(recent) <= live
+
+
+def test_pages_are_slices_of_each_ordering():
+    index = OrderIndex()
+    index.rebuild({MOVIES: [
+        {"id": "c", "name": "Charlie", "added_at": 30},
+        {"id": "a", "name": "alpha", "added_at": 10},
+        {"id": "b", "name": "Bravo"},  # saved before added_at existed
+    ], SERIES: []})
+    index.add(MOVIES, {"id": "d", "name": "Delta", "added_at": 40})
+
+    assert index.page(MOVIES, SORT_NAME, 0, 10) == (["a", "b", "c", "d"], 4)
+    assert index.page(MOVIES, SORT_ADDED, 0, 10) == (["d", "c", "a", "b"], 4)
+    assert index.page(MOVIES, SORT_ADDED, 1, 2, only={"a", "b", "d"}) == (["a", "b"], 3)
+    assert index.page(MOVIES, SORT_RECENT, 0, 2) == (["d", "c"], 4)
+
+    index.add(MOVIES, {"id": "a", "name": "Zulu", "added_at": 10})
+    index.remove(MOVIES, "c")
+    assert index.page(MOVIES, SORT_NAME, 0, 10) == (["b", "d", "a"], 3)
+    assert index.page(MOVIES, SORT_RECENT, 0, 10) == (["d", "a", "b"], 3)
+
+
+def test_unknown_sort_is_rejected():
+    with pytest.raises(ValueError):
+        OrderIndex().page(MOVIES, "rating", 0, 10)
@@ -0,0 +1,33 @@
+# tests/test_prefix_index.py
+from catalog_changes import QUERIES, apply_random_changes, rebuild_from
+from database.prefix_index import PrefixIndex
+
+
+def test_prefix_search_matches_a_rebuilt_index(rng):
+    patched = PrefixIndex()
+    catalogs = apply_random_changes(rng, [patched])
+    rebuilt = rebuild_from(PrefixIndex, catalogs)
+
+    for query in QUERIES:
+        assert patched.search(query) == rebuilt.search(query)
+
+
+def test_every_query_word_must_prefix_a_title_word():
+    index = PrefixIndex()
+    index.add("movies", {"id": "a", "name": "Star Wars"})
+    index.add("series", {"id": "b", "name": "Wars of the Stars"})
+    index.add("movies", {"id": "c", "name": "Starship Troopers"})
+
+    # Titles starting with the whole query come first, then alphabetically.
+    assert index.search("star") == [("movies", "a"), ("movies", "c"), ("series", "b")]
+    assert index.search("wa st") == [("movies", "a"), ("series", "b")]
+    assert index.search("trek") == []
+
+
+def test_removed_titles_are_pruned():
+    index = PrefixIndex()
+    index.add("movies", {"id": "a", "name": "Zebra"})
+    index.remove("movies", "a")
+
+    assert index.search("z") == []
+    assert index._root.children == {}
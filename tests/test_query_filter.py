@@ -0,0 +1,40 @@
+# tests/test_query_filter.py
+import random
+
+from catalog_changes import apply_random_changes
+from database.query_filter import BloomFilter, QueryFilter
+from database.storage import KINDS
+
+
+def test_bloom_filter_has_no_false_negatives_and_few_false_positives():
+    bloom = BloomFilter(1000, error_rate=0.01)
+    members = [f"key-{i}" for i in range(1000)]
+    for key in members:
+        bloom.add(key)
+
+    assert all(key in bloom for key in members)
+    false_positives = sum(f"other-{i}" in bloom for i in range(10_000))
+    assert false_positives < 300
+
+
+def test_query_filter_never_rejects_a_title(rng):
+    patched = QueryFilter()
+    catalogs = apply_random_changes(rng, [patched])
+
+    for kind in KINDS:
+        for record in catalogs[kind]:
+            name = record["name"]
+            assert patched.might_match(name)
+            assert patched.might_match(name.split()[0])
+            assert patched.might_match(name[1:-1])
+
+
+def test_query_filter_rejects_impossible_queries():
+    query_filter = QueryFilter()
+    query_filter.rebuild({"movies": [{"id": "a", "name": "star wars"}], "series": []})
+
+    assert query_filter.might_match("ar wa")
+    assert query_filter.might_match("star warz")  # close enough for a fuzzy suggestion
+    assert not query_filter.might_match("")
+    rejected = sum(not query_filter.might_match("".join(random.Random(i).choices("qxjvkz", k=8))) for i in range(50))
+    assert rejected > 45
@@ -0,0 +1,122 @@
+# tests/test_rate_limiter.py
+import asyncio
+from datetime import timedelta
+
+import pytest
+from telegram.error import RetryAfter
+
+from utils import rate_limiter
+from utils.rate_limiter import OutboundScheduler, TokenBucket, BULK, CHAT_BURST, MAX_RETRIES
+
+_real_sleep = asyncio.sleep
+
+
+class Clock:
+    """Virtual time: sleeping moves the clock instead of waiting."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, delay):
+        target = self.now + delay
+        await _real_sleep(0)
+        self.now = max(self.now, target)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(rate_limiter.time, "monotonic", clock.monotonic)
+    monkeypatch.setattr(rate_limiter.asyncio, "sleep", clock.sleep)
+    return clock
+
+
+def _send(scheduler, clock, log, chat_id, label, priority=None, endpoint="sendMessage", errors=()):
+    errors = list(errors)
+
+    async def callback():
+        if errors:
+            raise errors.pop(0)
+        log.append((label, clock.now))
+        return label
+
+    return scheduler.process_request(callback, (), {}, endpoint, {"chat_id": chat_id}, priority)
+
+
+def test_token_bucket_refills_up_to_capacity():
+    bucket = TokenBucket(rate=2, capacity=4)
+    bucket.updated = 0
+
+    assert bucket.wait(0) == 0
+    bucket.take(0, cost=6)
+    assert bucket.wait(0) == pytest.approx(1.5)  # from -2 back to 1 token
+    assert bucket.wait(0, cost=10) == pytest.approx(3)  # never more than a full bucket
+    assert not bucket.is_full(2.5)
+    assert bucket.is_full(10) and bucket.tokens == 4
+
+
+def test_a_chat_gets_its_burst_then_one_message_per_second_in_order(clock):
+    async def scenario():
+        scheduler, log = OutboundScheduler(), []
+        await asyncio.gather(*(_send(scheduler, clock, log, 1, i) for i in range(CHAT_BURST + 3)))
+        return log
+
+    start = clock.now
+    log = asyncio.run(scenario())
+    assert [label for label, _ in log] == list(range(CHAT_BURST + 3))
+    assert all(at == start for _, at in log[:CHAT_BURST])
+    gaps = [later - earlier for (_, earlier), (_, later) in zip(log[CHAT_BURST - 1:], log[CHAT_BURST:])]
+    assert all(gap >= 1 - 1e-9 for gap in gaps)
+
+
+def test_retry_after_pauses_only_its_chat_and_is_retried(clock):
+    async def scenario():
+        scheduler, log = OutboundScheduler(), []
+        results = await asyncio.gather(
+            _send(scheduler, clock, log, 1, "flooded", errors=[RetryAfter(timedelta(seconds=5))]),
+            _send(scheduler, clock, log, 2, "other chat"),
+        )
+        return results, log, scheduler.queue_stats()
+
+    start = clock.now
+    results, log, stats = asyncio.run(scenario())
+    assert results == ["flooded", "other chat"]
+    assert dict(log)["other chat"] == start
+    assert dict(log)["flooded"] >= start + 5
+    assert stats["flood_waits"] == 1
+
+
+def test_retry_after_is_raised_once_retries_run_out(clock):
+    async def scenario():
+        scheduler = OutboundScheduler()
+        floods = [RetryAfter(timedelta(seconds=1)) for _ in range(MAX_RETRIES + 1)]
+        await _send(scheduler, clock, [], 1, "never", errors=floods)
+
+    with pytest.raises(RetryAfter):
+        asyncio.run(scenario())
+
+
+def test_interactive_requests_go_ahead_of_bulk_ones(clock):
+    async def scenario():
+        scheduler, log = OutboundScheduler(global_rate=1), []
+        bulk = [asyncio.ensure_future(_send(scheduler, clock, log, chat, f"bulk {chat}", BULK)) for chat in (1, 2, 3)]
+        await _real_sleep(0)
+        await _send(scheduler, clock, log, 4, "reply")
+        await asyncio.gather(*bulk)
+        return [label for label, _ in log]
+
+    order = asyncio.run(scenario())
+    assert order == ["bulk 1", "reply", "bulk 2", "bulk 3"]
+
+
+def test_requests_that_send_nothing_are_not_rate_limited(clock):
+    async def scenario():
+        scheduler, log = OutboundScheduler(), []
+        await asyncio.gather(*(_send(scheduler, clock, log, 1, i, endpoint="answerCallbackQuery") for i in range(10)))
+        return log
+
+    start = clock.now
+    assert all(at == start for _, at in asyncio.run(scenario()))
@@ -0,0 +1,61 @@
+# tests/test_router.py
+import asyncio
+from types import SimpleNamespace
+
+from utils.router import CallbackRouter
+
+
+def _route(name):
+    async def callback(update, context):
+        return name
+    callback.__name__ = name
+    return callback
+
+
+def _router():
+    return (
+        CallbackRouter()
+        .exact("movies", _route("movies"))
+        .prefix("movie_", _route("movie"))
+        .prefix("movie_select_", _route("movie_select"))
+        .exact("movie_select_all", _route("movie_select_all"))
+    )
+
+
+def test_exact_routes_beat_prefixes_and_the_longest_prefix_wins():
+    router = _router()
+
+    assert router.resolve("movies").__name__ == "movies"
+    assert router.resolve("movie_select_all").__name__ == "movie_select_all"
+    assert router.resolve("movie_select_~3_0").__name__ == "movie_select"
+    assert router.resolve("movie_select_").__name__ == "movie_select"
+    assert router.resolve("movie_sel").__name__ == "movie"
+    assert router.resolve("movie_").__name__ == "movie"
+
+
+def test_unrouted_payloads_resolve_to_nothing():
+    router = _router()
+
+    assert router.resolve("movie") is None
+    assert router.resolve("moviesx") is None
+    assert router.resolve("series_select_1") is None
+    assert router.resolve("") is None
+
+
+def test_include_merges_routes_and_the_included_router_wins():
+    admin = CallbackRouter().prefix("movie_", _route("admin_movie")).exact("admin_panel", _route("admin_panel"))
+    router = _router().include(admin)
+
+    assert router.resolve("admin_panel").__name__ == "admin_panel"
+    assert router.resolve("movie_sel").__name__ == "admin_movie"
+    assert router.resolve("movie_select_1").__name__ == "movie_select"
+
+
+def test_handler_claims_only_routed_payloads_and_dispatch_passes_the_result_on():
+    router = _router()
+    pattern = router.handler().pattern
+
+    assert pattern("movie_select_1") and not pattern("series_1")
+    assert not pattern(None)
+    update = SimpleNamespace(callback_query=SimpleNamespace(data="movie_select_1"))
+    assert asyncio.run(router.dispatch(update, None)) == "movie_select"
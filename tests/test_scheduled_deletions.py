@@ -0,0 +1,58 @@
+# tests/test_scheduled_deletions.py
+import asyncio
+import time
+
+import pytest
+
+from database.deletion_schedule import DeletionSchedule
+from utils import helpers
+from utils.timing_wheel import TimingWheel
+
+
+@pytest.fixture
+def schedule(tmp_path, monkeypatch):
+    schedule = DeletionSchedule(str(tmp_path / "deletions.sqlite3"))
+
+    async def unschedule_deletions(deletion_ids):
+        schedule.remove(deletion_ids)
+
+    monkeypatch.setattr(helpers.async_db, "unschedule_deletions", unschedule_deletions)
+    monkeypatch.setattr(helpers, "deletion_wheel", TimingWheel())
+    return schedule
+
+
+def _entries(schedule, names):
+    return [(1, {"content_name": name, "deletion_id": schedule.add(1, 0, {"content_name": name})}) for name in names]
+
+
+def test_only_deletions_that_ran_are_unscheduled(schedule, monkeypatch):
+    async def delete_and_prompt(bot, chat_id, data):
+        if data["content_name"] == "broken":
+            raise RuntimeError("database is locked")
+
+    monkeypatch.setattr(helpers, "delete_and_prompt", delete_and_prompt)
+    entries = _entries(schedule, ["ok", "broken", "also ok"])
+
+    asyncio.run(helpers._run_due_deletions(None, entries))
+
+    assert [entry["data"]["content_name"] for entry in schedule.pending()] == ["broken"]
+    assert len(helpers.deletion_wheel) == 1
+    retry = [payload for _ in range(int(helpers.DELETION_RETRY_DELAY) + 2) for payload in helpers.deletion_wheel._advance()]
+    assert retry == [(1, dict(entries[1][1], attempts=2))]
+
+
+def test_retries_back_off_and_give_up(schedule, monkeypatch):
+    async def delete_and_prompt(bot, chat_id, data):
+        raise RuntimeError("still failing")
+
+    monkeypatch.setattr(helpers, "delete_and_prompt", delete_and_prompt)
+    added = []
+    monkeypatch.setattr(helpers.deletion_wheel, "add", lambda due_at, payload: added.append((due_at - time.time(), payload)))
+    (chat_id, data), = _entries(schedule, ["broken"])
+
+    for attempt in range(1, helpers.DELETION_ATTEMPTS + 1):
+        asyncio.run(helpers._run_due_deletions(None, [(chat_id, dict(data, attempts=attempt))]))
+
+    delays = [round(delay) for delay, _ in added]
+    assert delays == [helpers.DELETION_RETRY_DELAY * 2 ** n for n in range(helpers.DELETION_ATTEMPTS - 1)]
+    assert schedule.pending() == []
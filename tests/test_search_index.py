@@ -0,0 +1,50 @@
+# tests/test_search_index.py
+from catalog_changes import QUERIES, apply_random_changes, rebuild_from
+from database.search_index import SearchIndex
+from database.storage import KINDS
+
+
+def test_search_matches_a_rebuilt_index(rng):
+    patched = SearchIndex()
+    catalogs = apply_random_changes(rng, [patched])
+    rebuilt = rebuild_from(SearchIndex, catalogs)
+
+    for kind in KINDS:
+        for query in QUERIES:
+            expected = [record["id"] for record in catalogs[kind] if query in record["name"]]
+            assert patched.search(kind, query) == rebuilt.search(kind, query) == expected
+        for record in catalogs[kind]:
+            assert patched.find_by_name(kind, record["name"]) == rebuilt.find_by_name(kind, record["name"])
+
+
+def test_search_is_case_and_substring_insensitive():
+    index = SearchIndex()
+    index.add("movies", {"id": "a", "name": "The Dark Knight"})
+    index.add("movies", {"id": "b", "name": "Dark Water"})
+
+    assert index.search("movies", "DARK") == ["a", "b"]
+    assert index.search("movies", "k kni") == ["a"]
+    assert index.search("movies", "light") == []
+    assert index.find_by_name("movies", "the dark knight") == "a"
+
+
+def test_fuzzy_search_matches_a_rebuilt_index(rng):
+    patched = SearchIndex()
+    catalogs = apply_random_changes(rng, [patched])
+    rebuilt = rebuild_from(SearchIndex, catalogs)
+
+    for kind in KINDS:
+        for query in QUERIES:
+            assert patched.fuzzy_search(kind, query) == rebuilt.fuzzy_search(kind, query)
+
+
+def test_fuzzy_search_ranks_misspellings():
+    index = SearchIndex()
+    index.add("movies", {"id": "a", "name": "Interstellar"})
+    index.add("movies", {"id": "b", "name": "Inception"})
+    index.add("movies", {"id": "c", "name": "Interstellar Journey"})
+
+    results = index.fuzzy_search("movies", "intersteller")
+    assert [record_id for record_id, _ in results][:2] == ["a", "c"]
+    assert all(0 < score <= 1 for _, score in results)
+    assert index.fuzzy_search("movies", "zzzz") == []
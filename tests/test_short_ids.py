@@ -0,0 +1,85 @@
+# tests/test_short_ids.py
+import pytest
+
+from database.short_ids import ShortIdRegistry, ShortIdIndex, CATEGORY, to_base62, from_base62
+from database.storage import MOVIES, SERIES
+from utils import callbacks as cb
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    registry = ShortIdRegistry(str(tmp_path / "short_ids.log"))
+    monkeypatch.setattr(cb, "short_ids", registry)
+    return registry
+
+
+def test_base62_round_trip():
+    for number in [0, 1, 9, 10, 61, 62, 3843, 3844, 10 ** 12]:
+        assert from_base62(to_base62(number)) == number
+    assert from_base62("not-base62") is None
+
+
+def test_registry_round_trip_and_persistence(registry):
+    ids = {value: registry.encode(MOVIES, value) for value in ["uuid-1", "uuid-2", "uuid-3"]}
+    assert list(ids.values()) == ["0", "1", "2"]
+    assert registry.encode(MOVIES, "uuid-2") == "1"
+    # Namespaces are numbered independently.
+    assert registry.encode(SERIES, "uuid-9") == "0"
+
+    reloaded = ShortIdRegistry(registry.path)
+    for value, short_id in ids.items():
+        assert reloaded.decode(MOVIES, short_id) == value
+    assert reloaded.decode(MOVIES, "9") is None
+
+
+def test_registry_drops_a_torn_tail(registry):
+    registry.encode(MOVIES, "uuid-1")
+    with open(registry.path, "a") as f:
+        f.write('["movies", "uuid-')
+
+    reloaded = ShortIdRegistry(registry.path)
+    assert reloaded.decode(MOVIES, "0") == "uuid-1"
+    assert reloaded.encode(MOVIES, "uuid-2") == "1"
+    assert ShortIdRegistry(registry.path).decode(MOVIES, "1") == "uuid-2"
+
+
+def test_callback_refs_round_trip(registry):
+    movie_ref = cb.movie_ref("6f1c0a52-9d1e-4bb4-8f6e-1c2d3e4f5a6b")
+    assert movie_ref.startswith(cb.SHORT_REF_MARKER)
+    assert cb.movie_id(movie_ref) == "6f1c0a52-9d1e-4bb4-8f6e-1c2d3e4f5a6b"
+    assert cb.series_id(cb.series_ref("s-1")) == "s-1"
+    assert cb.category_name(cb.category_ref("Sci-Fi & Fantasy")) == "Sci-Fi & Fantasy"
+
+    data = cb.encode("movie_select_", movie_ref, 3)
+    ref, page = cb.decode("movie_select_", data)
+    assert cb.movie_id(ref) == "6f1c0a52-9d1e-4bb4-8f6e-1c2d3e4f5a6b" and page == "3"
+
+
+def test_legacy_raw_refs_are_never_decoded(registry):
+    registry.encode(MOVIES, "some-other-movie")  # short id "0"
+    registry.encode(CATEGORY, "Action")  # short id "0"
+    # Old buttons carry raw values, even ones that look like base62 short ids.
+    assert cb.movie_id("0") == "0"
+    assert cb.category_name("0") == "0"
+    assert cb.category_name("Drama") == "Drama"
+
+
+def test_old_format_payloads_decode_to_raw_values(registry):
+    registry.encode(MOVIES, "6f1c0a52-9d1e-4bb4-8f6e-1c2d3e4f5a6b")
+    # Buttons sent before short ids carried the raw record id or category name.
+    ref, page = cb.decode("movie_select_", "movie_select_6f1c0a52-9d1e-4bb4-8f6e-1c2d3e4f5a6b_2")
+    assert cb.movie_id(ref) == "6f1c0a52-9d1e-4bb4-8f6e-1c2d3e4f5a6b" and page == "2"
+    category_ref, content_type = cb.decode("category_content_type_", "category_content_type_Science Fiction_movies")
+    assert cb.category_name(category_ref) == "Science Fiction" and content_type == "movies"
+    # A marked ref nobody assigned (e.g. a log lost in a restore) is passed through, and finds no title.
+    assert cb.movie_id(cb.SHORT_REF_MARKER + "zz") == cb.SHORT_REF_MARKER + "zz"
+
+
+def test_short_id_index_registers_the_catalog(registry):
+    index = ShortIdIndex(registry)
+    index.rebuild({MOVIES: [{"id": "m1", "categories": [" Action ", "Drama"]}, {"name": "no id"}], SERIES: [{"id": "s1"}]})
+    index.add(MOVIES, {"id": "m2", "categories": ["Action", "Comedy"]})
+
+    assert [registry.decode(MOVIES, short_id) for short_id in "01"] == ["m1", "m2"]
+    assert registry.decode(SERIES, "0") == "s1"
+    assert [registry.decode(CATEGORY, short_id) for short_id in "012"] == ["Action", "Drama", "Comedy"]
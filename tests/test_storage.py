@@ -0,0 +1,85 @@
+# tests/test_storage.py
+"""Both StorageBackends must behave the same behind db_handler."""
+import json
+
+import pytest
+
+from database.storage import JsonStorage, SqliteStorage, MOVIES, SERIES
+
+
+@pytest.fixture
+def json_paths(tmp_path):
+    return {MOVIES: str(tmp_path / "movies_db.json"), SERIES: str(tmp_path / "series_db.json")}
+
+
+@pytest.fixture(params=["json", "sqlite"])
+def storage(request, tmp_path, json_paths):
+    if request.param == "json":
+        return JsonStorage(json_paths)
+    return SqliteStorage(str(tmp_path / "catalog.sqlite3"))
+
+
+def test_crud_round_trip(storage):
+    storage.insert(MOVIES, {"id": "a", "name": "Alpha", "year": 2001})
+    storage.insert(MOVIES, {"id": "b", "name": "Beta", "year": 2002})
+    storage.insert(SERIES, {"id": "a", "name": "Series A"})
+
+    assert storage.get(MOVIES, "a") == {"id": "a", "name": "Alpha", "year": 2001}
+    assert storage.find_many(MOVIES, ["b", "missing", "a"]) == [storage.get(MOVIES, "b"), storage.get(MOVIES, "a")]
+    assert storage.update(MOVIES, "a", {"year": 2010}) == {"id": "a", "name": "Alpha", "year": 2010}
+    assert storage.update(MOVIES, "missing", {"year": 2010}) is None
+    assert storage.delete(MOVIES, "b") is True
+    assert [record["id"] for record in storage.load_all(MOVIES)] == ["a"]
+    assert [record["id"] for record in storage.load_all(SERIES)] == ["a"]
+
+
+def test_duplicate_insert_replaces_in_place(storage):
+    storage.insert(MOVIES, {"id": "a", "name": "Alpha"})
+    storage.insert(MOVIES, {"id": "b", "name": "Beta"})
+    storage.insert(MOVIES, {"id": "a", "name": "Alpha Two"})
+
+    assert storage.load_all(MOVIES) == [{"id": "a", "name": "Alpha Two"}, {"id": "b", "name": "Beta"}]
+
+
+def test_records_handed_out_are_copies(storage):
+    record = {"id": "a", "name": "Alpha", "videos": ["v1"]}
+    inserted = storage.insert(MOVIES, record)
+    inserted["videos"].append("from insert")
+    record["videos"].append("from caller")
+    new_videos = ["v1", "v2"]
+    updated = storage.update(MOVIES, "a", {"videos": new_videos})
+    updated["videos"].append("from update")
+    new_videos.append("from caller")
+    fetched = storage.get(MOVIES, "a")
+    fetched["name"] = "Changed"
+
+    assert storage.get(MOVIES, "a") == {"id": "a", "name": "Alpha", "videos": ["v1", "v2"]}
+    assert inserted is not record and updated["videos"] is not new_videos
+
+
+def test_version_moves_only_on_real_changes(storage):
+    storage.insert(MOVIES, {"id": "a", "name": "Alpha"})
+    version = storage.version()
+
+    assert storage.delete(MOVIES, "missing") is False
+    assert storage.version() == version
+    assert storage.delete(MOVIES, "a") is True
+    assert storage.version() > version
+
+
+def test_sqlite_migrates_json_files_once(tmp_path, json_paths):
+    source = JsonStorage(json_paths)
+    source.insert(MOVIES, {"id": "a", "name": "Alpha"})
+    source.compact()
+    source.insert(MOVIES, {"id": "b", "name": "Beta"})  # still only in the journal
+    with open(json_paths[SERIES], "w") as f:
+        json.dump([{"id": "s", "name": "Series"}], f)
+
+    sqlite = SqliteStorage(str(tmp_path / "catalog.sqlite3"))
+    assert sqlite.migrate_from_json(json_paths) is True
+    assert [record["id"] for record in sqlite.load_all(MOVIES)] == ["a", "b"]
+    assert [record["id"] for record in sqlite.load_all(SERIES)] == ["s"]
+
+    sqlite.delete(MOVIES, "a")
+    assert sqlite.migrate_from_json(json_paths) is False
+    assert [record["id"] for record in sqlite.load_all(MOVIES)] == ["b"]
@@ -0,0 +1,119 @@
+# tests/test_timing_wheel.py
+import asyncio
+import random
+import time
+
+from utils.timing_wheel import TimingWheel, LEVELS
+
+START = 1_000_000
+
+
+def _wheel():
+    wheel = TimingWheel()
+    wheel._tick = START - 1
+    return wheel
+
+
+def _run_until_empty(wheel):
+    fired = {}
+    while len(wheel):
+        for payload in wheel._advance():
+            fired[payload] = wheel._tick
+    return fired
+
+
+def test_entries_fire_at_their_tick_across_every_level():
+    rng = random.Random(7)
+    wheel = _wheel()
+    # Within a minute, an hour, a day, and beyond the hour wheel's horizon (overflow).
+    due = {i: START + rng.randrange(0, 3 * 86_400) for i in range(5_000)}
+    for payload, tick in due.items():
+        wheel.add(tick + rng.random(), payload)
+
+    assert wheel.queue_stats()["overflow"] > 0
+    assert _run_until_empty(wheel) == due
+
+
+def test_boundary_ticks_fire_on_time():
+    wheel = _wheel()
+    horizon = LEVELS[-1][0] * LEVELS[-1][1]
+    day = START - START % horizon + horizon  # the next overflow cascade
+    due = {
+        "minute": START - START % 60 + 60,
+        "hour": START - START % 3600 + 3600,
+        "day": day,
+        "after_day": day + 1,
+        "two_days": day + horizon,
+    }
+    for payload, tick in due.items():
+        wheel.add(tick, payload)
+
+    assert _run_until_empty(wheel) == due
+
+
+def test_entries_added_while_running_and_overdue_entries():
+    wheel = _wheel()
+    wheel.add(START + 120, "early")
+    for _ in range(60):
+        wheel._advance()
+    wheel.add(START + 10, "overdue")  # already past: goes into the next bucket
+    wheel.add(START + 4000, "later")
+
+    fired = _run_until_empty(wheel)
+    assert fired == {"overdue": START + 60, "early": START + 120, "later": START + 4000}
+
+
+def test_due_bucket_is_handed_over_in_one_call():
+    async def scenario():
+        wheel = TimingWheel()
+        buckets = []
+
+        async def on_due(payloads):
+            buckets.append(sorted(payloads))
+
+        now = time.time()
+        for payload in ("a", "b", "c"):
+            wheel.add(now - 5, payload)
+        wheel.start(on_due)
+        await asyncio.sleep(2.2)
+        stats = wheel.queue_stats()
+        await wheel.stop()
+        return buckets, stats
+
+    buckets, stats = asyncio.run(scenario())
+    assert buckets == [["a", "b", "c"]]
+    assert stats["depth"] == 0
+    assert stats["buckets_fired"] == 1 and stats["items_fired"] == 3
+    assert 0 <= stats["max_lag"] < 1
+
+
+def test_queue_stats_count_each_level():
+    wheel = _wheel()
+    for offset in (5, 30, 600, 7200, 3 * 86_400):
+        wheel.add(START + offset, offset)
+
+    stats = wheel.queue_stats()
+    assert stats["depth"] == 5
+    assert stats["levels"] == [2, 1, 1] and stats["overflow"] == 1
+
+
+def test_failing_handler_does_not_stop_the_wheel():
+    async def scenario():
+        wheel = TimingWheel()
+        handled = []
+
+        async def on_due(payloads):
+            handled.extend(payloads)
+            if "boom" in payloads:
+                raise RuntimeError("handler failed")
+
+        wheel._on_due = on_due
+        wheel._fire(["boom"], 0.0)
+        wheel._fire(["fine"], 0.0)
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        return handled, wheel.queue_stats()
+
+    handled, stats = asyncio.run(scenario())
+    assert handled == ["boom", "fine"]
+    assert stats["running"] == 0 and stats["buckets_fired"] == 2
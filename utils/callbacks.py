@@ -0,0 +1,73 @@
+# utils/callbacks.py
+"""
+callback_data codec shared by keyboards/inline.py and every callback handler.
+
+A payload is one of the CALLBACK_* prefixes from utils.constants followed by
+"_"-separated fields. Record ids and category names travel as dense base62 short
+ids from the registry in database/short_ids.py, so a button stays far below
+Telegram's 64-byte limit whatever the id format, title or category name. A short id
+is sent behind SHORT_REF_MARKER, which is neither a base62 digit nor "_", so buttons
+sent before short ids existed (raw ids and names) can never be mistaken for one.
+"""
+from typing import List
+
+from database.short_ids import short_ids, CATEGORY
+from database.storage import MOVIES, SERIES
+
+MAX_CALLBACK_BYTES = 64
+SHORT_REF_MARKER = "~"
+
+
+def encode(prefix: str, *fields) -> str:
+    data = prefix + "_".join(str(field) for field in fields)
+    if len(data.encode('utf-8')) > MAX_CALLBACK_BYTES:
+        raise ValueError(f"callback_data too long: {data!r}")
+    return data
+
+
+def decode(prefix: str, data: str) -> List[str]:
+    """The fields after `prefix`."""
+    return data[len(prefix):].split("_")
+
+
+def _short_ref(namespace: str, value: str) -> str:
+    return SHORT_REF_MARKER + short_ids.encode(namespace, value)
+
+
+def _resolve(namespace: str, ref: str) -> str:
+    # Unmarked refs come from buttons sent before short ids existed and carry the raw value.
+    if not ref.startswith(SHORT_REF_MARKER):
+        return ref
+    return short_ids.decode(namespace, ref[len(SHORT_REF_MARKER):]) or ref
+
+
+def record_ref(kind: str, raw_id: str) -> str:
+    return _short_ref(kind, raw_id)
+
+
+def record_id(kind: str, ref: str) -> str:
+    return _resolve(kind, ref)
+
+
+def movie_ref(raw_id: str) -> str:
+    return record_ref(MOVIES, raw_id)
+
+
+def movie_id(ref: str) -> str:
+    return record_id(MOVIES, ref)
+
+
+def series_ref(raw_id: str) -> str:
+    return record_ref(SERIES, raw_id)
+
+
+def series_id(ref: str) -> str:
+    return record_id(SERIES, ref)
+
+
+def category_ref(category: str) -> str:
+    return _short_ref(CATEGORY, category)
+
+
+def category_name(ref: str) -> str:
+    return _resolve(CATEGORY, ref)
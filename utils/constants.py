@@ -12,6 +12,13 @@
 ) = range(17)
 
 # --- Callback Data Prefixes ---
+# Payloads are built and parsed with utils/callbacks.py; ids and categories travel as short ids.
+# Each constant is also the route key handlers are registered under (utils/router.py).
+CALLBACK_BACK_TO_MAIN = "back_to_main_menu"
+CALLBACK_BROWSE_YEAR = "browse_year_from_callback"
+CALLBACK_BROWSE_CATEGORY = "browse_category_from_callback"
+CALLBACK_CHECK_JOIN = "check_join_status"
+CALLBACK_NO_OP = "no_op"
 CALLBACK_MOVIE_SELECT = "movie_select_"
 CALLBACK_SERIES_SELECT = "series_select_"
 CALLBACK_SEASON_SELECT = "season_select_"
@@ -24,10 +31,20 @@ CALLBACK_REGET_MOVIE = "reget_movie_"
 CALLBACK_REGET_SERIES = "reget_series_"
 CALLBACK_RENAME_MOVIE = "ren_movie_"
 CALLBACK_RENAME_SERIES = "ren_series_"
-CALLBACK_MOVIE_PAGE = "movie_page_"
-CALLBACK_SERIES_PAGE = "series_page_"
+CALLBACK_DELETE_PAGE = "del_page_" # + movies/series_<page>
+CALLBACK_RENAME_PAGE = "ren_page_" # + movies/series_<page>
+CALLBACK_MOVIE_PAGE = "movie_page_" # + <page>[_<sort>]
+CALLBACK_SERIES_PAGE = "series_page_" # + <page>[_<sort>]
+CALLBACK_NEW_CONTENT_TYPE = "new_content_" # + movies/series
 CALLBACK_DEEPLINK_MOVIE = "deeplink_movie_"
 CALLBACK_DEEPLINK_SERIES = "deeplink_series_"
+CALLBACK_LIST_PAGE = "list_page_" # + <cursor token>_<page>
+
+# --- /start Deep Link Payloads ---
+DEEPLINK_MOVIE = "mv_"        # + name with spaces as underscores (channel posts)
+DEEPLINK_SERIES = "sr_"
+DEEPLINK_MOVIE_ID = "mvid_"   # + id without dashes (inline results; works for any title)
+DEEPLINK_SERIES_ID = "srid_"
 
 # --- Category Callbacks ---
 CALLBACK_CATEGORY_PAGE = "cat_page_"
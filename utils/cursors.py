@@ -0,0 +1,74 @@
+# utils/cursors.py
+import secrets
+import string
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+_ALPHABET = string.digits + string.ascii_letters
+
+
+class CursorStore:
+    """
+    Server-side result sets for paginated list views. A list (search hits, a year,
+    a category...) is stored once under a short random token that goes into the
+    Prev/Next callback_data, so page N is a slice of the stored ids instead of a
+    re-run of the query. Entries expire after `ttl` seconds and the least recently
+    used ones are evicted once either cap is hit.
+    """
+
+    def __init__(self, ttl: float = 60 * 60, max_cursors: int = 5000, max_ids: int = 500_000):
+        self.ttl = ttl
+        self.max_cursors = max_cursors
+        self.max_ids = max_ids
+        self._cursors: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._total_ids = 0
+
+    def _new_token(self) -> str:
+        while True:
+            token = "".join(secrets.choice(_ALPHABET) for _ in range(8))
+            if token not in self._cursors:
+                return token
+
+    def _drop(self, token: str):
+        cursor = self._cursors.pop(token, None)
+        if cursor is not None:
+            self._total_ids -= len(cursor["ids"])
+
+    def create(self, kind: str, ids: List[str], title: str) -> str:
+        """Stores a result list and returns its token."""
+        token = self._new_token()
+        self._cursors[token] = {"kind": kind, "ids": list(ids), "title": title, "expires": time.monotonic() + self.ttl}
+        self._total_ids += len(ids)
+        while len(self._cursors) > self.max_cursors or (self._total_ids > self.max_ids and len(self._cursors) > 1):
+            self._drop(next(iter(self._cursors)))
+        return token
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """The cursor for a token (refreshing its TTL), or None if it expired or was evicted."""
+        cursor = self._cursors.get(token)
+        if cursor is None:
+            return None
+        now = time.monotonic()
+        if cursor["expires"] < now:
+            self._drop(token)
+            return None
+        cursor["expires"] = now + self.ttl
+        self._cursors.move_to_end(token)
+        return cursor
+
+    def page(self, token: str, page: int, per_page: int) -> Optional[Dict[str, Any]]:
+        """One page of a cursor: its kind, title, the ids on that page and the total count."""
+        cursor = self.get(token)
+        if cursor is None:
+            return None
+        start = page * per_page
+        return {
+            "kind": cursor["kind"],
+            "title": cursor["title"],
+            "ids": cursor["ids"][start:start + per_page],
+            "total": len(cursor["ids"]),
+        }
+
+
+cursor_store = CursorStore()
@@ -0,0 +1,147 @@
+# utils/delivery.py
+"""
+Delivery of a title's photos and videos to one chat. Items go out in order, grouped into
+albums; Telegram numbers messages in the order it receives them, so the sends of one
+delivery are never in flight together, and deliveries to the same chat take turns so two
+titles never interleave. Deliveries to different chats run side by side, with the
+outbound scheduler pacing the requests themselves and handling flood waits.
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import httpx
+from telegram import Bot, InputMediaPhoto, InputMediaVideo, Message
+from telegram.error import BadRequest, Forbidden, NetworkError, TelegramError
+
+import config
+from utils.rate_limiter import BULK
+
+logger = logging.getLogger(__name__)
+
+Media = Union[InputMediaPhoto, InputMediaVideo]
+
+# Telegram puts at most 10 photos/videos in one media group.
+ALBUM_SIZE = 10
+# Attempts per send when the request provably never reached Telegram (see _never_sent).
+MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 1.0  # seconds, doubled after each failed attempt
+
+# chat_id -> (lock, deliveries holding or waiting for it); dropped when the count reaches 0.
+_chat_turns: Dict[int, Tuple[asyncio.Lock, int]] = {}
+
+# Transport failures raised before the request was written, as the cause of PTB's NetworkError/TimedOut.
+_NOT_SENT = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+
+class Outcome(NamedTuple):
+    message_id: Optional[int]
+    error: Optional[TelegramError] = None
+
+
+class DeliveryReport(NamedTuple):
+    """One Outcome per item, in the order the items were given."""
+    outcomes: List[Outcome]
+
+    @property
+    def message_ids(self) -> List[int]:
+        """Ids of every message that was delivered, in order."""
+        return [outcome.message_id for outcome in self.outcomes if outcome.message_id is not None]
+
+    @property
+    def failed(self) -> List[int]:
+        """Positions of the items that could not be delivered."""
+        return [position for position, outcome in enumerate(self.outcomes) if outcome.message_id is None]
+
+    @property
+    def unreachable(self) -> bool:
+        """True if the chat stopped accepting messages (e.g. the user blocked the bot)."""
+        return any(isinstance(outcome.error, Forbidden) for outcome in self.outcomes)
+
+
+def _never_sent(error: TelegramError) -> bool:
+    """True if Telegram cannot have acted on the failed request, so sending it again can't duplicate it."""
+    # A RetryAfter only gets this far once the outbound scheduler gave up on the flood wait; so do we.
+    return isinstance(error, NetworkError) and isinstance(error.__cause__, _NOT_SENT)
+
+
+async def _with_retries(send):
+    """
+    Awaits send(), retrying with exponential backoff only when the request never went out.
+    A read timeout or dropped connection often comes after Telegram accepted the request,
+    and sending an album again would deliver it twice, so those are not retried.
+    """
+    delay = RETRY_BACKOFF
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return await send()
+        except TelegramError as e:
+            if attempt == MAX_ATTEMPTS or not _never_sent(e):
+                raise
+            logger.info(f"Transient send failure ({e}), retrying in {delay:.1f}s")
+            await asyncio.sleep(delay)
+            delay *= 2
+
+
+@asynccontextmanager
+async def _chat_turn(chat_id: int):
+    """Waits for earlier deliveries to the chat to finish."""
+    lock, users = _chat_turns.get(chat_id, (None, 0))
+    lock = lock or asyncio.Lock()
+    _chat_turns[chat_id] = (lock, users + 1)
+    try:
+        async with lock:
+            yield
+    finally:
+        lock, users = _chat_turns[chat_id]
+        if users == 1:
+            del _chat_turns[chat_id]
+        else:
+            _chat_turns[chat_id] = (lock, users - 1)
+
+
+async def _send_one(bot: Bot, chat_id: int, item: Media) -> Message:
+    send = bot.send_photo if isinstance(item, InputMediaPhoto) else bot.send_video
+    return await _with_retries(lambda: send(chat_id, item.media, caption=item.caption, parse_mode=item.parse_mode, rate_limit_args=BULK))
+
+
+async def deliver(bot: Bot, chat_id: int, media: Sequence[Media]) -> DeliveryReport:
+    """
+    Sends photos and videos in order, grouped into albums of up to ALBUM_SIZE (one at a
+    time when config.ALBUM_DELIVERY is off), and reports what happened to each item. An
+    album that Telegram rejects is retried item by item, so one bad file id only loses
+    itself; once the chat turns out to be unreachable (the user blocked the bot) the
+    remaining items are not attempted.
+    """
+    album_size = ALBUM_SIZE if config.ALBUM_DELIVERY else 1
+    outcomes: List[Outcome] = []
+    async with _chat_turn(chat_id):
+        for start in range(0, len(media), album_size):
+            batch = list(media[start:start + album_size])
+            if outcomes and isinstance(outcomes[-1].error, Forbidden):
+                outcomes.extend(Outcome(None, outcomes[-1].error) for _ in batch)
+                continue
+            if len(batch) > 1:
+                try:
+                    messages = await _with_retries(lambda: bot.send_media_group(chat_id, batch, rate_limit_args=BULK))
+                    outcomes.extend(Outcome(message.message_id) for message in messages)
+                    continue
+                except BadRequest as e:
+                    logger.warning(f"Album of {len(batch)} rejected in chat {chat_id}, sending items one by one: {e}")
+                except TelegramError as e:
+                    outcomes.extend(Outcome(None, e) for _ in batch)
+                    continue
+            for item in batch:
+                try:
+                    outcomes.append(Outcome((await _send_one(bot, chat_id, item)).message_id))
+                except TelegramError as e:
+                    logger.error(f"Failed to send {item.media} to chat {chat_id}: {e}")
+                    outcomes.append(Outcome(None, e))
+                    if isinstance(e, Forbidden):
+                        break
+            outcomes.extend(Outcome(None, outcomes[-1].error) for _ in range(len(outcomes), start + len(batch)))
+    report = DeliveryReport(outcomes)
+    if report.failed:
+        logger.warning(f"Delivered {len(outcomes) - len(report.failed)}/{len(outcomes)} items to chat {chat_id}")
+    return report
@@ -1,23 +1,104 @@
 # utils/helpers.py
+import asyncio
+import functools
 import logging
+import time
+from telegram import Bot
 from telegram.ext import ContextTypes
-from telegram.error import Forbidden, BadRequest
+from telegram.error import Forbidden, BadRequest, TelegramError
 from keyboards.inline import get_file_again_keyboard
-from typing import List, Optional
+from database import async_db
+from utils.rate_limiter import BULK
+from utils.timing_wheel import TimingWheel
+from typing import Dict, List, Optional, Set, Tuple
 
 logger = logging.getLogger(__name__)
 
-async def delete_and_prompt_callback(context: ContextTypes.DEFAULT_TYPE):
+# Bot API limit of deleteMessages.
+BULK_DELETE_LIMIT = 100
+# Deletions for the same chat that come due within this many seconds share bulk calls.
+DELETE_MERGE_WINDOW = 2.0
+
+# Deletions that came due while the bot was down are caught up on CATCHUP_BATCH at a
+# time, CATCHUP_INTERVAL seconds apart, starting CATCHUP_DELAY seconds after startup.
+CATCHUP_BATCH = 20
+CATCHUP_INTERVAL = 2.0
+CATCHUP_DELAY = 5.0
+
+# A scheduled deletion that raises is tried again DELETION_RETRY_DELAY seconds later,
+# doubling each time, and dropped from the schedule after DELETION_ATTEMPTS tries.
+DELETION_ATTEMPTS = 5
+DELETION_RETRY_DELAY = 30.0
+
+# Pending deletions by due time; schedule_content_deletion feeds it, start_deletion_wheel runs it.
+deletion_wheel = TimingWheel()
+
+# chat_id -> (message ids waiting to be deleted, future resolved with the ids that could not be)
+_pending_deletions: Dict[int, Tuple[List[int], asyncio.Future]] = {}
+
+async def _bulk_delete(bot: Bot, chat_id: int, message_ids: List[int]) -> Set[int]:
+    """Deletes messages 100 per call, falling back to one call per message if a bulk call fails. Returns the ids not deleted."""
+    failed = set()
+    for start in range(0, len(message_ids), BULK_DELETE_LIMIT):
+        chunk = message_ids[start:start + BULK_DELETE_LIMIT]
+        try:
+            # Messages the user already deleted are skipped by Telegram, not reported.
+            await bot.delete_messages(chat_id=chat_id, message_ids=chunk, rate_limit_args=BULK)
+            continue
+        except Forbidden as e:
+            logger.warning(f"Cannot delete messages in chat {chat_id}: {e}")
+            failed.update(chunk)
+            continue
+        except TelegramError as e:
+            logger.warning(f"Bulk delete of {len(chunk)} messages failed in chat {chat_id}, deleting one by one: {e}")
+        for message_id in chunk:
+            try:
+                await bot.delete_message(chat_id=chat_id, message_id=message_id, rate_limit_args=BULK)
+            except BadRequest as e:
+                failed.add(message_id)
+                # It's common for a user to have already deleted the message.
+                if "message to delete not found" not in str(e).lower():
+                    logger.warning(f"Could not delete message {message_id} in chat {chat_id}: {e}")
+            except Exception as e:
+                failed.add(message_id)
+                logger.warning(f"Unexpected error deleting message {message_id} in chat {chat_id}: {e}")
+    return failed
+
+async def delete_messages_merged(bot: Bot, chat_id: int, message_ids: List[int]) -> int:
     """
-    Job callback. Deletes video messages, the photo message, and sends a "Get Again" prompt.
+    Deletes messages in a chat together with any other deletions for that chat requested
+    within DELETE_MERGE_WINDOW, so an expiry storm costs one bulk call per chat instead of
+    one call per message. Returns how many of `message_ids` were deleted.
     """
-    job = context.job
-    chat_id = job.chat_id
-    video_message_ids = job.data.get('video_message_ids', [])
-    photo_message_id = job.data.get('photo_message_id') # Get the photo ID
-    content_type = job.data['content_type']
-    content_id = job.data['content_id']
-    content_name = job.data['content_name']
+    pending = _pending_deletions.get(chat_id)
+    if pending is not None:
+        pending[0].extend(message_ids)
+        failed = await asyncio.shield(pending[1])
+    else:
+        merged, done = list(message_ids), asyncio.get_running_loop().create_future()
+        _pending_deletions[chat_id] = (merged, done)
+        try:
+            await asyncio.sleep(DELETE_MERGE_WINDOW)
+            del _pending_deletions[chat_id]
+            failed = await _bulk_delete(bot, chat_id, list(dict.fromkeys(merged)))
+        except BaseException as e:
+            # Don't leave the other jobs of this batch waiting forever.
+            if _pending_deletions.get(chat_id, (None, None))[1] is done:
+                del _pending_deletions[chat_id]
+            done.cancel() if isinstance(e, asyncio.CancelledError) else done.set_exception(e)
+            raise
+        done.set_result(failed)
+    return sum(1 for message_id in message_ids if message_id not in failed)
+
+async def delete_and_prompt(bot: Bot, chat_id: int, data: Dict):
+    """
+    Deletes video messages, the photo message, and sends a "Get Again" prompt.
+    """
+    video_message_ids = data.get('video_message_ids', [])
+    photo_message_id = data.get('photo_message_id') # Get the photo ID
+    content_type = data['content_type']
+    content_id = data['content_id']
+    content_name = data['content_name']
 
     # --- Combine all message IDs to delete ---
     all_message_ids = []
@@ -25,19 +106,7 @@ async def delete_and_prompt_callback(context: ContextTypes.DEFAULT_TYPE):
         all_message_ids.append(photo_message_id)
     all_message_ids.extend(video_message_ids)
     
-    deleted_count = 0
-    for message_id in all_message_ids:
-        try:
-            await context.bot.delete_message(chat_id=chat_id, message_id=message_id)
-            deleted_count += 1
-        except BadRequest as e:
-            # It's common for a user to have already deleted the message.
-            if "message to delete not found" in str(e).lower():
-                pass
-            else:
-                logger.warning(f"Could not delete message {message_id} in chat {chat_id}: {e}")
-        except Exception as e:
-            logger.warning(f"Unexpected error deleting message {message_id} in chat {chat_id}: {e}")
+    deleted_count = await delete_messages_merged(bot, chat_id, all_message_ids)
 
     logger.info(f"Successfully deleted {deleted_count}/{len(all_message_ids)} messages for content '{content_name}'.")
 
@@ -50,7 +119,7 @@ async def delete_and_prompt_callback(context: ContextTypes.DEFAULT_TYPE):
                 f"✅ The files for **'{content_name}'** have been deleted.\n\n"
                 "Click the button below to get them again."
             )
-            await context.bot.send_message(
+            await bot.send_message(
                 chat_id=chat_id,
                 text=prompt_text,
                 reply_markup=get_file_again_keyboard(content_type, content_id),
@@ -61,7 +130,27 @@ async def delete_and_prompt_callback(context: ContextTypes.DEFAULT_TYPE):
         except Exception as e:
             logger.error(f"Failed to send 'Get Again' prompt to {chat_id}: {e}")
 
-def schedule_content_deletion(
+async def _run_due_deletions(bot: Bot, entries: List[Tuple[int, Dict]]):
+    """Timing wheel handler: runs one second's worth of (chat_id, data) deletions together."""
+    results = await asyncio.gather(*(delete_and_prompt(bot, chat_id, data) for chat_id, data in entries), return_exceptions=True)
+    finished = []
+    for (chat_id, data), result in zip(entries, results):
+        if isinstance(result, Exception):
+            attempts = data.get('attempts', 1)
+            if attempts < DELETION_ATTEMPTS:
+                delay = DELETION_RETRY_DELAY * 2 ** (attempts - 1)
+                logger.error(f"Scheduled deletion for '{data.get('content_name')}' in chat {chat_id} failed, retrying in {delay:.0f}s: {result}")
+                # Still stored, so a restart before the retry restores it as overdue.
+                deletion_wheel.add(time.time() + delay, (chat_id, dict(data, attempts=attempts + 1)))
+                continue
+            logger.error(f"Scheduled deletion for '{data.get('content_name')}' in chat {chat_id} failed {attempts} times, giving up: {result}")
+        if data.get('deletion_id') is not None:
+            finished.append(data['deletion_id'])
+    # One transaction for the whole bucket.
+    if finished:
+        await async_db.unschedule_deletions(finished)
+
+async def schedule_content_deletion(
     context: ContextTypes.DEFAULT_TYPE, 
     chat_id: int, 
     video_message_ids: List[int],
@@ -76,18 +165,37 @@ def schedule_content_deletion(
     """
     if delay_minutes > 0 and (video_message_ids or photo_message_id):
         delay_seconds = delay_minutes * 60
-        context.job_queue.run_once(
-            delete_and_prompt_callback,
-            when=delay_seconds,
-            data={
-                'video_message_ids': video_message_ids,
-                'photo_message_id': photo_message_id, # Pass the photo ID to the job
-                'content_type': content_type,
-                'content_id': content_id,
-                'content_name': content_name
-            },
-            chat_id=chat_id,
-            name=f"delete_prompt_{chat_id}_{content_id}"
-        )
+        data = {
+            'video_message_ids': video_message_ids,
+            'photo_message_id': photo_message_id, # Pass the photo ID to the job
+            'content_type': content_type,
+            'content_id': content_id,
+            'content_name': content_name
+        }
+        # Stored first, so the deletion survives a restart before it runs.
+        data['deletion_id'] = await async_db.schedule_deletion(chat_id, time.time() + delay_seconds, data)
+        deletion_wheel.add(time.time() + delay_seconds, (chat_id, data))
         total_messages = len(video_message_ids) + (1 if photo_message_id else 0)
-        logger.info(f"Scheduled deletion for {total_messages} messages for content '{content_name}' in {delay_minutes} minutes.")
\ No newline at end of file
+        logger.info(f"Scheduled deletion for {total_messages} messages for content '{content_name}' in {delay_minutes} minutes.")
+
+async def start_deletion_wheel(bot: Bot) -> int:
+    """
+    Starts the deletion timing wheel and puts back the deletions a previous run stored
+    but never ran. Ones still in the future keep their due time; overdue ones go out in
+    batches of CATCHUP_BATCH so a long outage doesn't become one burst of deletes.
+    Returns how many were restored.
+    """
+    now = time.time()
+    pending = await async_db.pending_deletions()
+    overdue = 0
+    for entry in pending:
+        data = dict(entry['data'], deletion_id=entry['id'])
+        due_at = entry['due_at']
+        if due_at <= now:
+            due_at = now + CATCHUP_DELAY + (overdue // CATCHUP_BATCH) * CATCHUP_INTERVAL
+            overdue += 1
+        deletion_wheel.add(due_at, (entry['chat_id'], data))
+    if pending:
+        logger.info(f"Restored {len(pending)} scheduled deletions ({overdue} overdue).")
+    deletion_wheel.start(functools.partial(_run_due_deletions, bot))
+    return len(pending)
@@ -0,0 +1,199 @@
+# utils/rate_limiter.py
+"""
+Outbound scheduler for every Bot API request. It is installed as the Application's
+rate limiter, so each send, edit and delete waits here for a token from its chat's
+bucket (about 1 message/s in a private chat, 20/min in a group) and from the global
+bucket (about 30 messages/s), instead of sleeping ad hoc around individual calls. An
+album counts as one send in its chat and as each of its messages globally.
+
+Requests are INTERACTIVE unless sent with `rate_limit_args=BULK`; while an interactive
+request is ready to go, bulk requests hold back from the global bucket, so replies to
+users don't queue behind a 40-episode delivery. Within a chat, requests take their
+turn in arrival order, so messages never overtake each other. A RetryAfter pauses only the chat it
+came from (everything, if it had no chat) and the request is retried after the wait.
+"""
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import timedelta
+from typing import Any, Callable, Coroutine, Dict, Optional, Tuple, Union
+
+from telegram.error import RetryAfter
+from telegram.ext import BaseRateLimiter
+
+logger = logging.getLogger(__name__)
+
+# Priorities, passed as `rate_limit_args`.
+INTERACTIVE = 0
+BULK = 1
+
+GLOBAL_RATE = 30.0  # messages per second across all chats
+CHAT_RATE = 1.0  # messages per second in one private chat
+CHAT_BURST = 3  # messages a quiet private chat may get at once
+GROUP_RATE = 20 / 60  # messages per second in one group or channel
+GROUP_BURST = 20
+MAX_RETRIES = 3
+# Idle (full) chat buckets are dropped once there are more than this many.
+MAX_CHAT_BUCKETS = 10_000
+
+# Endpoints that post, change or remove messages. Everything else (answering callback and
+# inline queries, getChatMember, ...) only waits out flood pauses.
+_LIMITED_PREFIXES = ("send", "copyMessage", "forwardMessage", "edit", "deleteMessage")
+
+ChatId = Union[int, str]
+
+
+class TokenBucket:
+    """`rate` tokens per second, holding at most `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait(self, now: float, cost: float = 1) -> float:
+        """Seconds until `cost` tokens (at most a full bucket) are available."""
+        self._refill(now)
+        return max(min(cost, self.capacity) - self.tokens, 0) / self.rate
+
+    def take(self, now: float, cost: float = 1):
+        # May go below zero: a request costing more than a full bucket makes the next ones wait longer.
+        self._refill(now)
+        self.tokens -= cost
+
+    def is_full(self, now: float) -> bool:
+        self._refill(now)
+        return self.tokens >= self.capacity
+
+
+def _seconds(retry_after: Union[int, float, timedelta]) -> float:
+    return retry_after.total_seconds() if isinstance(retry_after, timedelta) else float(retry_after)
+
+
+class OutboundScheduler(BaseRateLimiter[int]):
+    def __init__(self, global_rate: float = GLOBAL_RATE):
+        self._global = TokenBucket(global_rate, global_rate)
+        self._chats: Dict[ChatId, TokenBucket] = {}
+        # Flood pauses per chat; the None key pauses every request.
+        self._paused_until: Dict[Optional[ChatId], float] = {}
+        # Per-chat FIFO turn: the lock and how many requests hold or wait for it.
+        self._turns: Dict[ChatId, Tuple[asyncio.Lock, int]] = {}
+        self._ready_interactive = 0
+        self.stats = {"requests": 0, "delayed": 0, "flood_waits": 0}
+
+    async def initialize(self):
+        pass
+
+    async def shutdown(self):
+        pass
+
+    def _bucket(self, chat_id: ChatId, now: float) -> TokenBucket:
+        bucket = self._chats.get(chat_id)
+        if bucket is None:
+            if len(self._chats) >= MAX_CHAT_BUCKETS:
+                self._chats = {key: value for key, value in self._chats.items() if not value.is_full(now)}
+            is_group = isinstance(chat_id, str) or chat_id < 0
+            bucket = self._chats[chat_id] = TokenBucket(GROUP_RATE, GROUP_BURST) if is_group else TokenBucket(CHAT_RATE, CHAT_BURST)
+        return bucket
+
+    def _pause_left(self, chat_id: Optional[ChatId], now: float) -> float:
+        left = 0.0
+        for key in {None, chat_id}:
+            until = self._paused_until.get(key)
+            if until is not None:
+                if until <= now:
+                    del self._paused_until[key]
+                else:
+                    left = max(left, until - now)
+        return left
+
+    @contextlib.asynccontextmanager
+    async def _turn(self, chat_id: ChatId):
+        lock, count = self._turns.get(chat_id, (None, 0))
+        lock = lock or asyncio.Lock()  # asyncio.Lock wakes its waiters in FIFO order
+        self._turns[chat_id] = (lock, count + 1)
+        try:
+            async with lock:
+                yield
+        finally:
+            lock, count = self._turns[chat_id]
+            if count == 1:
+                del self._turns[chat_id]
+            else:
+                self._turns[chat_id] = (lock, count - 1)
+
+    async def _acquire(self, chat_id: Optional[ChatId], cost: int, priority: int, limited: bool):
+        if limited and chat_id is not None:
+            async with self._turn(chat_id):
+                await self._wait_for_tokens(chat_id, cost, priority, limited)
+        else:
+            await self._wait_for_tokens(chat_id, cost, priority, limited)
+
+    async def _wait_for_tokens(self, chat_id: Optional[ChatId], cost: int, priority: int, limited: bool):
+        delayed, ready = False, False
+        try:
+            while True:
+                now = time.monotonic()
+                wait = self._pause_left(chat_id, now)
+                if limited and not wait:
+                    bucket = self._bucket(chat_id, now) if chat_id is not None else None
+                    wait = bucket.wait(now) if bucket else 0
+                    if not wait:
+                        if priority == INTERACTIVE and not ready:
+                            ready = True
+                            self._ready_interactive += 1
+                        if priority != INTERACTIVE and self._ready_interactive:
+                            wait = 1 / self._global.rate
+                        else:
+                            wait = self._global.wait(now, cost)
+                        if not wait:
+                            self._global.take(now, cost)
+                            if bucket:
+                                bucket.take(now)
+                if not wait:
+                    self.stats["delayed"] += delayed
+                    return
+                delayed = True
+                await asyncio.sleep(wait)
+        finally:
+            if ready:
+                self._ready_interactive -= 1
+
+    async def process_request(
+        self,
+        callback: Callable[..., Coroutine[Any, Any, Any]],
+        args: Any,
+        kwargs: Dict[str, Any],
+        endpoint: str,
+        data: Dict[str, Any],
+        rate_limit_args: Optional[int],
+    ):
+        priority = INTERACTIVE if rate_limit_args is None else rate_limit_args
+        chat_id = data.get("chat_id")
+        limited = endpoint.startswith(_LIMITED_PREFIXES)
+        cost = (len(data.get("media") or ()) or 1) if endpoint == "sendMediaGroup" else 1
+        self.stats["requests"] += 1
+        for attempt in range(MAX_RETRIES + 1):
+            await self._acquire(chat_id, cost, priority, limited)
+            try:
+                return await callback(*args, **kwargs)
+            except RetryAfter as e:
+                if attempt == MAX_RETRIES:
+                    raise
+                wait = _seconds(e.retry_after) + 0.1
+                self.stats["flood_waits"] += 1
+                logger.warning(f"Flood wait on {endpoint} for chat {chat_id}: pausing it for {wait:.1f}s")
+                until = time.monotonic() + wait
+                self._paused_until[chat_id] = max(self._paused_until.get(chat_id, 0), until)
+
+    def queue_stats(self) -> Dict[str, Any]:
+        return dict(self.stats, chats=len(self._chats), paused=len(self._paused_until))
+
+
+outbound = OutboundScheduler()
@@ -0,0 +1,73 @@
+# utils/router.py
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from telegram import Update
+from telegram.ext import CallbackQueryHandler, ContextTypes
+
+Callback = Callable[[Update, ContextTypes.DEFAULT_TYPE], Awaitable[Any]]
+
+
+class _Node:
+    __slots__ = ("children", "exact", "prefix")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.exact: Optional[Callback] = None
+        self.prefix: Optional[Callback] = None
+
+
+class CallbackRouter:
+    """
+    Routes callback queries by their callback_data. Routes are the CALLBACK_* constants:
+    exact() for whole payloads, prefix() for payloads that carry fields after the
+    prefix. They live in a character trie, so resolving a payload costs O(len(data))
+    however many routes there are; an exact route beats a prefix, and the longest
+    matching prefix wins. handler() wraps the router in a single CallbackQueryHandler
+    that only claims payloads it has a route for.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+
+    def _node(self, key: str) -> _Node:
+        node = self._root
+        for char in key:
+            node = node.children.setdefault(char, _Node())
+        return node
+
+    def exact(self, data: str, callback: Callback) -> "CallbackRouter":
+        self._node(data).exact = callback
+        return self
+
+    def prefix(self, prefix: str, callback: Callback) -> "CallbackRouter":
+        self._node(prefix).prefix = callback
+        return self
+
+    def include(self, other: "CallbackRouter") -> "CallbackRouter":
+        """Adds every route of another router (its routes win on conflicts)."""
+        stack = [(other._root, "")]
+        while stack:
+            node, key = stack.pop()
+            if node.exact:
+                self.exact(key, node.exact)
+            if node.prefix:
+                self.prefix(key, node.prefix)
+            stack.extend((child, key + char) for char, child in node.children.items())
+        return self
+
+    def resolve(self, data: str) -> Optional[Callback]:
+        node, match = self._root, None
+        for char in data:
+            if node.prefix:
+                match = node.prefix
+            node = node.children.get(char)
+            if node is None:
+                return match
+        return node.exact or node.prefix or match
+
+    async def dispatch(self, update: Update, context: ContextTypes.DEFAULT_TYPE):
+        # Whatever the route returns is passed on, so routers work as ConversationHandler states.
+        return await self.resolve(update.callback_query.data)(update, context)
+
+    def handler(self) -> CallbackQueryHandler:
+        return CallbackQueryHandler(self.dispatch, pattern=lambda data: isinstance(data, str) and self.resolve(data) is not None)
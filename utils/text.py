@@ -0,0 +1,98 @@
+# utils/text.py
+"""
+Text normalization shared by the search index and every place that parses a user's
+query. Titles are normalized once when they are indexed; queries once per request.
+
+Burmese needs extra care: the same title can arrive as Unicode or as legacy Zawgyi,
+with zero-width characters pasted in, or with its combining marks typed in a
+different order. normalize() folds all of those onto one search key.
+"""
+import re
+import unicodedata
+from typing import Any, List
+
+# Zero-width space/joiners, word joiner, BOM and soft hyphen are invisible but break matching.
+_INVISIBLE = dict.fromkeys(map(ord, "\u200b\u200c\u200d\u2060\ufeff\u00ad"))
+
+# Word separators. Python's \W also matches Myanmar vowel signs, so it can't be used here.
+_SEPARATORS = re.compile(r"[\s!-/:-@\[-`{-~\u104a\u104b\u2010-\u2027]+")
+
+_MY_CONSONANT = "\u1000-\u1021"
+# A syllable starts at a consonant (or independent vowel/digit/symbol) that is not stacked
+# under the previous one and not itself killed by asat/virama. Marks are sorted by code
+# point, so visarga (and other marks) can sit between a consonant and its asat.
+_MY_SYLLABLE_START = re.compile(
+    rf"(?<!\u1039)(?=[{_MY_CONSONANT}\u1023-\u102a\u103f\u1040-\u1049\u104c-\u104f](?![\u102b-\u1038]*\u103a|\u1039))"
+)
+# Everything that attaches to the preceding base character.
+_MY_MARK = re.compile(rf"([^\u102b-\u103e]|\u1039[{_MY_CONSONANT}])([\u102b-\u1038\u103a-\u103e]+)")
+
+# --- Zawgyi detection and conversion ---
+# Zawgyi reuses Myanmar code points with different meanings, so it has to be detected.
+# These hints never appear in well-formed Unicode: Zawgyi-only glyph code points, or a
+# vowel-sign E / ya-yit typed *before* its consonant at the start of a word.
+_ZAWGYI_HINT = re.compile(r"[\u105a\u1060-\u1097]|(?:^|[\s\u104a\u104b])[\u1031\u103b]")
+
+# Zawgyi's asat and medials sit one code point lower than Unicode's.
+_ZAWGYI_MEDIALS = str.maketrans({
+    "\u1039": "\u103a", "\u103a": "\u103b", "\u103b": "\u103c", "\u103c": "\u103d", "\u103d": "\u103e",
+})
+_ZAWGYI_GLYPHS = {
+    "\u1033": "\u102f", "\u1034": "\u1030", "\u105a": "\u102b\u103a",
+    "\u106a": "\u1009", "\u106b": "\u100a", "\u108f": "\u1014", "\u1090": "\u101b", "\u1086": "\u103f",
+    "\u1087": "\u103e", "\u1088": "\u103e\u102f", "\u1089": "\u103e\u1030", "\u108a": "\u103d\u103e",
+    "\u1064": "\u1004\u103a\u1039", "\u108b": "\u1004\u103a\u1039\u102d", "\u108c": "\u1004\u103a\u1039\u102e",
+    "\u108d": "\u1004\u103a\u1039\u1036", "\u108e": "\u102d\u1036", "\u1094": "\u1037", "\u1095": "\u1037",
+    "\u1097": "\u100b\u1039\u100b", "\u1092": "\u100b\u1039\u100c", "\u106e": "\u100d\u1039\u100d",
+    "\u106f": "\u100d\u1039\u100e", "\u1091": "\u100f\u1039\u100d", "\u1096": "\u1039\u1010\u103d",
+    "\u1093": "\u1039\u1018", "\u107d": "\u103b",
+    # Stacked (subjoined) consonant glyphs.
+    "\u1060": "\u1039\u1000", "\u1061": "\u1039\u1001", "\u1062": "\u1039\u1002", "\u1063": "\u1039\u1003",
+    "\u1065": "\u1039\u1005", "\u1066": "\u1039\u1006", "\u1067": "\u1039\u1006", "\u1068": "\u1039\u1007",
+    "\u1069": "\u1039\u1008", "\u106c": "\u1039\u100b", "\u106d": "\u1039\u100c", "\u1070": "\u1039\u100f",
+    "\u1071": "\u1039\u1010", "\u1072": "\u1039\u1010", "\u1073": "\u1039\u1011", "\u1074": "\u1039\u1011",
+    "\u1075": "\u1039\u1012", "\u1076": "\u1039\u1013", "\u1077": "\u1039\u1014", "\u1078": "\u1039\u1015",
+    "\u1079": "\u1039\u1016", "\u107a": "\u1039\u1017", "\u107b": "\u1039\u1018", "\u107c": "\u1039\u1019",
+    "\u1085": "\u1039\u101c",
+    # Width variants of ya-yit.
+    **{chr(code): "\u103c" for code in range(0x107e, 0x1085)},
+}
+_ZAWGYI_GLYPH_TABLE = str.maketrans(_ZAWGYI_GLYPHS)
+# After conversion, E and ya-yit still precede their consonant (plus any stacked consonant).
+_ZAWGYI_PREFIX = re.compile(rf"([\u1031\u103c]+)([{_MY_CONSONANT}\u103f](?:\u1039[{_MY_CONSONANT}])?)")
+
+
+def is_zawgyi(text: str) -> bool:
+    return bool(_ZAWGYI_HINT.search(text))
+
+
+def zawgyi_to_unicode(text: str) -> str:
+    """
+    Converts the common Zawgyi constructs to Unicode: medial/asat code points, the
+    Zawgyi-only glyphs, and the visual-order E / ya-yit prefixes. Rare ligatures
+    outside the table pass through unchanged.
+    """
+    text = text.translate(_ZAWGYI_MEDIALS).translate(_ZAWGYI_GLYPH_TABLE)
+    return _ZAWGYI_PREFIX.sub(lambda m: m.group(2) + m.group(1), text)
+
+
+def _sort_marks(text: str) -> str:
+    # Different keyboards store a syllable's marks in different orders; sorting them
+    # gives one key. Only used for matching, never for display.
+    return _MY_MARK.sub(lambda m: m.group(1) + "".join(sorted(m.group(2))), text)
+
+
+def normalize(text: Any) -> str:
+    """Search key for a title or query: NFKC, invisible chars stripped, Zawgyi folded, casefolded."""
+    text = unicodedata.normalize("NFKC", str(text or "")).translate(_INVISIBLE)
+    if is_zawgyi(text):
+        text = zawgyi_to_unicode(text)
+    return " ".join(_sort_marks(text).casefold().split())
+
+
+def tokenize(normalized: str) -> List[str]:
+    """Splits a normalized string into words, and Burmese runs further into syllables."""
+    tokens = []
+    for word in _SEPARATORS.split(normalized):
+        tokens.extend(part for part in _MY_SYLLABLE_START.split(word) if part)
+    return tokens
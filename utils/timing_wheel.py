@@ -0,0 +1,133 @@
+# utils/timing_wheel.py
+"""
+Hierarchical timing wheel for large numbers of one-shot timers. Entries are bucketed by
+the second they fall due in: a 60-slot wheel of seconds, a 60-slot wheel of minutes and
+a 24-slot wheel of hours, with anything further out kept in an overflow list. One task
+wakes once per second and pops that second's whole bucket; when the seconds wheel wraps,
+the next minute's bucket is spread over it (and likewise for hours and the overflow), so
+each entry is touched at most once per level instead of living in a scheduler heap.
+
+Due buckets are handed to the `on_due` callback as lists of payloads, in a task of their
+own, so slow handlers don't delay the next tick. Entries fire at most one tick late.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (slots, seconds per slot) of each level, finest first.
+LEVELS = ((60, 1), (60, 60), (24, 3600))
+
+OnDue = Callable[[List[Any]], Awaitable[Any]]
+Entry = Tuple[int, Any]  # (due tick, payload)
+
+
+class TimingWheel:
+    def __init__(self, levels: Tuple[Tuple[int, int], ...] = LEVELS):
+        self.levels = levels
+        self._wheels: List[List[List[Entry]]] = [[[] for _ in range(slots)] for slots, _ in levels]
+        self._counts = [0] * len(levels)
+        self._overflow: List[Entry] = []
+        self._horizon = levels[-1][0] * levels[-1][1]
+        # Last tick that was fired; entries due at or before it go into the next bucket.
+        self._tick = int(time.time()) - 1
+        self._on_due: Optional[OnDue] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Set[asyncio.Task] = set()
+        self.stats = {"buckets_fired": 0, "items_fired": 0, "lag": 0.0, "max_lag": 0.0}
+
+    def __len__(self) -> int:
+        return sum(self._counts) + len(self._overflow)
+
+    def add(self, due_at: float, payload: Any):
+        """Schedules `payload` for the wall-clock time `due_at`; past times fire on the next tick."""
+        self._place((max(int(due_at), self._tick + 1), payload))
+
+    def _place(self, entry: Entry):
+        delta = entry[0] - self._tick
+        for level, (slots, span) in enumerate(self.levels):
+            if delta < slots * span:
+                self._wheels[level][(entry[0] // span) % slots].append(entry)
+                self._counts[level] += 1
+                return
+        self._overflow.append(entry)
+
+    def _cascade(self, level: int, tick: int):
+        """Moves the bucket of `level` that starts at `tick` down into the finer levels."""
+        slots, span = self.levels[level]
+        bucket = self._wheels[level][(tick // span) % slots]
+        self._wheels[level][(tick // span) % slots] = []
+        self._counts[level] -= len(bucket)
+        for entry in bucket:
+            self._place(entry)
+
+    def _advance(self) -> List[Any]:
+        """Moves on one tick and returns the payloads of the bucket that fell due."""
+        tick = self._tick = self._tick + 1
+        # Coarsest first, so an entry can fall through several levels in one tick.
+        if tick % self._horizon == 0 and self._overflow:
+            overflow, self._overflow = self._overflow, []
+            for entry in overflow:
+                self._place(entry)
+        for level in range(len(self.levels) - 1, 0, -1):
+            if tick % self.levels[level][1] == 0:
+                self._cascade(level, tick)
+        slots = self.levels[0][0]
+        bucket = self._wheels[0][tick % slots]
+        self._wheels[0][tick % slots] = []
+        self._counts[0] -= len(bucket)
+        return [payload for _, payload in bucket]
+
+    def start(self, on_due: OnDue):
+        """Starts ticking in the running event loop, handing each due bucket to `on_due`."""
+        self._on_due = on_due
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self):
+        while True:
+            now = time.time()
+            if len(self) == 0:
+                # Nothing to wait for; skip straight to the present instead of ticking through idle time.
+                self._tick = max(self._tick, int(now) - 1)
+            # A tick fires once its second is over, i.e. tick t at time t + 1.
+            while self._tick + 2 <= now:
+                due = self._advance()
+                if due:
+                    self._fire(due, now - (self._tick + 1))
+            await asyncio.sleep(self._tick + 2 - time.time())
+
+    def _fire(self, payloads: List[Any], lag: float):
+        self.stats["buckets_fired"] += 1
+        self.stats["items_fired"] += len(payloads)
+        self.stats["lag"] = lag
+        self.stats["max_lag"] = max(self.stats["max_lag"], lag)
+        task = asyncio.get_running_loop().create_task(self._on_due(payloads))
+        self._running.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Timing wheel handler failed: {task.exception()!r}")
+
+    def queue_stats(self) -> Dict[str, Any]:
+        """Queue depth (total, per level and overflow), buckets still being handled, and firing lag in seconds."""
+        return dict(
+            self.stats,
+            depth=len(self),
+            levels=list(self._counts),
+            overflow=len(self._overflow),
+            running=len(self._running),
+        )